@@ -0,0 +1,72 @@
+"""ON DELETE CASCADE on places.owner_id, reviews.user_id/place_id and place_amenities
+
+Revision ID: 0b3d23870a1e
+Revises: 312cca24caeb
+Create Date: 2026-10-18 18:20:37.905114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b3d23870a1e'
+down_revision = '312cca24caeb'
+branch_labels = None
+depends_on = None
+
+# the initial schema left these foreign keys unnamed; batch mode on SQLite
+# needs a name to drop one, which this convention supplies
+NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+FOREIGN_KEYS = {
+    'places': [('owner_id', 'users')],
+    'reviews': [('user_id', 'users'), ('place_id', 'places')],
+    'place_amenities': [('place_id', 'places'), ('amenity_id', 'amenities')],
+}
+
+# frozen copy of the places_fts triggers (see 8e97a3765e3b): rebuilding places
+# on SQLite drops its triggers and may renumber the rowids places_fts points at
+PLACES_FTS_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS places_fts_ai AFTER INSERT ON places BEGIN "
+    "INSERT INTO places_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_ad AFTER DELETE ON places BEGIN "
+    "INSERT INTO places_fts(places_fts, rowid, name, description) "
+    "VALUES ('delete', old.rowid, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_au AFTER UPDATE OF name, description ON places BEGIN "
+    "INSERT INTO places_fts(places_fts, rowid, name, description) "
+    "VALUES ('delete', old.rowid, old.name, old.description); "
+    "INSERT INTO places_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description); END",
+)
+
+
+def _replace_foreign_keys(table, ondelete):
+    # MySQL named them itself (places_ibfk_1, ...); SQLite reports None
+    existing = {
+        tuple(fk['constrained_columns']): fk['name']
+        for fk in sa.inspect(op.get_bind()).get_foreign_keys(table)
+    }
+    with op.batch_alter_table(table, schema=None, naming_convention=NAMING) as batch_op:
+        for column, referred in FOREIGN_KEYS[table]:
+            name = f'fk_{table}_{column}_{referred}'
+            batch_op.drop_constraint(existing.get((column,)) or name, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def _restore_places_fts():
+    if op.get_bind().dialect.name == 'sqlite':
+        for stmt in PLACES_FTS_TRIGGERS:
+            op.execute(stmt)
+        op.execute("INSERT INTO places_fts(places_fts) VALUES ('rebuild')")
+
+
+def upgrade():
+    for table in ('place_amenities', 'reviews', 'places'):
+        _replace_foreign_keys(table, 'CASCADE')
+    _restore_places_fts()
+
+
+def downgrade():
+    for table in ('place_amenities', 'reviews', 'places'):
+        _replace_foreign_keys(table, None)
+    _restore_places_fts()
@@ -0,0 +1,26 @@
+"""keyset index on reviews (place_id, created_at, id)
+
+Revision ID: 117308422705
+Revises: 396a9930ad8f
+Create Date: 2026-10-18 14:05:12.417930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '117308422705'
+down_revision = '396a9930ad8f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.create_index('ix_reviews_place_id_created_at_id', ['place_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_reviews_place_id_created_at_id')
@@ -0,0 +1,46 @@
+"""unique review per (user_id, place_id), duplicates removed first
+
+Revision ID: 14395a4c3c4b
+Revises: 19c9c926457d
+Create Date: 2026-10-18 15:22:07.664012
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '14395a4c3c4b'
+down_revision = '19c9c926457d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keep each (user, place)'s earliest review; the derived table lets MySQL
+    # delete from the table it is reading
+    op.execute(
+        "DELETE FROM reviews WHERE id IN ("
+        " SELECT id FROM ("
+        "  SELECT r.id FROM reviews r WHERE EXISTS ("
+        "   SELECT 1 FROM reviews k"
+        "   WHERE k.user_id = r.user_id AND k.place_id = r.place_id"
+        "   AND (k.created_at < r.created_at OR (k.created_at = r.created_at AND k.id < r.id))"
+        "  )"
+        " ) AS dupes"
+        ")"
+    )
+    op.execute(
+        "UPDATE places SET "
+        "review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id), "
+        "last_reviewed_at = (SELECT MAX(created_at) FROM reviews WHERE reviews.place_id = places.id)"
+    )
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.create_index('uq_reviews_user_place', ['user_id', 'place_id'], unique=True)
+
+
+def downgrade():
+    # removed duplicates are not restored
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index('uq_reviews_user_place')
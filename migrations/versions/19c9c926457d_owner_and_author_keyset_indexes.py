@@ -0,0 +1,32 @@
+"""keyset indexes on places (owner_id, created_at, id) and reviews (user_id, created_at, id)
+
+Revision ID: 19c9c926457d
+Revises: 117308422705
+Create Date: 2026-10-18 14:40:51.093118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '19c9c926457d'
+down_revision = '117308422705'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.create_index('ix_places_owner_id_created_at_id', ['owner_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.create_index('ix_reviews_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_reviews_user_id_created_at_id')
+
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index('ix_places_owner_id_created_at_id')
@@ -0,0 +1,26 @@
+"""keyset index on users (created_at, id)
+
+Revision ID: 312cca24caeb
+Revises: d69de5b0001e
+Create Date: 2026-10-18 17:48:03.512377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '312cca24caeb'
+down_revision = 'd69de5b0001e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_created_at_id')
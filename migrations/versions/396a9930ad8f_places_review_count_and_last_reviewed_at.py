@@ -0,0 +1,34 @@
+"""places.review_count and places.last_reviewed_at, backfilled from reviews
+
+Revision ID: 396a9930ad8f
+Revises: 8e97a3765e3b
+Create Date: 2026-10-18 15:08:26.402781
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '396a9930ad8f'
+down_revision = '8e97a3765e3b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # plain ADD COLUMN (no batch rebuild) keeps places.rowid, which places_fts points at
+    op.add_column('places', sa.Column('review_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('places', sa.Column('last_reviewed_at', sa.DateTime(), nullable=True))
+
+    op.execute(
+        "UPDATE places SET "
+        "review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id), "
+        "last_reviewed_at = (SELECT MAX(created_at) FROM reviews WHERE reviews.place_id = places.id)"
+    )
+
+
+def downgrade():
+    # native DROP COLUMN (SQLite >= 3.35) rather than a batch rebuild, for the same rowid reason
+    op.execute("ALTER TABLE places DROP COLUMN last_reviewed_at")
+    op.execute("ALTER TABLE places DROP COLUMN review_count")
@@ -0,0 +1,28 @@
+"""place search indexes: (city, price_per_night) and (price_per_night, id)
+
+Revision ID: 4795f4ff4fc1
+Revises: 95a72f7e98da
+Create Date: 2026-10-18 10:02:17.530962
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4795f4ff4fc1'
+down_revision = '95a72f7e98da'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.create_index('ix_places_city_price', ['city', 'price_per_night'], unique=False)
+        batch_op.create_index('ix_places_price_id', ['price_per_night', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index('ix_places_price_id')
+        batch_op.drop_index('ix_places_city_price')
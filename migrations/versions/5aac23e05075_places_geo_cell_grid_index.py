@@ -0,0 +1,61 @@
+"""places.geo_cell grid index for radius and bbox search
+
+Revision ID: 5aac23e05075
+Revises: 4795f4ff4fc1
+Create Date: 2026-10-18 11:26:03.118420
+
+"""
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5aac23e05075'
+down_revision = '4795f4ff4fc1'
+branch_labels = None
+depends_on = None
+
+# frozen copy of part3/persistence/geo.cell_for at the time of this revision
+CELL_DEG = 0.1
+LNG_CELLS = 3601
+LAT_CELLS = 1801
+
+
+def _cell_for(lat, lng):
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    row = min(max(int(math.floor((lat + 90.0) / CELL_DEG)), 0), LAT_CELLS - 1)
+    col = min(max(int(math.floor((lng + 180.0) / CELL_DEG)), 0), LNG_CELLS - 1)
+    return row * LNG_CELLS + col
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('geo_cell', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_places_geo_cell'), ['geo_cell'], unique=False)
+
+    # backfill existing rows
+    bind = op.get_bind()
+    places = sa.table(
+        'places',
+        sa.column('id', sa.String),
+        sa.column('latitude', sa.Float),
+        sa.column('longitude', sa.Float),
+        sa.column('geo_cell', sa.Integer),
+    )
+    rows = bind.execute(
+        sa.select(places.c.id, places.c.latitude, places.c.longitude)
+        .where(places.c.latitude.isnot(None), places.c.longitude.isnot(None))
+    ).all()
+    for place_id, lat, lng in rows:
+        bind.execute(
+            places.update().where(places.c.id == place_id).values(geo_cell=_cell_for(lat, lng))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_places_geo_cell'))
+        batch_op.drop_column('geo_cell')
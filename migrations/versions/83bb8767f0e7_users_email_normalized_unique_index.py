@@ -0,0 +1,60 @@
+"""users.email_normalized with the unique index moved onto it
+
+Revision ID: 83bb8767f0e7
+Revises: 0b3d23870a1e
+Create Date: 2026-10-18 19:02:11.420517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '83bb8767f0e7'
+down_revision = '0b3d23870a1e'
+branch_labels = None
+depends_on = None
+
+
+# frozen copy of part3/models.normalize_email at the time of this revision
+def _normalize(email):
+    return (email or "").strip().lower()
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('email_normalized', sa.String(), nullable=True))
+
+    # backfill in Python: SQL lower() is ASCII-only on SQLite
+    bind = op.get_bind()
+    users = sa.table(
+        'users',
+        sa.column('id', sa.String),
+        sa.column('email', sa.String),
+        sa.column('email_normalized', sa.String),
+    )
+    seen = {}
+    for user_id, email in bind.execute(sa.select(users.c.id, users.c.email)).all():
+        normalized = _normalize(email)
+        if normalized in seen:
+            # two accounts differing only in case or whitespace: an operator has to pick one
+            raise RuntimeError(
+                f"users {seen[normalized]} and {user_id} share the normalized email {normalized!r}; "
+                "merge or rename one of them, then rerun the upgrade"
+            )
+        seen[normalized] = user_id
+        bind.execute(users.update().where(users.c.id == user_id).values(email_normalized=normalized))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('email_normalized', existing_type=sa.String(), nullable=False)
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=False)
+        batch_op.create_index('uq_users_email_normalized', ['email_normalized'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('uq_users_email_normalized')
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.drop_column('email_normalized')
@@ -0,0 +1,53 @@
+"""full-text search on places (SQLite FTS5 / MySQL FULLTEXT)
+
+Revision ID: 8e97a3765e3b
+Revises: 5aac23e05075
+Create Date: 2026-10-18 13:40:51.772309
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e97a3765e3b'
+down_revision = '5aac23e05075'
+branch_labels = None
+depends_on = None
+
+# frozen copy of part3/models PLACES_FTS_SQLITE at the time of this revision
+PLACES_FTS_SQLITE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5("
+    "name, description, content='places', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_ai AFTER INSERT ON places BEGIN "
+    "INSERT INTO places_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_ad AFTER DELETE ON places BEGIN "
+    "INSERT INTO places_fts(places_fts, rowid, name, description) "
+    "VALUES ('delete', old.rowid, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_au AFTER UPDATE OF name, description ON places BEGIN "
+    "INSERT INTO places_fts(places_fts, rowid, name, description) "
+    "VALUES ('delete', old.rowid, old.name, old.description); "
+    "INSERT INTO places_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description); END",
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for stmt in PLACES_FTS_SQLITE:
+            op.execute(stmt)
+        # index the rows that already exist
+        op.execute("INSERT INTO places_fts(places_fts) VALUES ('rebuild')")
+    elif dialect == 'mysql':
+        op.execute("ALTER TABLE places ADD FULLTEXT INDEX ft_places_name_description (name, description)")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS places_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS places_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS places_fts_ai")
+        op.execute("DROP TABLE IF EXISTS places_fts")
+    elif dialect == 'mysql':
+        op.execute("ALTER TABLE places DROP INDEX ft_places_name_description")
@@ -0,0 +1,26 @@
+"""keyset index on places (created_at, id)
+
+Revision ID: 95a72f7e98da
+Revises: d587b600d4ed
+Create Date: 2026-10-18 09:12:40.184201
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '95a72f7e98da'
+down_revision = 'd587b600d4ed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.create_index('ix_places_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index('ix_places_created_at_id')
@@ -0,0 +1,26 @@
+"""index on places.updated_at for the in-process indexes' delta refreshes
+
+Revision ID: a3f19c2e7b54
+Revises: 83bb8767f0e7
+Create Date: 2026-10-18 22:10:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f19c2e7b54'
+down_revision = '83bb8767f0e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.create_index('ix_places_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index('ix_places_updated_at')
@@ -1,7 +1,7 @@
 from flask import Flask, jsonify
 from part3.config import DevConfig
 from part3.app.extensions import db, migrate, bcrypt, jwt, api, init_extensions
-from flask_jwt_extended.exceptions import NoAuthorizationError, JWTExtendedException
+from flask_jwt_extended.exceptions import NoAuthorizationError, JWTExtendedException, RevokedTokenError
 from jwt.exceptions import InvalidTokenError
 
 def create_app(config_object=DevConfig):
@@ -17,6 +17,7 @@ def create_app(config_object=DevConfig):
     from part3.presentation.amenities import api as amenities_ns
     from part3.presentation.reviews import api as reviews_ns
     from part3.presentation.auth import api as auth_ns
+    from part3.presentation.metrics import api as metrics_ns
 
     # register namespaces
     api.add_namespace(users_ns, path="/users")
@@ -24,6 +25,12 @@ def create_app(config_object=DevConfig):
     api.add_namespace(amenities_ns, path="/amenities")
     api.add_namespace(reviews_ns, path="/reviews")
     api.add_namespace(auth_ns, path="/auth")
+    api.add_namespace(metrics_ns, path="/metrics")
+
+    # maintenance CLI commands
+    from part3.app.cli import review_stats_cli, tokens_cli
+    app.cli.add_command(review_stats_cli)
+    app.cli.add_command(tokens_cli)
 
     # JWT / error handlers
     @jwt.unauthorized_loader
@@ -46,6 +53,11 @@ def create_app(config_object=DevConfig):
     def _restx_no_auth(e):
         return {"message": "Missing or invalid Authorization header"}, 401
 
+    # registered before the JWTExtendedException catch-all, which RESTX would match first
+    @api.errorhandler(RevokedTokenError)
+    def _restx_revoked(e):
+        return {"message": "Token has been revoked"}, 401
+
     @api.errorhandler(JWTExtendedException)
     def _restx_jwt_errors(e):
         return {"message": "Invalid token"}, 422
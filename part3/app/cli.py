@@ -0,0 +1,40 @@
+"""Maintenance commands, run with ``flask --app part3.app:create_app <command>``."""
+import click
+from flask.cli import AppGroup
+
+review_stats_cli = AppGroup("review-stats", help="Check or repair places.review_count / last_reviewed_at.")
+
+
+@review_stats_cli.command("verify")
+def verify_review_stats():
+    """List places whose stored review stats drifted; exit 1 if any did."""
+    from part3.persistence.sql_review_repository import review_stats_drift
+
+    drift = review_stats_drift()
+    for row in drift:
+        click.echo(
+            f"{row['place_id']}: review_count {row['review_count']} (actual {row['actual_review_count']}), "
+            f"last_reviewed_at {row['last_reviewed_at']} (actual {row['actual_last_reviewed_at']})"
+        )
+    click.echo(f"{len(drift)} place(s) drifted")
+    if drift:
+        raise SystemExit(1)
+
+
+@review_stats_cli.command("repair")
+def repair_review_stats():
+    """Recompute the stats of every drifted place from the reviews table."""
+    from part3.persistence.sql_review_repository import refresh_review_stats
+
+    click.echo(f"{refresh_review_stats()} place(s) repaired")
+
+
+tokens_cli = AppGroup("tokens", help="Maintain the revoked_tokens table.")
+
+
+@tokens_cli.command("purge")
+def purge_revoked_tokens():
+    """Delete revocations of tokens that have expired anyway."""
+    from part3.persistence.sql_token_repository import purge_expired
+
+    click.echo(f"{purge_expired()} expired revocation(s) purged")
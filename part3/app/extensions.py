@@ -1,21 +1,72 @@
+import sqlite3
+
+from sqlalchemy import event
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager
 from flask_restx import Api
+from part3.app.hashing import PasswordHasher
+from part3.app.jwt_cache import CachingJWTManager
+from part3.app import replicas
+from part3.app.replicas import RoutingSession
+from part3.persistence import cache as entity_cache
+from part3.persistence import spatial_index
 
-db = SQLAlchemy()  # database ORM
+db = SQLAlchemy(session_options={"class_": RoutingSession})  # database ORM; GET reads may go to replicas
 migrate = Migrate()  # migrations
 bcrypt = Bcrypt()  # password hashing
-jwt = JWTManager() # JWT auth tokens
+hasher = PasswordHasher(bcrypt)  # bcrypt on a bounded worker pool
+jwt = CachingJWTManager() # JWT auth tokens (LRU of decoded tokens, see jwt_cache.py)
 api = Api(title="HBnB API", version="3.0", doc="/docs", prefix="/api/v1") # Swagger at /docs
 
 
+@jwt.token_in_blocklist_loader
+def _token_revoked(jwt_header, jwt_payload):
+    # Bloom filter first; the database is only asked about probable hits.
+    # A token is also dead once its refresh chain ("family") is.
+    from part3.persistence import revocation
+    from part3.persistence import sql_token_repository as token_repo
+    if revocation.is_revoked(jwt_payload["jti"]):
+        if jwt_payload.get("type") == "refresh":
+            # a rotated refresh token came back: it leaked, so end the chain for whoever holds it now
+            token_repo.revoke_family(jwt_payload)
+        return True
+    family = jwt_payload.get("family")
+    return family is not None and revocation.is_revoked(family)
+
+
+def _sqlite_pragmas(pragmas):
+    """connect listener setting the given PRAGMAs on each new SQLite connection."""
+    # SQLite forgets all but journal_mode when a connection closes, so they are set per connection;
+    # foreign_keys is always on: without it SQLite ignores FOREIGN KEY clauses and ON DELETE CASCADE
+    statements = [f"PRAGMA {name}={value}" for name, value in {**pragmas, "foreign_keys": "ON"}.items()]
+
+    def on_connect(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            cursor = dbapi_connection.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.close()
+
+    return on_connect
+
+
 def init_extensions(app):
     """attach all shared extensions to the Flask app in one place."""
+    replicas.init_app(app)  # replica binds must be in the config before the engines are made
     db.init_app(app)
+    # ... but own no tables: keep create_all/drop_all (on the shared db object) to the primary
+    for key in replicas.bind_keys(app):
+        db.metadatas.pop(key, None)
+    on_connect = _sqlite_pragmas(app.config.get("SQLITE_PRAGMAS") or {})
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "connect", on_connect)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
+    hasher.init_app(app)
     jwt.init_app(app)
+    entity_cache.init_app(app)
+    spatial_index.init_app(app)  # may start the KD-tree build in the background
     app.config["JWT_SECRET_KEY"] = "your-secret-key"
     api.init_app(app)
@@ -0,0 +1,128 @@
+"""Password hashing on a bounded worker pool.
+
+bcrypt releases the GIL while it works, so a small thread pool runs hashes
+in parallel without a process pool's pickling and start-up cost. The pool
+also caps how many hashes run at once: a signup burst queues here instead
+of pinning every request worker on CPU.
+
+Hashes record their cost ("$2b$12$..."), so after the work factor changes,
+needs_rehash() spots old hashes and rehash_later() upgrades one in the
+background once a login has proven the password.
+
+Config:
+    BCRYPT_LOG_ROUNDS    work factor for new hashes (Flask-Bcrypt's key, default 12)
+    BCRYPT_TARGET_MS     if set, BCRYPT_LOG_ROUNDS is calibrated at start-up to the
+                         highest cost hashing within this many ms on this host
+    BCRYPT_POOL_WORKERS  concurrent hashes (default: one per CPU)
+"""
+from __future__ import annotations
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+from flask import current_app
+
+DEFAULT_LOG_ROUNDS = 12
+MIN_LOG_ROUNDS = 4
+MAX_LOG_ROUNDS = 31
+_PROBE_ROUNDS = 6
+
+
+def cost_of(password_hash: str) -> Optional[int]:
+    """Work factor recorded in a bcrypt hash, or None if it is not one."""
+    parts = (password_hash or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """Flask extension wrapping Flask-Bcrypt calls in a per-app thread pool."""
+
+    def __init__(self, bcrypt, app=None):
+        self._bcrypt = bcrypt
+        self._background: set = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        workers = app.config.get("BCRYPT_POOL_WORKERS") or os.cpu_count() or 1
+        app.config.setdefault("BCRYPT_LOG_ROUNDS", DEFAULT_LOG_ROUNDS)
+        if app.config.get("BCRYPT_TARGET_MS"):
+            app.config["BCRYPT_LOG_ROUNDS"] = self.calibrate(app.config["BCRYPT_TARGET_MS"])
+        app.extensions["password_hasher"] = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bcrypt"
+        )
+
+    def calibrate(self, target_ms: float) -> int:
+        """Highest cost whose hash takes at most target_ms here.
+
+        Each extra round doubles the time, so one cheap probe is enough to
+        extrapolate.
+        """
+        started = time.perf_counter()
+        self._hash("calibration-probe", _PROBE_ROUNDS)
+        probe_ms = max((time.perf_counter() - started) * 1000, 1e-3)
+        rounds = _PROBE_ROUNDS + math.floor(math.log2(target_ms / probe_ms))
+        return max(MIN_LOG_ROUNDS, min(MAX_LOG_ROUNDS, rounds))
+
+    @staticmethod
+    def _pool() -> ThreadPoolExecutor:
+        return current_app.extensions["password_hasher"]
+
+    def submit_hash(self, password: str, rounds: int | None = None) -> Future:
+        """Queue a hash at the app's work factor (or rounds); the future yields str."""
+        rounds = rounds or current_app.config["BCRYPT_LOG_ROUNDS"]
+        return self._pool().submit(self._hash, password, rounds)
+
+    def hash(self, password: str, rounds: int | None = None) -> str:
+        """Hash on the pool and wait for the result."""
+        return self.submit_hash(password, rounds).result()
+
+    def check(self, password_hash: str, password: str) -> bool:
+        """Verify on the pool and wait for the result."""
+        return self._pool().submit(self._bcrypt.check_password_hash, password_hash, password).result()
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True if the hash was made at a cost other than the app's current one."""
+        cost = cost_of(password_hash)
+        return cost is not None and cost != current_app.config["BCRYPT_LOG_ROUNDS"]
+
+    def rehash_later(self, password: str, on_hashed: Callable[[str], None]) -> Future:
+        """Hash at the current cost on the pool, then call on_hashed(new_hash).
+
+        on_hashed runs on the worker inside an app context, so it can use
+        the database; the caller does not wait for any of it.
+        """
+        app = current_app._get_current_object()
+        rounds = app.config["BCRYPT_LOG_ROUNDS"]
+
+        def job():
+            with app.app_context():
+                try:
+                    on_hashed(self._hash(password, rounds))
+                except Exception:
+                    app.logger.exception("background password rehash failed")
+
+        future = self._pool().submit(job)
+        with self._lock:
+            self._background.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def drain(self, timeout: float | None = None) -> None:
+        """Wait for queued background rehashes (tests, benchmarks, shutdown)."""
+        with self._lock:
+            pending = list(self._background)
+        wait(pending, timeout=timeout)
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._background.discard(future)
+
+    def _hash(self, password: str, rounds: int) -> str:
+        return self._bcrypt.generate_password_hash(password, rounds).decode("utf-8")
@@ -0,0 +1,115 @@
+"""Bounded LRU of verified JWT claims, keyed by a hash of the raw token.
+
+A page load fires many API calls with the same access token, and each
+one re-verifies the HS256 signature and re-parses the claims.
+CachingJWTManager overrides the single decode hook of flask_jwt_extended,
+so a repeat of an already verified token returns the cached claims. Every
+later check in jwt_required() still runs for every request: token type,
+fresh, and the revocation blocklist.
+
+Entries expire at the token's ``exp``. The key is a sha256 over the
+verifying key, the allowed algorithms and the token, so raw tokens are
+never held in memory and rotating JWT_SECRET_KEY (or the algorithm) stops
+old tokens at once instead of serving them until they expire.
+
+_decode_jwt_from_config is private to flask_jwt_extended: requirements.txt
+pins the version, and test_auth checks the signature this override expects.
+
+Config:
+    JWT_DECODE_CACHE_SIZE  max cached tokens per process; 0 disables the cache
+"""
+from __future__ import annotations
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from flask import current_app
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config
+
+_EXT_KEY = "jwt_decode_cache"
+
+
+class DecodedTokenCache:
+    """Thread-safe LRU of claims dicts, each dropped at its token's exp."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is None:
+                self.misses += 1
+                return None
+            if claims["exp"] <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(claims)
+
+    def put(self, key: bytes, claims: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = dict(claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def _cache_key(encoded_token: str) -> bytes:
+    digest = hashlib.sha256()
+    for part in (str(config.decode_key), ",".join(config.decode_algorithms), encoded_token):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager whose token decoding goes through a per-app DecodedTokenCache."""
+
+    def init_app(self, app) -> None:
+        super().init_app(app)
+        size = app.config.setdefault("JWT_DECODE_CACHE_SIZE", 0)
+        app.extensions[_EXT_KEY] = DecodedTokenCache(size) if size else None
+
+    def _decode_jwt_from_config(self, encoded_token: str, csrf_value=None, allow_expired: bool = False) -> dict:
+        cache = current_app.extensions.get(_EXT_KEY)
+        # CSRF double-submit and allow_expired decodes are rare: leave them uncached
+        if cache is None or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = _cache_key(encoded_token)
+        claims = cache.get(key)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+            if "exp" in claims:
+                cache.put(key, claims)
+        return claims
+
+
+def cache_stats() -> Optional[Dict[str, Any]]:
+    """The current app's cache counters, or None when the cache is off."""
+    cache = current_app.extensions.get(_EXT_KEY)
+    return cache.stats() if cache is not None else None
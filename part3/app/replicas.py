@@ -0,0 +1,138 @@
+"""Read-replica routing for db.session.
+
+Reads outnumber writes about 50:1, so GET (and HEAD) requests read from
+replicas while everything else stays on the primary:
+
+* each replica URI becomes a Flask-SQLAlchemy bind (``replica_0``, ...)
+  and a safe-method request picks one, round-robin, for all its reads;
+* flushes and INSERT/UPDATE/DELETE statements always go to the primary;
+* a successful write request sets a cookie that keeps that client on the
+  primary for SQLALCHEMY_REPLICA_STICKY_SECONDS, so it reads its own writes
+  through the replication lag;
+* code that must not see lag (state built once per process, security
+  checks) wraps its queries in ``on_primary()``.
+
+With no replicas configured nothing changes: the router is None and every
+statement uses the default engine. Replicas are assumed to carry the same
+schema; create_all/drop_all and migrations only touch the primary.
+
+Config:
+    SQLALCHEMY_REPLICA_URIS            database URIs of the read replicas (default: none)
+    SQLALCHEMY_REPLICA_STICKY_SECONDS  read-your-writes window after a write request
+"""
+from __future__ import annotations
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+_EXT_KEY = "db_replicas"
+STICKY_COOKIE = "hbnb_primary_until"
+DEFAULT_STICKY_SECONDS = 5
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReplicaRouter:
+    """Round-robin over the replica bind keys."""
+
+    def __init__(self, bind_keys: List[str], sticky_seconds: float):
+        self.bind_keys = bind_keys
+        self.sticky_seconds = sticky_seconds
+        self._lock = threading.Lock()
+        self._next = itertools.cycle(bind_keys)
+
+    def next_key(self) -> str:
+        with self._lock:
+            return next(self._next)
+
+
+class RoutingSession(Session):
+    """db.session class sending a GET request's reads to its replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            key = _replica_key()
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _sticky() -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _replica_key() -> Optional[str]:
+    """This request's replica bind key, or None for the primary."""
+    if not has_request_context() or g.get("db_on_primary"):
+        return None
+    router = current_app.extensions.get(_EXT_KEY)
+    if router is None:
+        return None
+    # decided once per request: every read in it sees the same replica
+    if "db_replica" not in g:
+        g.db_replica = router.next_key() if request.method in SAFE_METHODS and not _sticky() else None
+    return g.db_replica
+
+
+def reads_own_writes() -> bool:
+    """True when replicas exist but this request reads the primary (a write, or sticky)."""
+    if not has_request_context() or current_app.extensions.get(_EXT_KEY) is None:
+        return False
+    return _replica_key() is None
+
+
+@contextmanager
+def on_primary():
+    """Run the enclosed queries on the primary, whatever the request."""
+    if not has_app_context():
+        yield
+        return
+    previous = g.get("db_on_primary", False)
+    g.db_on_primary = True
+    try:
+        yield
+    finally:
+        g.db_on_primary = previous
+
+
+def _stick_to_primary(response):
+    router = current_app.extensions.get(_EXT_KEY)
+    if router and router.sticky_seconds > 0 and request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            STICKY_COOKIE,
+            f"{time.time() + router.sticky_seconds:.3f}",
+            max_age=int(router.sticky_seconds) + 1,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def bind_keys(app) -> List[str]:
+    router = app.extensions.get(_EXT_KEY)
+    return list(router.bind_keys) if router else []
+
+
+def init_app(app) -> None:
+    """Register SQLALCHEMY_REPLICA_URIS as binds; call before db.init_app."""
+    uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    keys = []
+    for i, uri in enumerate(uris):
+        keys.append(f"replica_{i}")
+        binds[keys[-1]] = uri
+    app.config["SQLALCHEMY_BINDS"] = binds
+    if not keys:
+        app.extensions[_EXT_KEY] = None
+        return
+    sticky = app.config.get("SQLALCHEMY_REPLICA_STICKY_SECONDS", DEFAULT_STICKY_SECONDS)
+    app.extensions[_EXT_KEY] = ReplicaRouter(keys, sticky)
+    app.after_request(_stick_to_primary)
@@ -1,5 +1,8 @@
 from typing import Dict, Any
 from part3.persistence.sql_repository import SQLAlchemyRepository  # SQLAlchemy-backed user repo
+from part3.persistence import sql_amenity_repository as amenity_repo
+from part3.persistence import sql_place_repository as place_repo
+from part3.persistence import sql_review_repository as review_repo
 
 
 class Facade:
@@ -21,9 +24,9 @@ class Facade:
         """Create a new user in the database."""
         return self.repo.create_user(payload)
 
-    def list_users(self):
-        """Return all users."""
-        return self.repo.list_users()
+    def list_users(self, limit=None, cursor=None, email_prefix=None):
+        """Return one page of users (optionally those whose email starts with email_prefix)."""
+        return self.repo.list_users(limit, cursor, email_prefix=email_prefix)
 
     def get_user(self, user_id: str):
         """Return a single user by id."""
@@ -37,3 +40,46 @@ class Facade:
         """Delete a user by id."""
         return self.repo.delete_user(user_id)
 
+    def user_is_admin(self, user_id: str):
+        """DB admin flag of a user (None if the user is missing)."""
+        return self.repo.user_is_admin(user_id)
+
+    def replace_password_hash(self, user_id: str, old_hash: str, new_hash: str) -> bool:
+        """Compare-and-set a user's password hash (used by rehash-on-login)."""
+        return self.repo.replace_password_hash(user_id, old_hash, new_hash)
+
+    def user_version(self, user_id: str):
+        """Version tag of a user for ETags (None if missing)."""
+        return self.repo.user_version(user_id)
+
+    def list_user_places(self, user_id: str, limit=None, cursor=None):
+        """One page of the places a user owns (None if the user is missing)."""
+        return place_repo.list_owner_places(user_id, limit=limit, cursor=cursor)
+
+    def list_user_reviews(self, user_id: str, limit=None, cursor=None):
+        """One page of the reviews a user wrote (None if the user is missing)."""
+        return review_repo.list_user_reviews(user_id, limit=limit, cursor=cursor)
+
+    def list_amenities(self):
+        """Return all amenities."""
+        return amenity_repo.list_amenities()
+
+    def get_amenity(self, amenity_id: str):
+        """Return a single amenity by id."""
+        return amenity_repo.get_amenity(amenity_id)
+
+    def amenity_version(self, amenity_id: str):
+        """Version tag of an amenity for ETags (None if missing)."""
+        return amenity_repo.amenity_version(amenity_id)
+
+    def create_amenity(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an amenity."""
+        return amenity_repo.create_amenity(payload)
+
+    def update_amenity(self, amenity_id: str, updates: Dict[str, Any]):
+        """Rename an amenity."""
+        return amenity_repo.update_amenity(amenity_id, updates)
+
+    def delete_amenity(self, amenity_id: str) -> bool:
+        """Delete an amenity by id."""
+        return amenity_repo.delete_amenity(amenity_id)
@@ -1,5 +1,6 @@
 from uuid import uuid4
 from datetime import datetime
+from sqlalchemy import DDL, event
 from part3.app.extensions import db
 
 def _uuid() -> str:
@@ -8,13 +9,26 @@ def _uuid() -> str:
 def _utcnow() -> datetime:
     return datetime.utcnow()
 
+def normalize_email(email: str) -> str:
+    """The form emails are compared in: login, signup and uniqueness all use it."""
+    return (email or "").strip().lower()
+
+def _email_normalized_default(context) -> str:
+    # rows inserted without it (bulk inserts, fixtures) derive it from email
+    return normalize_email(context.get_current_parameters()["email"])
+
 
 place_amenities = db.Table(
     "place_amenities",
-    db.Column("place_id",  db.String(36), db.ForeignKey("places.id"), primary_key=True),
-    db.Column("amenity_id", db.String(36), db.ForeignKey("amenities.id"), primary_key=True),
+    db.Column("place_id",  db.String(36), db.ForeignKey("places.id", ondelete="CASCADE"), primary_key=True),
+    db.Column("amenity_id", db.String(36), db.ForeignKey("amenities.id", ondelete="CASCADE"), primary_key=True),
 )
 
+# Relationships stay lazy (one SELECT on first access). Queries that need
+# related rows opt in through part3/persistence/loader_profiles.py.
+# Deletes cascade in the database (ON DELETE CASCADE, SQLite foreign_keys=ON);
+# passive_deletes keeps the ORM from loading children just to delete them.
+
 class TimestampMixin(db.Model):
     __abstract__ = True
     created_at = db.Column(db.DateTime, default=_utcnow, nullable=False)
@@ -22,20 +36,38 @@ class TimestampMixin(db.Model):
 
 class User(TimestampMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        # keyset pagination for GET /users/ walks (created_at, id)
+        db.Index("ix_users_created_at_id", "created_at", "id"),
+        # login and the duplicate check probe this; email keeps a plain index
+        db.Index("uq_users_email_normalized", "email_normalized", unique=True),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=_uuid)
     first_name = db.Column(db.String, nullable=False)
     last_name = db.Column(db.String, nullable=False)
-    email = db.Column(db.String, unique=True, index=True, nullable=False)
+    email = db.Column(db.String, index=True, nullable=False)
+    email_normalized = db.Column(db.String, nullable=False, default=_email_normalized_default)
     password_hash = db.Column(db.String, nullable=False)
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
 
 
-    places  = db.relationship("Place",  back_populates="owner",  cascade="all, delete-orphan", lazy="selectin")
-    reviews = db.relationship("Review", back_populates="author", cascade="all, delete-orphan", lazy="selectin")
+    places  = db.relationship("Place",  back_populates="owner",  cascade="all, delete-orphan", passive_deletes=True)
+    reviews = db.relationship("Review", back_populates="author", cascade="all, delete-orphan", passive_deletes=True)
 
 class Place(TimestampMixin):
     __tablename__ = "places"
+    __table_args__ = (
+        # keyset pagination for GET /places/ walks (created_at, id)
+        db.Index("ix_places_created_at_id", "created_at", "id"),
+        # ... and GET /users/<id>/places walks one owner's (created_at, id)
+        db.Index("ix_places_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        # city browsing filtered/sorted by price, and global price sort
+        db.Index("ix_places_city_price", "city", "price_per_night"),
+        db.Index("ix_places_price_id", "price_per_night", "id"),
+        # delta refreshes of the in-process amenity bitmaps and KD-tree read recent changes
+        db.Index("ix_places_updated_at", "updated_at"),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=_uuid)
     name = db.Column(db.String, nullable=False)
@@ -44,18 +76,48 @@ class Place(TimestampMixin):
     description = db.Column(db.Text)
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
+    # grid cell of (latitude, longitude), see part3/persistence/geo.py
+    geo_cell = db.Column(db.Integer, index=True)
+
+    # denormalized from reviews; kept by sql_review_repository, repaired by `flask review-stats repair`
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    last_reviewed_at = db.Column(db.DateTime)
 
-    owner_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False, index=True)
-    owner = db.relationship("User", back_populates="places", lazy="selectin")  # optional selectin
+    owner_id = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    owner = db.relationship("User", back_populates="places")
 
     amenities = db.relationship(
         "Amenity",
         secondary=place_amenities,
         back_populates="places",
-        lazy="selectin",
+        passive_deletes=True,
     )
 
-    reviews = db.relationship("Review", back_populates="place", cascade="all, delete-orphan", lazy="selectin")
+    reviews = db.relationship("Review", back_populates="place", cascade="all, delete-orphan", passive_deletes=True)
+
+# Full-text search over place names and descriptions.
+# SQLite: FTS5 external-content table over places.rowid, kept in sync by triggers
+# (run rebuild_search_index() after VACUUM or a table rebuild, which can renumber
+# rowids). MySQL: a FULLTEXT index on the same columns.
+PLACES_FTS_SQLITE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5("
+    "name, description, content='places', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_ai AFTER INSERT ON places BEGIN "
+    "INSERT INTO places_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_ad AFTER DELETE ON places BEGIN "
+    "INSERT INTO places_fts(places_fts, rowid, name, description) "
+    "VALUES ('delete', old.rowid, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_au AFTER UPDATE OF name, description ON places BEGIN "
+    "INSERT INTO places_fts(places_fts, rowid, name, description) "
+    "VALUES ('delete', old.rowid, old.name, old.description); "
+    "INSERT INTO places_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description); END",
+)
+PLACES_FULLTEXT_MYSQL = "ALTER TABLE places ADD FULLTEXT INDEX ft_places_name_description (name, description)"
+
+for _stmt in PLACES_FTS_SQLITE:
+    event.listen(Place.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+event.listen(Place.__table__, "after_create", DDL(PLACES_FULLTEXT_MYSQL).execute_if(dialect="mysql"))
+event.listen(Place.__table__, "before_drop", DDL("DROP TABLE IF EXISTS places_fts").execute_if(dialect="sqlite"))
 
 class Amenity(TimestampMixin):
     __tablename__ = "amenities"
@@ -67,17 +129,40 @@ class Amenity(TimestampMixin):
         "Place",
         secondary=place_amenities,
         back_populates="amenities",
-        lazy="selectin",  # optional selectin
+        passive_deletes=True,
     )
 
 class Review(TimestampMixin):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # GET /places/<id>/reviews walks one place's reviews by (created_at, id)
+        db.Index("ix_reviews_place_id_created_at_id", "place_id", "created_at", "id"),
+        # GET /users/<id>/reviews, same walk per author
+        db.Index("ix_reviews_user_id_created_at_id", "user_id", "created_at", "id"),
+        # one review per user per place, enforced by the database
+        db.Index("uq_reviews_user_place", "user_id", "place_id", unique=True),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=_uuid)
     text = db.Column(db.Text, nullable=False)
 
-    user_id  = db.Column(db.String(36), db.ForeignKey("users.id"),  nullable=False, index=True)
-    place_id = db.Column(db.String(36), db.ForeignKey("places.id"), nullable=False, index=True)
+    user_id  = db.Column(db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"),  nullable=False, index=True)
+    place_id = db.Column(db.String(36), db.ForeignKey("places.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    author = db.relationship("User",  back_populates="reviews")
+    place  = db.relationship("Place", back_populates="reviews")
+
+class RevokedToken(db.Model):
+    """A JWT (by jti) that must no longer be accepted: rotated refresh tokens, logouts.
+
+    token_type "family" rows hold a refresh chain's family id in jti and
+    revoke every token of that chain (a rotated refresh token was reused).
+    """
+    __tablename__ = "revoked_tokens"
 
-    author = db.relationship("User",  back_populates="reviews", lazy="selectin")  # optional selectin
-    place  = db.relationship("Place", back_populates="reviews", lazy="selectin")  # optional selectin
+    jti = db.Column(db.String(36), primary_key=True)
+    token_type = db.Column(db.String(10), nullable=False)
+    # no FK: the row must outlive a deleted user until the token expires
+    user_id = db.Column(db.String(36), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=_utcnow, nullable=False, index=True)
@@ -0,0 +1,268 @@
+"""In-process per-amenity bitmaps for "has ALL of these amenities" filters.
+
+Every place that has at least one amenity gets a small integer ordinal; each
+amenity keeps a Python int used as a bitset over those ordinals. An AND
+filter is a chain of big-int ``&`` operations (done in C, word at a time)
+and a facet count is ``(bitmap & other).bit_count()``.
+
+Like the KD-tree in spatial_index, one index lives per Flask app
+(``app.extensions["amenity_bitmaps"]``), is built from place_amenities on
+first use and is then kept in step by the place repository write paths.
+
+Writes made by other processes are pulled in like revocation.py does it:
+at most every AMENITY_INDEX_REFRESH_SECONDS a lookup re-reads the links of
+places whose updated_at moved (every amenity write bumps it), then compares
+the place_amenities row count with the bits set here; a mismatch (a place
+or amenity deleted elsewhere) reloads the whole index. Another process's
+write therefore shows up in filters and facets within that interval.
+"""
+from __future__ import annotations
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import current_app
+from sqlalchemy import func, select
+
+_EXT_KEY = "amenity_bitmaps"
+_build_lock = threading.Lock()
+
+DEFAULT_REFRESH_SECONDS = 5
+# re-read this far behind the newest updated_at seen (slow commits, clock skew between hosts)
+_DELTA_OVERLAP = timedelta(seconds=30)
+
+
+class AmenityBitmaps:
+    def __init__(self, links: Iterable[Tuple[str, str]] = (), refresh_seconds: float = DEFAULT_REFRESH_SECONDS):
+        self._lock = threading.RLock()
+        self.refresh_seconds = refresh_seconds
+        self.synced_to: Optional[datetime] = None  # newest places.updated_at loaded
+        self._refresh_lock = threading.Lock()
+        self._checked_at = 0.0  # time.monotonic() of the last delta query
+        self._load(links)
+
+    def _load(self, links: Iterable[Tuple[str, str]]) -> None:
+        self._ordinals: Dict[str, int] = {}
+        self._place_ids: List[Optional[str]] = []  # ordinal -> place id (None once deleted)
+        self._bitmaps: Dict[str, int] = {}
+        for place_id, amenity_id in links:
+            self._set_bit(place_id, amenity_id)
+
+    def _ordinal(self, place_id: str) -> int:
+        ordinal = self._ordinals.get(place_id)
+        if ordinal is None:
+            ordinal = len(self._place_ids)
+            self._place_ids.append(place_id)
+            self._ordinals[place_id] = ordinal
+        return ordinal
+
+    def _set_bit(self, place_id: str, amenity_id: str) -> None:
+        bit = 1 << self._ordinal(place_id)
+        self._bitmaps[amenity_id] = self._bitmaps.get(amenity_id, 0) | bit
+
+    def add(self, place_id: str, amenity_id: str) -> None:
+        with self._lock:
+            self._set_bit(place_id, amenity_id)
+
+    def discard(self, place_id: str, amenity_id: str) -> None:
+        with self._lock:
+            ordinal = self._ordinals.get(place_id)
+            if ordinal is not None and amenity_id in self._bitmaps:
+                self._bitmaps[amenity_id] &= ~(1 << ordinal)
+
+    def set_place(self, place_id: str, amenity_ids: Iterable[str]) -> None:
+        """Replace the place's amenity set."""
+        with self._lock:
+            self._clear_place(place_id)
+            for amenity_id in amenity_ids:
+                self._set_bit(place_id, amenity_id)
+
+    def _clear_place(self, place_id: str) -> Optional[int]:
+        ordinal = self._ordinals.get(place_id)
+        if ordinal is not None:
+            mask = ~(1 << ordinal)
+            for amenity_id, bitmap in self._bitmaps.items():
+                self._bitmaps[amenity_id] = bitmap & mask
+        return ordinal
+
+    def remove_place(self, place_id: str) -> None:
+        with self._lock:
+            ordinal = self._clear_place(place_id)
+            if ordinal is not None:
+                # ordinals are never reused; the slot just goes dark
+                del self._ordinals[place_id]
+                self._place_ids[ordinal] = None
+
+    def remove_amenity(self, amenity_id: str) -> None:
+        with self._lock:
+            self._bitmaps.pop(amenity_id, None)
+
+    def match(self, amenity_ids: Sequence[str]) -> int:
+        """Bitmap of places that have every amenity in amenity_ids."""
+        with self._lock:
+            result = None
+            for amenity_id in set(amenity_ids):
+                bitmap = self._bitmaps.get(amenity_id, 0)
+                result = bitmap if result is None else result & bitmap
+                if not result:
+                    return 0
+            return result or 0
+
+    def facets(self, bitmap: int) -> Dict[str, int]:
+        """For each amenity, how many places in bitmap also have it (zeros left out)."""
+        with self._lock:
+            counts = {aid: (bm & bitmap).bit_count() for aid, bm in self._bitmaps.items()}
+        return {aid: n for aid, n in counts.items() if n}
+
+    def bitmap_of(self, place_ids: Iterable[str]) -> int:
+        """Bitmap of the given places (those without amenities have no bit and are left out)."""
+        bitmap = 0
+        with self._lock:
+            for place_id in place_ids:
+                ordinal = self._ordinals.get(place_id)
+                if ordinal is not None:
+                    bitmap |= 1 << ordinal
+        return bitmap
+
+    def link_count(self) -> int:
+        """Number of (place, amenity) links held, to compare with place_amenities."""
+        with self._lock:
+            return sum(bitmap.bit_count() for bitmap in self._bitmaps.values())
+
+    def refresh(self, force: bool = False) -> None:
+        """Pull other processes' amenity writes (reloading everything if rows went missing)."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_seconds:
+            return
+        with self._refresh_lock:
+            if not force and now - self._checked_at < self.refresh_seconds:
+                return
+            self._checked_at = now
+            if self.synced_to is None:
+                self._reload()
+                return
+            touched, links = _links_since(self.synced_to - _DELTA_OVERLAP)
+            by_place: Dict[str, List[str]] = {place_id: [] for place_id, _ in touched}
+            for place_id, amenity_id in links:
+                by_place.setdefault(place_id, []).append(amenity_id)
+            for place_id, amenity_ids in by_place.items():
+                self.set_place(place_id, amenity_ids)
+            for _, updated_at in touched:
+                if updated_at > self.synced_to:
+                    self.synced_to = updated_at
+            # deletes leave no updated_at behind: count them instead
+            if _link_total() != self.link_count():
+                self._reload()
+
+    def _reload(self) -> None:
+        synced_to, links = _all_links()
+        with self._lock:
+            self._load(links)
+            self.synced_to = synced_to
+
+    def place_ids(self, bitmap: int) -> List[str]:
+        ids = []
+        with self._lock:
+            while bitmap:
+                low = bitmap & -bitmap
+                place_id = self._place_ids[low.bit_length() - 1]
+                if place_id is not None:
+                    ids.append(place_id)
+                bitmap ^= low
+        return ids
+
+
+# The queries below run on the primary: the bitmaps are kept in step by write
+# hooks, so a lagging replica would undo this process's own writes.
+
+def _all_links() -> Tuple[Optional[datetime], List[Tuple[str, str]]]:
+    """(newest places.updated_at, every link), the watermark read first so no write slips between."""
+    # local imports: models pull in the app extensions
+    from part3.app.extensions import db
+    from part3.app.replicas import on_primary
+    from part3.models import Place, place_amenities
+
+    with on_primary():
+        synced_to = db.session.query(func.max(Place.updated_at)).scalar()
+        links = db.session.execute(
+            place_amenities.select().order_by(place_amenities.c.place_id)
+        ).all()
+    return synced_to, [(row.place_id, row.amenity_id) for row in links]
+
+
+def _links_since(since: datetime):
+    """Places updated since ``since`` as (id, updated_at), and their current links."""
+    from part3.app.extensions import db
+    from part3.app.replicas import on_primary
+    from part3.models import Place, place_amenities
+
+    with on_primary():
+        touched = db.session.query(Place.id, Place.updated_at).filter(Place.updated_at >= since).all()
+        links = db.session.execute(
+            select(place_amenities.c.place_id, place_amenities.c.amenity_id).where(
+                place_amenities.c.place_id.in_(select(Place.id).where(Place.updated_at >= since))
+            )
+        ).all()
+    return touched, links
+
+
+def _link_total() -> int:
+    from part3.app.extensions import db
+    from part3.app.replicas import on_primary
+    from part3.models import place_amenities
+
+    with on_primary():
+        return db.session.query(func.count()).select_from(place_amenities).scalar()
+
+
+def _loaded() -> Optional[AmenityBitmaps]:
+    return current_app.extensions.get(_EXT_KEY)
+
+
+def get_index() -> AmenityBitmaps:
+    """The app's bitmaps, built from place_amenities on first use and refreshed on the way out."""
+    index = _loaded()
+    if index is not None:
+        index.refresh()
+        return index
+    with _build_lock:
+        index = _loaded()
+        if index is None:
+            index = AmenityBitmaps(
+                refresh_seconds=current_app.config.get("AMENITY_INDEX_REFRESH_SECONDS", DEFAULT_REFRESH_SECONDS)
+            )
+            index.refresh(force=True)
+            current_app.extensions[_EXT_KEY] = index
+    return index
+
+
+def amenity_added(place_id: str, amenity_id: str) -> None:
+    index = _loaded()
+    if index is not None:
+        index.add(place_id, amenity_id)
+
+
+def amenity_removed(place_id: str, amenity_id: str) -> None:
+    index = _loaded()
+    if index is not None:
+        index.discard(place_id, amenity_id)
+
+
+def amenities_set(place_id: str, amenity_ids: Iterable[str]) -> None:
+    index = _loaded()
+    if index is not None:
+        index.set_place(place_id, amenity_ids)
+
+
+def places_deleted(place_ids: Iterable[str]) -> None:
+    index = _loaded()
+    if index is not None:
+        for place_id in place_ids:
+            index.remove_place(place_id)
+
+
+def amenity_deleted(amenity_id: str) -> None:
+    index = _loaded()
+    if index is not None:
+        index.remove_amenity(amenity_id)
@@ -0,0 +1,185 @@
+"""Read-through cache of entity dicts (places, users, reviews) keyed by id.
+
+get_place, get_user and get_review go through read_through(): a hit skips
+the database, a miss loads the row and stores its dict. Every repository
+write that changes one of those dicts calls invalidate() after its commit,
+including the rows removed by ON DELETE CASCADE and the places whose review
+counters move. Missing rows are never cached.
+
+The backend is pluggable. The default LRUCache lives in this process (one
+per Flask app, ``app.extensions["entity_cache"]``), so writes made by other
+processes show up only after ENTITY_CACHE_TTL_SECONDS; the same bound covers
+a read that races a write, or one served by a lagging replica. Such a read
+may store a stale entry right after a write dropped it, so requests that
+must see their own writes (writes and sticky reads, see app/replicas.py)
+skip the lookup and load from the primary, refreshing the entry. Anything
+implementing EntityCache, e.g. over Redis, can be plugged in through
+ENTITY_CACHE_BACKEND to share one cache between processes.
+
+Config:
+    ENTITY_CACHE_SIZE         max cached entities per process; 0 disables the cache
+    ENTITY_CACHE_TTL_SECONDS  how long an entry may be served
+    ENTITY_CACHE_BACKEND      optional callable(app) -> EntityCache replacing the LRU
+"""
+from __future__ import annotations
+import copy
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from flask import current_app
+
+from part3.app.replicas import reads_own_writes
+
+_EXT_KEY = "entity_cache"
+
+DEFAULT_TTL_SECONDS = 30
+
+
+class EntityCache(ABC):
+    """What the repositories need from a cache backend.
+
+    Values are plain JSON-able dicts; keys are "<kind>:<id>" strings. A
+    backend missing one of the abstract methods fails when init_app
+    instantiates it, not at its first use inside a request.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class LRUCache(EntityCache):
+    """Thread-safe in-process LRU whose entries also expire after ttl seconds."""
+
+    def __init__(self, max_size: int, ttl: float = DEFAULT_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # copies both ways: callers may add keys to the dicts they get
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def init_app(app) -> None:
+    backend = app.config.get("ENTITY_CACHE_BACKEND")
+    size = app.config.setdefault("ENTITY_CACHE_SIZE", 0)
+    if backend is not None:
+        app.extensions[_EXT_KEY] = backend(app)
+    elif size:
+        ttl = app.config.setdefault("ENTITY_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+        app.extensions[_EXT_KEY] = LRUCache(size, ttl)
+    else:
+        app.extensions[_EXT_KEY] = None
+
+
+def _cache() -> Optional[EntityCache]:
+    return current_app.extensions.get(_EXT_KEY)
+
+
+def enabled() -> bool:
+    """False when caching is off, so writers can skip collecting ids to invalidate."""
+    return _cache() is not None
+
+
+def _key(kind: str, entity_id: str) -> str:
+    return f"{kind}:{entity_id}"
+
+
+def read_through(kind: str, entity_id: str, load: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """The cached dict for kind/entity_id, else load() (cached unless None)."""
+    cache = _cache()
+    if cache is None:
+        return load()
+    key = _key(kind, entity_id)
+    # a replica read may have cached what this request just overwrote
+    value = None if reads_own_writes() else cache.get(key)
+    if value is None:
+        value = load()
+        if value is not None:
+            cache.set(key, value)
+    return value
+
+
+def invalidate(kind: str, entity_ids: Iterable[str]) -> None:
+    """Drop the given entities; call after the write has committed."""
+    cache = _cache()
+    if cache is not None:
+        cache.delete_many([_key(kind, entity_id) for entity_id in entity_ids])
+
+
+def clear() -> None:
+    """Drop everything (writes touching an unknown set of rows)."""
+    cache = _cache()
+    if cache is not None:
+        cache.clear()
+
+
+def cache_stats() -> Optional[Dict[str, Any]]:
+    """The current app's cache counters, or None when the cache is off."""
+    cache = _cache()
+    return cache.stats() if cache is not None else None
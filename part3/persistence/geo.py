@@ -0,0 +1,118 @@
+"""Grid-cell spatial helpers for place lookups by coordinates.
+
+The globe is cut into CELL_DEG x CELL_DEG cells numbered row by row, so every
+place gets one integer ``geo_cell`` that a plain B-tree index can serve on both
+SQLite and MySQL. A box on the map becomes one ``BETWEEN`` range per cell row;
+exact distances are only computed for rows inside those ranges.
+"""
+from __future__ import annotations
+import math
+from typing import List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+CELL_DEG = 0.1                               # ~11 km of latitude per cell
+LNG_CELLS = int(round(360 / CELL_DEG)) + 1   # columns per row, +1 for lng == 180
+LAT_CELLS = int(round(180 / CELL_DEG)) + 1
+MAX_RADIUS_KM = 500.0
+# OR'ed BETWEENs per box. SQLite parses an OR chain as a tree as deep as it is
+# long and caps expression depth at 1000; a max-radius circle needs at most
+# ~2 ranges per row (~182), so only bboxes taller than ~50 degrees get coarsened.
+MAX_CELL_RANGES = 512
+
+Box = Tuple[float, float, float, float]  # (min_lat, min_lng, max_lat, max_lng)
+
+
+def _row(lat: float) -> int:
+    return min(max(int(math.floor((lat + 90.0) / CELL_DEG)), 0), LAT_CELLS - 1)
+
+
+def _col(lng: float) -> int:
+    return min(max(int(math.floor((lng + 180.0) / CELL_DEG)), 0), LNG_CELLS - 1)
+
+
+def valid_point(lat, lng) -> bool:
+    return (
+        isinstance(lat, (int, float)) and isinstance(lng, (int, float))
+        and -90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0
+    )
+
+
+def cell_for(lat: Optional[float], lng: Optional[float]) -> Optional[int]:
+    """Cell number for a coordinate pair, or None when either is missing/out of range."""
+    if lat is None or lng is None or not valid_point(lat, lng):
+        return None
+    return _row(lat) * LNG_CELLS + _col(lng)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_box(lat: float, lng: float, radius_km: float) -> Box:
+    """Smallest lat/lng box holding the circle; lng may run past +/-180."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        # circle covers a pole: every longitude is in play
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    dlng = math.degrees(
+        math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat))))
+    )
+    return min_lat, lng - dlng, max_lat, lng + dlng
+
+
+def _lng_spans(min_lng: float, max_lng: float) -> List[Tuple[float, float]]:
+    """Split a longitude span that wraps the antimeridian into plain spans."""
+    if max_lng - min_lng >= 360.0:
+        return [(-180.0, 180.0)]
+    if min_lng < -180.0:
+        return [(min_lng + 360.0, 180.0), (-180.0, max_lng)]
+    if max_lng > 180.0:
+        return [(min_lng, 180.0), (-180.0, max_lng - 360.0)]
+    if min_lng > max_lng:
+        # bbox given across the antimeridian, e.g. 170 .. -170
+        return [(min_lng, 180.0), (-180.0, max_lng)]
+    return [(min_lng, max_lng)]
+
+
+def lng_spans(box: Box) -> List[Tuple[float, float]]:
+    return _lng_spans(box[1], box[3])
+
+
+def cell_ranges(box: Box) -> List[Tuple[int, int]]:
+    """Inclusive geo_cell ranges covering the box, one per (row, lng span).
+
+    Ranges that touch (full-width rows, spans meeting across the
+    antimeridian) are merged. Past MAX_CELL_RANGES the box is very tall:
+    neighbouring ranges are coarsened into one, bridging the smallest gaps
+    first, until MAX_CELL_RANGES remain. The bridged cells are extra index
+    reads that the exact lat/lng bounds then trim.
+    """
+    min_lat, _, max_lat, _ = box
+    spans = sorted((_col(lo), _col(hi)) for lo, hi in lng_spans(box))
+    ranges: List[Tuple[int, int]] = []
+    for row in range(_row(min_lat), _row(max_lat) + 1):
+        base = row * LNG_CELLS
+        for lo, hi in spans:
+            if ranges and base + lo <= ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], base + hi))
+            else:
+                ranges.append((base + lo, base + hi))
+    if len(ranges) > MAX_CELL_RANGES:
+        ranges = _coarsen(ranges, MAX_CELL_RANGES)
+    return ranges
+
+
+def _coarsen(ranges: List[Tuple[int, int]], limit: int) -> List[Tuple[int, int]]:
+    """Merge sorted ranges down to ``limit``, keeping the limit - 1 widest gaps as breaks."""
+    gaps = sorted(range(len(ranges) - 1), key=lambda i: ranges[i + 1][0] - ranges[i][1], reverse=True)
+    breaks = sorted(gaps[:limit - 1])
+    merged, start = [], 0
+    for i in breaks + [len(ranges) - 1]:
+        merged.append((ranges[start][0], ranges[i][1]))
+        start = i + 1
+    return merged
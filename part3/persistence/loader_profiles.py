@@ -0,0 +1,34 @@
+"""Named eager-loading profiles for the SQL repositories.
+
+Every relationship in part3/models is lazy by default. A repository function
+that knows which related rows it will serialize picks one profile here and
+passes it as query/session.get options, so the number of SQL statements per
+call is fixed and does not follow the object graph.
+"""
+from __future__ import annotations
+from typing import Any, List
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from part3.models import Amenity, Place
+
+
+def _place_card() -> List[Any]:
+    # listing cards only need amenity ids: one extra SELECT on the link table
+    return [selectinload(Place.amenities).load_only(Amenity.id)]
+
+
+def _place_detail() -> List[Any]:
+    # single place view: owner joined into the main SELECT
+    return _place_card() + [joinedload(Place.owner)]
+
+
+PROFILES = {
+    "place_card": _place_card,
+    "place_detail": _place_detail,
+}
+
+
+def options(profile: str) -> List[Any]:
+    """Loader options for a named profile (KeyError for unknown names)."""
+    return PROFILES[profile]()
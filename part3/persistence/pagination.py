@@ -0,0 +1,98 @@
+"""Keyset (cursor) pagination helpers shared by the SQL repositories.
+
+A cursor is the sort key of the last row on a page (plus the id tie-breaker),
+packed as url-safe base64 JSON so clients treat it as an opaque string.
+Each page is one ``WHERE key > cursor ORDER BY key LIMIT n`` probe, so deep
+pages cost the same as the first one.
+"""
+from __future__ import annotations
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Fall back to the default page size and cap it at MAX_LIMIT."""
+    if not limit or limit <= 0:
+        return DEFAULT_LIMIT
+    return min(limit, MAX_LIMIT)
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value: Any) -> Any:
+    # only what _dump writes: anything else would reach the keyset comparison
+    if isinstance(value, dict) and value.keys() == {"dt"} and isinstance(value["dt"], str):
+        return datetime.fromisoformat(value["dt"])
+    if isinstance(value, str) or (isinstance(value, int) and not isinstance(value, bool)):
+        return value
+    if isinstance(value, float) and math.isfinite(value):
+        return value
+    raise ValueError("invalid_cursor")
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """Unpack a cursor made by encode_cursor; raise ValueError if it is not ours."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ValueError("invalid_cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("invalid_cursor")
+    try:
+        return [_load(v) for v in values]
+    except (TypeError, ValueError):
+        raise ValueError("invalid_cursor")
+
+
+def after(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """Row-value comparison ``(c1, c2, ...) > (v1, v2, ...)`` spelled out with OR/AND.
+
+    Expanded form instead of ``tuple_()`` so SQLite and MySQL both turn it
+    into a range scan on the matching composite index.
+    """
+    clauses = []
+    for i, col in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        step = col < values[i] if descending else col > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def paginate(query, columns: Sequence[Any], *, limit: Optional[int] = None,
+             cursor: Optional[str] = None, descending: bool = False) -> Tuple[list, Optional[str]]:
+    """Run one keyset page of ``query`` ordered by ``columns``.
+
+    ``columns`` must end with a unique column (the id) so the order is total.
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    size = clamp_limit(limit)
+    if cursor:
+        query = query.filter(after(columns, decode_cursor(cursor, len(columns)), descending))
+    order = [c.desc() if descending else c.asc() for c in columns]
+    rows = query.order_by(*order).limit(size + 1).all()
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(*[getattr(last, c.key) for c in columns])
+    return rows, next_cursor
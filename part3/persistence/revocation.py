@@ -0,0 +1,169 @@
+"""In-process Bloom filter over revoked JWT ids (jti).
+
+Every @jwt_required() call asks "is this jti revoked?". The revoked_tokens
+table holds the answer, but a query per request would put the database on
+every protected route. Instead each process keeps a Bloom filter of the
+revoked jtis:
+
+* not in the filter -> certainly not revoked, answered without the database
+  (the common case);
+* in the filter -> probably revoked, confirmed with one primary-key lookup,
+  which weeds out false positives (about 1 in 1000 at the sizing below).
+
+Like the indexes in spatial_index and amenity_index, one filter lives per
+Flask app (``app.extensions["token_bloom"]``) and is built on first use.
+Revocations made by this process are added at once; rows written by other
+processes are pulled in by a delta query on revoked_at at most every
+JWT_REVOCATION_REFRESH_SECONDS, which bounds how long another process may
+keep accepting a token after its logout.
+"""
+from __future__ import annotations
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from flask import current_app
+
+_EXT_KEY = "token_bloom"
+_build_lock = threading.Lock()
+
+DEFAULT_CAPACITY = 100_000
+FALSE_POSITIVE_RATE = 0.001
+DEFAULT_REFRESH_SECONDS = 5
+# re-read this far behind the newest revoked_at seen: a slow commit (or
+# another host's clock) can land a row slightly in the past
+_DELTA_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, sized for capacity at FALSE_POSITIVE_RATE."""
+
+    def __init__(self, capacity: int, error_rate: float = FALSE_POSITIVE_RATE):
+        self.capacity = max(1, capacity)
+        self._bits_total = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._bits_total / self.capacity * math.log(2)))
+        self._bits = bytearray((self._bits_total + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % self._bits_total
+
+    def add(self, item: str) -> None:
+        # count distinct items only: delta refreshes re-read the overlap window,
+        # and an item already present sets no new bit
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self._bits[pos >> 3] & mask:
+                self._bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationFilter:
+    """A BloomFilter plus the bookkeeping for delta refreshes from revoked_tokens."""
+
+    def __init__(self, capacity: int, refresh_seconds: float):
+        self._lock = threading.Lock()
+        self._capacity = capacity
+        self.refresh_seconds = refresh_seconds
+        self.bloom = BloomFilter(capacity)
+        self.synced_to: Optional[datetime] = None  # newest revoked_at loaded
+        self._checked_at = 0.0  # time.monotonic() of the last delta query
+
+    def add(self, jtis: Iterable[str]) -> None:
+        with self._lock:
+            for jti in jtis:
+                self.bloom.add(jti)
+
+    def refresh(self, force: bool = False) -> None:
+        """Pull rows revoked since the last refresh (rebuilding if the filter is full)."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if not force and now - self._checked_at < self.refresh_seconds:
+                return
+            self._checked_at = now
+            rows = _revoked_rows(self.synced_to - _DELTA_OVERLAP if self.synced_to else None)
+            if self.bloom.count + len(rows) > self.bloom.capacity:
+                # past capacity the error rate climbs: start over from live (unexpired) rows
+                rows = _revoked_rows(None)
+                self.bloom = BloomFilter(max(self._capacity, 2 * len(rows)))
+            for jti, revoked_at in rows:
+                self.bloom.add(jti)
+                if self.synced_to is None or revoked_at > self.synced_to:
+                    self.synced_to = revoked_at
+
+    def might_contain(self, jti: str) -> bool:
+        return jti in self.bloom
+
+
+def _revoked_rows(since: Optional[datetime]):
+    # local imports: models pull in the app extensions
+    from part3.app.extensions import db
+    from part3.app.replicas import on_primary
+    from part3.models import RevokedToken, _utcnow
+
+    query = db.session.query(RevokedToken.jti, RevokedToken.revoked_at).filter(
+        RevokedToken.expires_at > _utcnow()
+    )
+    if since is not None:
+        query = query.filter(RevokedToken.revoked_at >= since)
+    # a replica's lag would let a logged-out token through
+    with on_primary():
+        return query.all()
+
+
+def _loaded() -> Optional[RevocationFilter]:
+    return current_app.extensions.get(_EXT_KEY)
+
+
+def get_filter() -> RevocationFilter:
+    """The app's filter, loaded from revoked_tokens on first use."""
+    bloom = _loaded()
+    if bloom is not None:
+        return bloom
+    with _build_lock:
+        bloom = _loaded()
+        if bloom is None:
+            bloom = RevocationFilter(
+                current_app.config.get("JWT_REVOCATION_BLOOM_CAPACITY", DEFAULT_CAPACITY),
+                current_app.config.get("JWT_REVOCATION_REFRESH_SECONDS", DEFAULT_REFRESH_SECONDS),
+            )
+            bloom.refresh(force=True)
+            current_app.extensions[_EXT_KEY] = bloom
+    return bloom
+
+
+def is_revoked(jti: str) -> bool:
+    """Bloom check first; only a (probable) hit costs a primary-key lookup."""
+    bloom = get_filter()
+    bloom.refresh()
+    if not bloom.might_contain(jti):
+        return False
+    from part3.app.extensions import db
+    from part3.app.replicas import on_primary
+    from part3.models import RevokedToken
+
+    with on_primary():
+        return db.session.query(RevokedToken.jti).filter(RevokedToken.jti == jti).first() is not None
+
+
+def token_revoked(jti: str) -> None:
+    """Write-path hook: this process sees its own revocations immediately."""
+    bloom = _loaded()
+    if bloom is not None:
+        bloom.add([jti])
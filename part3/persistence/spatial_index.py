@@ -0,0 +1,386 @@
+"""In-process KD-tree over place coordinates for k-nearest-neighbour lookups.
+
+Points are stored as 3-D unit vectors, so straight-line (chord) distance in
+the tree orders places exactly like great-circle distance, with no special
+cases at the poles or the antimeridian.
+
+One tree lives per Flask app (``app.extensions["place_kdtree"]``, a
+SpatialIndex). With SPATIAL_INDEX_PRELOAD it is built from the places table
+in a background thread as the app starts; a k-nearest query that arrives
+before the build is done waits for it. From then on the place write paths
+keep it in step through ``place_saved``/``places_deleted``.
+
+Builds never run on the request path or under a write: a full rebuild
+(after many changes, or a reload) is made off the tree's lock from a
+snapshot, writes arriving meanwhile are journaled and replayed, and the
+new tree is swapped in.
+
+Each worker process holds its own copy. Other processes' writes are pulled
+in by a background delta refresh at most every SPATIAL_INDEX_REFRESH_SECONDS
+(places whose updated_at moved), and a place count that no longer matches
+(a delete elsewhere) triggers a background reload, so they show up within
+about that interval.
+"""
+from __future__ import annotations
+import heapq
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import func
+
+from part3.persistence.geo import EARTH_RADIUS_KM
+
+_EXT_KEY = "place_kdtree"
+
+DEFAULT_REFRESH_SECONDS = 5
+# re-read this far behind the newest updated_at seen (slow commits, clock skew between hosts)
+_DELTA_OVERLAP = timedelta(seconds=30)
+
+# node layout: [x, y, z, place_id, axis, left, right, alive]
+_X, _Y, _Z, _ID, _AXIS, _LEFT, _RIGHT, _ALIVE = range(8)
+
+Unit = Tuple[str, float, float, float]  # (place_id, x, y, z)
+
+
+def _unit(lat: float, lng: float) -> Tuple[float, float, float]:
+    p, l = math.radians(lat), math.radians(lng)
+    c = math.cos(p)
+    return c * math.cos(l), c * math.sin(l), math.sin(p)
+
+
+def _chord_to_km(chord_sq: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_sq) / 2))
+
+
+class PlaceKDTree:
+    """KD-tree with incremental insert and tombstone delete.
+
+    Inserts hang new leaves off the existing tree; deletes only mark nodes.
+    Once the number of changes since the last build exceeds the built size,
+    a background thread rebuilds it balanced from its live points (see
+    rebuild); queries and writes carry on against the current tree meanwhile.
+    """
+
+    def __init__(self, points: Iterable[Tuple[str, float, float]] = ()):
+        self._lock = threading.RLock()
+        self._nodes = {}
+        self._root = None
+        self._changes = 0
+        self._built_size = 0
+        self._journal: Optional[list] = None  # writes made while a rebuild runs
+        self._rebuild_thread: Optional[threading.Thread] = None
+        self._build([(pid, *_unit(lat, lng)) for pid, lat, lng in points])
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _build(self, items: List[Unit]) -> None:
+        self._nodes = {}
+
+        def build(lo: int, hi: int, axis: int):
+            if lo >= hi:
+                return None
+            part = items[lo:hi]
+            part.sort(key=lambda it: it[axis + 1])
+            items[lo:hi] = part
+            mid = (lo + hi) // 2
+            pid, x, y, z = items[mid]
+            node = [x, y, z, pid, axis, None, None, True]
+            self._nodes[pid] = node
+            nxt = (axis + 1) % 3
+            node[_LEFT] = build(lo, mid, nxt)
+            node[_RIGHT] = build(mid + 1, hi, nxt)
+            return node
+
+        self._root = build(0, len(items), 0)
+        self._changes = 0
+        self._built_size = len(items)
+
+    def _maybe_rebuild(self) -> None:
+        # caller holds the lock
+        if self._journal is None and self._changes > max(64, self._built_size):
+            self._journal = []
+            self._rebuild_thread = threading.Thread(
+                target=self._finish_rebuild, args=(self._live_units,), name="place-kdtree-rebuild", daemon=True
+            )
+            self._rebuild_thread.start()
+
+    def _live_units(self) -> List[Unit]:
+        with self._lock:
+            return [(n[_ID], n[_X], n[_Y], n[_Z]) for n in self._nodes.values()]
+
+    def rebuild(self, load: Callable[[], List[Unit]]) -> bool:
+        """Replace the tree with a balanced one over load(), in the calling thread.
+
+        load() and the build run outside the lock; writes made meanwhile
+        are journaled and replayed onto the new tree before it is swapped
+        in. False (and nothing done) if another rebuild is running.
+        """
+        with self._lock:
+            if self._journal is not None:
+                return False
+            self._journal = []
+        self._finish_rebuild(load)
+        return True
+
+    def _finish_rebuild(self, load: Callable[[], List[Unit]]) -> None:
+        try:
+            fresh = PlaceKDTree()
+            fresh._build(load())
+        except BaseException:
+            with self._lock:
+                self._journal = None
+            raise
+        with self._lock:
+            for op in self._journal:
+                if op[0] == "insert":
+                    fresh._insert(*op[1:])
+                else:
+                    fresh._discard(op[1])
+            self._root, self._nodes = fresh._root, fresh._nodes
+            self._changes, self._built_size = fresh._changes, fresh._built_size
+            self._journal = None
+
+    def join_rebuild(self, timeout: Optional[float] = None) -> None:
+        """Wait for a background rebuild (tests, benchmarks)."""
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def rebuilding(self) -> bool:
+        return self._journal is not None
+
+    def insert(self, place_id: str, lat: float, lng: float) -> None:
+        """Add or move a place."""
+        with self._lock:
+            self._insert(place_id, lat, lng)
+            if self._journal is not None:
+                self._journal.append(("insert", place_id, lat, lng))
+            self._maybe_rebuild()
+
+    def _insert(self, place_id: str, lat: float, lng: float) -> None:
+        self._discard(place_id)
+        x, y, z = point = _unit(lat, lng)
+        node = [x, y, z, place_id, 0, None, None, True]
+        if self._root is None:
+            self._root = node
+        else:
+            parent = self._root
+            while True:
+                axis = parent[_AXIS]
+                side = _LEFT if point[axis] < parent[axis] else _RIGHT
+                if parent[side] is None:
+                    node[_AXIS] = (axis + 1) % 3
+                    parent[side] = node
+                    break
+                parent = parent[side]
+        self._nodes[place_id] = node
+        self._changes += 1
+
+    def _discard(self, place_id: str) -> bool:
+        node = self._nodes.pop(place_id, None)
+        if node is None:
+            return False
+        node[_ALIVE] = False
+        self._changes += 1
+        return True
+
+    def remove(self, place_id: str) -> None:
+        with self._lock:
+            # journaled even when absent here: the snapshot being rebuilt may still hold it
+            if self._journal is not None:
+                self._journal.append(("remove", place_id))
+            if self._discard(place_id):
+                self._maybe_rebuild()
+
+    def nearest(self, lat: float, lng: float, k: int) -> List[Tuple[float, str]]:
+        """The k closest places as (distance_km, place_id), closest first."""
+        if k <= 0:
+            return []
+        target = _unit(lat, lng)
+        heap: List[Tuple[float, str]] = []  # max-heap of (-chord_sq, id)
+        with self._lock:
+            stack = [(self._root, 0.0)]
+            while stack:
+                node, bound = stack.pop()
+                if node is None or (len(heap) == k and bound >= -heap[0][0]):
+                    continue
+                dx = target[0] - node[_X]
+                dy = target[1] - node[_Y]
+                dz = target[2] - node[_Z]
+                if node[_ALIVE]:
+                    d = dx * dx + dy * dy + dz * dz
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d, node[_ID]))
+                    elif d < -heap[0][0]:
+                        heapq.heapreplace(heap, (-d, node[_ID]))
+                diff = target[node[_AXIS]] - node[node[_AXIS]]
+                near, far = (node[_LEFT], node[_RIGHT]) if diff < 0 else (node[_RIGHT], node[_LEFT])
+                # far side first so the near side is popped (searched) next
+                stack.append((far, max(bound, diff * diff)))
+                stack.append((near, bound))
+        return sorted((_chord_to_km(-d), pid) for d, pid in heap)
+
+
+class SpatialIndex:
+    """An app's PlaceKDTree plus its background load and delta-refresh bookkeeping."""
+
+    def __init__(self, refresh_seconds: float):
+        self.tree = PlaceKDTree()
+        self.refresh_seconds = refresh_seconds
+        self.ready = threading.Event()  # set once the tree holds the places table
+        self.synced_to: Optional[datetime] = None  # newest places.updated_at loaded
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._checked_at = 0.0  # time.monotonic() of the last delta refresh
+
+    def start(self, app, job: Callable[[], None]) -> threading.Thread:
+        """Run job in a background thread under app's context, unless a job is already running."""
+        with self._lock:
+            # a worker copied into a forked child reports not alive
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, args=(app, job), name="place-kdtree", daemon=True)
+                self._worker.start()
+            return self._worker
+
+    def _run(self, app, job: Callable[[], None]) -> None:
+        with app.app_context():
+            try:
+                job()
+            except Exception as exc:
+                # e.g. no places table yet under `flask db upgrade`
+                app.logger.warning("place KD-tree %s failed (%s); retried on next use", job.__name__, exc)
+
+    def load(self) -> None:
+        """(Re)build the tree from the places table."""
+        if self.tree.rebuild(self._places):
+            self.ready.set()
+
+    def sync(self) -> None:
+        """Apply places changed since the last sync; reload if the counts disagree."""
+        if not self.ready.is_set() or self.synced_to is None:
+            self.load()
+            return
+        for place_id, lat, lng, updated_at in _places_since(self.synced_to - _DELTA_OVERLAP):
+            if lat is None or lng is None:
+                self.tree.remove(place_id)
+            else:
+                self.tree.insert(place_id, lat, lng)
+            if updated_at > self.synced_to:
+                self.synced_to = updated_at
+        # deletes leave no updated_at behind: count them instead
+        if _place_total() != len(self.tree):
+            self.load()
+
+    def refresh_later(self, app) -> None:
+        """Start a background sync if one is due."""
+        now = time.monotonic()
+        if now - self._checked_at < self.refresh_seconds:
+            return
+        self._checked_at = now
+        self.start(app, self.sync)
+
+    def _places(self) -> List[Unit]:
+        synced_to, rows = _all_places()
+        self.synced_to = synced_to
+        return [(pid, *_unit(lat, lng)) for pid, lat, lng in rows]
+
+
+# The queries below run on the primary: the tree is kept in step by write
+# hooks, so a lagging replica would undo this process's own writes.
+
+def _all_places():
+    """(newest places.updated_at, every located place), the watermark read first so no write slips between."""
+    # local imports: models pull in the app extensions
+    from part3.app.extensions import db
+    from part3.app.replicas import on_primary
+    from part3.models import Place
+
+    with on_primary():
+        synced_to = db.session.query(func.max(Place.updated_at)).scalar()
+        rows = (
+            db.session.query(Place.id, Place.latitude, Place.longitude)
+            .filter(Place.latitude.isnot(None), Place.longitude.isnot(None))
+            .all()
+        )
+    return synced_to, rows
+
+
+def _places_since(since: datetime):
+    from part3.app.extensions import db
+    from part3.app.replicas import on_primary
+    from part3.models import Place
+
+    with on_primary():
+        return (
+            db.session.query(Place.id, Place.latitude, Place.longitude, Place.updated_at)
+            .filter(Place.updated_at >= since)
+            .all()
+        )
+
+
+def _place_total() -> int:
+    from part3.app.extensions import db
+    from part3.app.replicas import on_primary
+    from part3.models import Place
+
+    with on_primary():
+        return (
+            db.session.query(func.count(Place.id))
+            .filter(Place.latitude.isnot(None), Place.longitude.isnot(None))
+            .scalar()
+        )
+
+
+def init_app(app) -> None:
+    """Attach the app's SpatialIndex; with SPATIAL_INDEX_PRELOAD start building it now."""
+    index = SpatialIndex(app.config.get("SPATIAL_INDEX_REFRESH_SECONDS", DEFAULT_REFRESH_SECONDS))
+    app.extensions[_EXT_KEY] = index
+    if app.config.get("SPATIAL_INDEX_PRELOAD"):
+        index.start(app, index.load)
+
+
+def _index() -> SpatialIndex:
+    return current_app.extensions[_EXT_KEY]
+
+
+def get_index() -> PlaceKDTree:
+    """The app's tree, waiting for (or running) its first load; schedules delta refreshes."""
+    index = _index()
+    app = current_app._get_current_object()
+    if not index.ready.is_set():
+        index.start(app, index.load).join()
+        if not index.ready.is_set():
+            # the background load failed (or was a sync that lost a race): load here so errors surface
+            index.load()
+    else:
+        index.refresh_later(app)
+    return index.tree
+
+
+def _tracking(index: SpatialIndex) -> bool:
+    # before the first load there is nothing to keep in step, unless a load is journaling writes
+    return index.ready.is_set() or index.tree.rebuilding()
+
+
+def place_saved(place_id: str, lat: Optional[float], lng: Optional[float]) -> None:
+    """Keep the tree in step after a place was created or moved."""
+    index = _index()
+    if not _tracking(index):
+        return
+    if lat is None or lng is None:
+        index.tree.remove(place_id)
+    else:
+        index.tree.insert(place_id, lat, lng)
+
+
+def places_deleted(place_ids: Iterable[str]) -> None:
+    index = _index()
+    if not _tracking(index):
+        return
+    for place_id in place_ids:
+        index.tree.remove(place_id)
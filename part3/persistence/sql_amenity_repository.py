@@ -1,10 +1,11 @@
 from __future__ import annotations
 from typing import Dict, Any, Optional, List
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
 from part3.app.extensions import db
-from business.facade import Facade  # Import the Facade class
-
-# Instantiate the Facade
-facade = Facade()
+from part3.models import Amenity, Place, place_amenities, _utcnow
+from part3.persistence import amenity_index, cache
+from part3.persistence.versions import row_version
 
 def _to_dict(a: Amenity) -> Dict[str, Any]:
     return {
@@ -14,18 +15,56 @@ def _to_dict(a: Amenity) -> Dict[str, Any]:
         "updated_at": a.updated_at.isoformat() if a.updated_at else None,
     }
 
+def _commit_or_duplicate() -> None:
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        text = str(getattr(e, "orig", e)).lower()
+        if "unique" in text or "duplicate" in text:
+            raise ValueError("amenity_already_exists")
+        raise
+
 def list_amenities() -> List[Dict[str, Any]]:
-    return facade.list_amenities()  # Use the Facade method
+    rows = Amenity.query.order_by(Amenity.created_at.asc()).all()
+    return [_to_dict(a) for a in rows]
 
 def get_amenity(amenity_id: str) -> Optional[Dict[str, Any]]:
-    return facade.get_amenity(amenity_id)  # Use the Facade method
+    a = db.session.get(Amenity, amenity_id)
+    return _to_dict(a) if a else None
+
+def amenity_version(amenity_id: str) -> Optional[str]:
+    return row_version(Amenity, amenity_id)
 
 def create_amenity(payload: Dict[str, Any]) -> Dict[str, Any]:
-    return facade.create_amenity(payload)  # Use the Facade method
+    name = (payload.get("name") or "").strip()
+    if not name:
+        raise ValueError("missing_required_fields")
+    a = Amenity(name=name)
+    db.session.add(a)
+    _commit_or_duplicate()
+    return _to_dict(a)
 
 def update_amenity(amenity_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    return facade.update_amenity(amenity_id, updates)  # Use the Facade method
+    a = db.session.get(Amenity, amenity_id)
+    if not a:
+        return None
+    name = (updates.get("name") or "").strip()
+    if name:
+        a.name = name
+    _commit_or_duplicate()
+    return _to_dict(a)
 
 def delete_amenity(amenity_id: str) -> bool:
-    return facade.delete_amenity(amenity_id)  # Use the Facade method
-
+    # places lose this amenity id, so their representation changes too
+    linked = select(place_amenities.c.place_id).where(place_amenities.c.amenity_id == amenity_id)
+    db.session.execute(update(Place).where(Place.id.in_(linked)).values(updated_at=_utcnow()))
+    # the place_amenities links go by ON DELETE CASCADE
+    if not db.session.execute(delete(Amenity).where(Amenity.id == amenity_id)).rowcount:
+        db.session.rollback()
+        return False
+    db.session.commit()
+    # rare admin operation: dropping the whole cache beats reading back every linked place id
+    cache.clear()
+    amenity_index.amenity_deleted(amenity_id)
+    return True
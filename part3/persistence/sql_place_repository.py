@@ -1,7 +1,16 @@
 from __future__ import annotations
-from typing import Dict, Any, Optional, List
+import json
+import math
+import re
+from typing import Dict, Any, Iterator, Optional, List, Sequence, Tuple
+from sqlalchemy import and_, delete, func, insert, or_, select, text, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from part3.app.extensions import db
-from part3.models import Place, Amenity
+from part3.models import Place, Amenity, Review, User, place_amenities, _utcnow, _uuid
+from part3.persistence import amenity_index, cache, geo, spatial_index
+from part3.persistence.loader_profiles import options
+from part3.persistence.pagination import clamp_limit, paginate
+from part3.persistence.versions import row_version
 
 def _to_dict(p: Place) -> Dict[str, Any]:
     return {
@@ -14,19 +23,218 @@ def _to_dict(p: Place) -> Dict[str, Any]:
         "longitude": p.longitude,
         "owner_id": p.owner_id,
         "amenity_ids": [a.id for a in (p.amenities or [])],
+        "review_count": p.review_count or 0,
+        "last_reviewed_at": p.last_reviewed_at.isoformat() if p.last_reviewed_at else None,
         "created_at": p.created_at.isoformat() if p.created_at else None,
         "updated_at": p.updated_at.isoformat() if p.updated_at else None,
     }
 
-def list_places() -> List[Dict[str, Any]]:
-    rows = Place.query.order_by(Place.created_at.asc()).all()
-    return [_to_dict(p) for p in rows]
+# sort name -> (keyset columns, descending)
+_SORTS = {
+    "created": ([Place.created_at, Place.id], False),
+    "price": ([Place.price_per_night, Place.id], False),
+    "-price": ([Place.price_per_night, Place.id], True),
+}
+
+def _box_filter(box: geo.Box):
+    """Candidate cells first (indexed), then the exact lat/lng bounds."""
+    cells = or_(*[Place.geo_cell.between(lo, hi) for lo, hi in geo.cell_ranges(box)])
+    lngs = or_(*[Place.longitude.between(lo, hi) for lo, hi in geo.lng_spans(box)])
+    return and_(cells, Place.latitude.between(box[0], box[2]), lngs)
+
+def _parse_bbox(bbox: Sequence[float]) -> geo.Box:
+    # client order is GeoJSON: min_lng, min_lat, max_lng, max_lat
+    if len(bbox) != 4:
+        raise ValueError("invalid_value: bbox")
+    min_lng, min_lat, max_lng, max_lat = bbox
+    if not (geo.valid_point(min_lat, min_lng) and geo.valid_point(max_lat, max_lng)) or min_lat > max_lat:
+        raise ValueError("invalid_value: bbox")
+    return min_lat, min_lng, max_lat, max_lng
+
+# above this many bitmap matches, filter in SQL instead of binding a huge IN list
+_BITMAP_IN_LIMIT = 5000
+
+def _has_all_amenities(amenity_ids: Sequence[str]):
+    """SQL fallback for the amenity AND filter (GROUP BY ... HAVING count)."""
+    wanted = set(amenity_ids)
+    return Place.id.in_(
+        select(place_amenities.c.place_id)
+        .where(place_amenities.c.amenity_id.in_(wanted))
+        .group_by(place_amenities.c.place_id)
+        .having(func.count(place_amenities.c.amenity_id) == len(wanted))
+    )
+
+def _amenity_filter(index: amenity_index.AmenityBitmaps, bitmap: int, amenity_ids: Sequence[str]):
+    """The bitmap's ids as an IN list, or the SQL fallback when there are too many."""
+    if bitmap.bit_count() <= _BITMAP_IN_LIMIT:
+        return Place.id.in_(index.place_ids(bitmap))
+    return _has_all_amenities(amenity_ids)
+
+def list_places(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    *,
+    city: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    sort: Optional[str] = None,
+    bbox: Optional[Sequence[float]] = None,
+    amenities: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """One keyset page of places matching the filters.
+
+    With ``amenities`` only places having all of them are listed, and the
+    result carries ``facets``: per amenity, how many of the matching places
+    (all filters applied, not just this page) have it.
+
+    Raises ValueError("invalid_sort"), ValueError("invalid_cursor") or
+    ValueError("invalid_value: bbox").
+    """
+    if (sort or "created") not in _SORTS:
+        raise ValueError("invalid_sort")
+    columns, descending = _SORTS[sort or "created"]
+
+    filters = []
+    if city:
+        filters.append(Place.city == city)
+    if min_price is not None:
+        filters.append(Place.price_per_night >= min_price)
+    if max_price is not None:
+        filters.append(Place.price_per_night <= max_price)
+    if bbox is not None:
+        filters.append(_box_filter(_parse_bbox(bbox)))
+    query = Place.query.options(*options("place_card")).filter(*filters)
+
+    facets = None
+    if amenities:
+        index = amenity_index.get_index()
+        bitmap = index.match(amenities)
+        if bitmap and filters:
+            # facets count what is listed: narrow the match to the places passing the other filters
+            matching = db.session.scalars(
+                select(Place.id).where(*filters, _amenity_filter(index, bitmap, amenities))
+            )
+            bitmap &= index.bitmap_of(matching)
+        facets = index.facets(bitmap)
+        if not bitmap:
+            return {"items": [], "next_cursor": None, "facets": facets}
+        query = query.filter(_amenity_filter(index, bitmap, amenities))
+
+    rows, next_cursor = paginate(
+        query, columns, limit=limit, cursor=cursor, descending=descending
+    )
+    return {"items": [_to_dict(p) for p in rows], "next_cursor": next_cursor, "facets": facets}
+
+def list_owner_places(
+    owner_id: str, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """One keyset page of a user's places, oldest first; None if the user is missing.
+
+    Walks ix_places_owner_id_created_at_id and never touches User.places.
+    Raises ValueError("invalid_cursor").
+    """
+    if db.session.query(User.id).filter(User.id == owner_id).scalar() is None:
+        return None
+    query = Place.query.options(*options("place_card")).filter(Place.owner_id == owner_id)
+    rows, next_cursor = paginate(query, [Place.created_at, Place.id], limit=limit, cursor=cursor)
+    return {"items": [_to_dict(p) for p in rows], "next_cursor": next_cursor}
 
 def get_place(place_id: str) -> Optional[Dict[str, Any]]:
-    p = db.session.get(Place, place_id)
-    return _to_dict(p) if p else None
+    def load():
+        p = db.session.get(Place, place_id, options=options("place_detail"))
+        return _to_dict(p) if p else None
 
-def create_place(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return cache.read_through("place", place_id, load)
+
+def place_version(place_id: str) -> Optional[str]:
+    return row_version(Place, place_id)
+
+def near_places(lat: float, lng: float, radius_km: float, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Places within radius_km of (lat, lng), closest first, each with distance_km."""
+    if not geo.valid_point(lat, lng):
+        raise ValueError("invalid_value: lat/lng")
+    if not isinstance(radius_km, (int, float)) or not 0 < radius_km <= geo.MAX_RADIUS_KM:
+        raise ValueError("invalid_value: radius_km")
+
+    # coordinates only for the candidate cells; full rows only for the winners
+    candidates = (
+        db.session.query(Place.id, Place.latitude, Place.longitude)
+        .filter(_box_filter(geo.radius_box(lat, lng, radius_km)))
+        .all()
+    )
+    hits = []
+    for place_id, plat, plng in candidates:
+        d = geo.haversine_km(lat, lng, plat, plng)
+        if d <= radius_km:
+            hits.append((d, place_id))
+    hits = sorted(hits)[:clamp_limit(limit)]
+    if not hits:
+        return {"items": []}
+
+    rows = Place.query.options(*options("place_card")).filter(Place.id.in_([pid for _, pid in hits]))
+    by_id = {p.id: p for p in rows}
+    items = [dict(_to_dict(by_id[pid]), distance_km=round(d, 3)) for d, pid in hits if pid in by_id]
+    return {"items": items}
+
+def k_nearest(lat: float, lng: float, k: Optional[int] = None) -> Dict[str, Any]:
+    """The k places closest to (lat, lng), served by the in-process KD-tree."""
+    if not geo.valid_point(lat, lng):
+        raise ValueError("invalid_value: lat/lng")
+    hits = spatial_index.get_index().nearest(lat, lng, clamp_limit(k))
+    if not hits:
+        return {"items": []}
+
+    rows = Place.query.options(*options("place_card")).filter(Place.id.in_([pid for _, pid in hits]))
+    by_id = {p.id: p for p in rows}
+    items = [dict(_to_dict(by_id[pid]), distance_km=round(d, 3)) for d, pid in hits if pid in by_id]
+    return {"items": items}
+
+_MAX_SEARCH_TERMS = 8
+
+def _search_terms(q: str) -> List[str]:
+    # words only: FTS5/FULLTEXT operators in user input are never passed through
+    return re.findall(r"\w+", (q or "").lower())[:_MAX_SEARCH_TERMS]
+
+def search_places(q: str, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Places whose name/description match every word of q (as a prefix), best first.
+
+    Ranked by BM25 on SQLite (name weighted over description) and by
+    MATCH ... AGAINST relevance on MySQL.
+    """
+    terms = _search_terms(q)
+    if not terms:
+        raise ValueError("invalid_value: q")
+    size = clamp_limit(limit)
+
+    if db.session.get_bind().dialect.name == "mysql":
+        sql = text(
+            "SELECT id FROM places "
+            "WHERE MATCH(name, description) AGAINST (:q IN BOOLEAN MODE) "
+            "ORDER BY MATCH(name, description) AGAINST (:q IN BOOLEAN MODE) DESC "
+            "LIMIT :n"
+        )
+        match = " ".join(f"+{t}*" for t in terms)
+    else:
+        sql = text(
+            "SELECT places.id FROM places_fts JOIN places ON places.rowid = places_fts.rowid "
+            "WHERE places_fts MATCH :q ORDER BY bm25(places_fts, 10.0, 1.0) LIMIT :n"
+        )
+        match = " ".join(f'"{t}"*' for t in terms)
+    ids = [row[0] for row in db.session.execute(sql, {"q": match, "n": size})]
+    if not ids:
+        return {"items": []}
+
+    by_id = {p.id: p for p in Place.query.options(*options("place_card")).filter(Place.id.in_(ids))}
+    return {"items": [_to_dict(by_id[pid]) for pid in ids if pid in by_id]}
+
+def rebuild_search_index() -> None:
+    """Re-read every place into the SQLite FTS table (no-op on MySQL)."""
+    if db.session.get_bind().dialect.name == "sqlite":
+        db.session.execute(text("INSERT INTO places_fts(places_fts) VALUES ('rebuild')"))
+        db.session.commit()
+
+def _validate_place_payload(payload: Dict[str, Any]) -> None:
+    """Field rules shared by create_place and bulk_create_places."""
     # Validate price_per_night
     if not payload.get("price_per_night") or not isinstance(
         payload["price_per_night"], int
@@ -43,6 +251,9 @@ def create_place(payload: Dict[str, Any]) -> Dict[str, Any]:
     ):
         raise ValueError("invalid_value: longitude")
 
+def create_place(payload: Dict[str, Any]) -> Dict[str, Any]:
+    _validate_place_payload(payload)
+
     # Create place
     p = Place(
         name=payload["name"],
@@ -51,56 +262,243 @@ def create_place(payload: Dict[str, Any]) -> Dict[str, Any]:
         description=payload.get("description"),
         latitude=payload.get("latitude"),
         longitude=payload.get("longitude"),
+        geo_cell=geo.cell_for(payload.get("latitude"), payload.get("longitude")),
         owner_id=payload["owner_id"],
     )
 
     # Add and commit to the database
     db.session.add(p)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # owner_id is the only foreign key: the owner was deleted, token still valid
+        db.session.rollback()
+        raise ValueError("user_not_found")
+    spatial_index.place_saved(p.id, p.latitude, p.longitude)
 
     # Return the created place as a dictionary
     return _to_dict(p)
 
+BULK_BATCH_SIZE = 500
+BULK_MAX_LINE_BYTES = 64 * 1024
+
+def _check_bulk_fields(payload: Dict[str, Any]) -> None:
+    """The type checks the PlaceInput model gives POST /places/, for one NDJSON object."""
+    for key in ("name", "city"):
+        if not isinstance(payload.get(key), str) or not payload[key].strip():
+            raise ValueError("missing_required_fields")
+    for key in ("description", "owner_id"):
+        if payload.get(key) is not None and not isinstance(payload[key], str):
+            raise ValueError(f"invalid_value: {key}")
+    if isinstance(payload.get("price_per_night"), bool):
+        raise ValueError("invalid_value: price_per_night")
+    for key in ("latitude", "longitude"):
+        value = payload.get(key)
+        # json.loads accepts NaN and Infinity
+        if value is not None and (
+            isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value)
+        ):
+            raise ValueError(f"invalid_value: {key}")
+
+def _bulk_row(line: bytes, owner_id: str) -> Dict[str, Any]:
+    """Decode and validate one NDJSON line and turn it into a places row."""
+    try:
+        payload = json.loads(line)
+    except ValueError:
+        raise ValueError("invalid_json")
+    if not isinstance(payload, dict):
+        raise ValueError("invalid_json")
+    _check_bulk_fields(payload)
+    _validate_place_payload(payload)
+    now = _utcnow()
+    return {
+        "id": _uuid(),
+        "name": payload["name"],
+        "city": payload["city"],
+        "price_per_night": payload["price_per_night"],
+        "description": payload.get("description"),
+        "latitude": payload.get("latitude"),
+        "longitude": payload.get("longitude"),
+        "geo_cell": geo.cell_for(payload.get("latitude"), payload.get("longitude")),
+        "owner_id": payload.get("owner_id") or owner_id,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+def _flush_bulk(batch: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Insert one batch in a single executemany; fall back to row by row on any database error."""
+    try:
+        db.session.execute(insert(Place), [row for _, row in batch])
+        db.session.commit()
+        done = batch
+        failed = []
+    except DBAPIError:
+        # one bad row fails the executemany: retry row by row so only that line reports the error
+        db.session.rollback()
+        done, failed = [], []
+        for line_no, row in batch:
+            try:
+                db.session.execute(insert(Place), [row])
+                db.session.commit()
+                done.append((line_no, row))
+            except DBAPIError as e:
+                db.session.rollback()
+                failed.append((line_no, "integrity_error" if isinstance(e, IntegrityError) else "invalid_row"))
+
+    for _, row in done:
+        spatial_index.place_saved(row["id"], row["latitude"], row["longitude"])
+    results = [{"line": n, "status": "created", "id": row["id"]} for n, row in done]
+    results += [{"line": n, "status": "error", "error": error} for n, error in failed]
+    return results
 
+def _read_lines(stream) -> Iterator[Tuple[int, bytes]]:
+    """(line number, line) pairs; lines over BULK_MAX_LINE_BYTES come back as None."""
+    line_no = 0
+    while True:
+        line = stream.readline(BULK_MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        line_no += 1
+        if len(line) > BULK_MAX_LINE_BYTES and not line.endswith(b"\n"):
+            # drain the rest of the oversized line without holding it
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(BULK_MAX_LINE_BYTES)
+            yield line_no, None
+            continue
+        yield line_no, line
+
+def bulk_create_places(stream, owner_id: str) -> Iterator[Dict[str, Any]]:
+    """Create places from an NDJSON byte stream, one result dict per non-blank line.
+
+    Rows are validated like create_place and inserted BULK_BATCH_SIZE at a
+    time; results for a batch are yielded once it is committed, so memory
+    stays bounded by the batch size whatever the upload size.
+    """
+    pending: List[Tuple[int, Dict[str, Any]]] = []
+    errors: List[Dict[str, Any]] = []
+
+    def flush():
+        results = _flush_bulk(pending) if pending else []
+        results = sorted(results + errors, key=lambda r: r["line"])
+        pending.clear()
+        errors.clear()
+        return results
+
+    for line_no, line in _read_lines(stream):
+        if line is None:
+            errors.append({"line": line_no, "status": "error", "error": "line_too_long"})
+            continue
+        if not line.strip():
+            continue
+        try:
+            pending.append((line_no, _bulk_row(line, owner_id)))
+        except ValueError as e:
+            errors.append({"line": line_no, "status": "error", "error": str(e)})
+        if len(pending) + len(errors) >= BULK_BATCH_SIZE:
+            yield from flush()
+    yield from flush()
 
 
 def update_place(place_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    p = db.session.get(Place, place_id)
+    p = db.session.get(Place, place_id, options=options("place_card"))
     if not p:
         return None
     for key in ("name", "city", "price_per_night", "description", "latitude", "longitude"):
         if key in updates:
             setattr(p, key, updates[key])
+    if "latitude" in updates or "longitude" in updates:
+        p.geo_cell = geo.cell_for(p.latitude, p.longitude)
     db.session.commit()
+    cache.invalidate("place", [place_id])
+    if "latitude" in updates or "longitude" in updates:
+        spatial_index.place_saved(p.id, p.latitude, p.longitude)
     return _to_dict(p)
 
 def attach_amenity(place_id: str, amenity_id: str) -> Optional[Dict[str, Any]]:
-    p = db.session.get(Place, place_id)
+    p = db.session.get(Place, place_id, options=options("place_card"))
     a = db.session.get(Amenity, amenity_id)
     if not p or not a:
         return None
     if a not in p.amenities:
         p.amenities.append(a)
+        p.updated_at = _utcnow()
         db.session.commit()
+        cache.invalidate("place", [place_id])
+        amenity_index.amenity_added(place_id, amenity_id)
     return _to_dict(p)
 
 def detach_amenity(place_id: str, amenity_id: str) -> Optional[Dict[str, Any]]:
-    p = db.session.get(Place, place_id)
+    p = db.session.get(Place, place_id, options=options("place_card"))
     a = db.session.get(Amenity, amenity_id)
     if not p or not a:
         return None
     if a in p.amenities:
         p.amenities.remove(a)
+        p.updated_at = _utcnow()
         db.session.commit()
+        cache.invalidate("place", [place_id])
+        amenity_index.amenity_removed(place_id, amenity_id)
     return _to_dict(p)
 
+def set_amenities(place_id: str, amenity_ids: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """Make the place's amenities exactly amenity_ids, in one transaction.
+
+    Only the difference against place_amenities is written: one bulk DELETE and
+    one executemany INSERT. Ids that match no amenity are skipped and returned
+    in unknown_amenity_ids. Returns None if the place does not exist.
+    """
+    p = db.session.get(Place, place_id, options=options("place_card"))
+    if not p:
+        return None
+
+    wanted = set(amenity_ids)
+    known = set()
+    if wanted:
+        known = {aid for (aid,) in db.session.query(Amenity.id).filter(Amenity.id.in_(wanted))}
+    current = {a.id for a in p.amenities}
+    to_add = known - current
+    to_remove = current - known
+
+    if to_remove:
+        db.session.execute(
+            delete(place_amenities).where(
+                place_amenities.c.place_id == place_id,
+                place_amenities.c.amenity_id.in_(to_remove),
+            )
+        )
+    if to_add:
+        db.session.execute(
+            insert(place_amenities),
+            [{"place_id": place_id, "amenity_id": aid} for aid in to_add],
+        )
+    if to_add or to_remove:
+        db.session.execute(update(Place).where(Place.id == place_id).values(updated_at=_utcnow()))
+    db.session.commit()
+    if to_add or to_remove:
+        cache.invalidate("place", [place_id])
+    amenity_index.amenities_set(place_id, known)
+
+    # commit expired p, so this reloads the row and its amenity ids
+    return dict(_to_dict(p), unknown_amenity_ids=sorted(wanted - known))
+
 def delete_place(place_id: str) -> bool:
-    """Delete a place by id. Return True if deleted, False if not found."""
-    place = db.session.get(Place, place_id)
-    if not place:
-        return False
+    """Delete a place by id. Return True if deleted, False if not found.
 
-    db.session.delete(place)
+    One DELETE: its reviews and amenity links go by ON DELETE CASCADE.
+    """
+    # the cascade takes the reviews out from under the cache
+    review_ids = db.session.scalars(select(Review.id).where(Review.place_id == place_id)).all() if cache.enabled() else []
+    deleted = db.session.execute(delete(Place).where(Place.id == place_id)).rowcount
     db.session.commit()
+    if not deleted:
+        return False
+    places_deleted([place_id])
+    cache.invalidate("review", review_ids)
     return True
 
+def places_deleted(place_ids: Sequence[str]) -> None:
+    """Drop deleted places from the entity cache and the in-process indexes (KD-tree, amenity bitmaps)."""
+    cache.invalidate("place", place_ids)
+    spatial_index.places_deleted(place_ids)
+    amenity_index.places_deleted(place_ids)
+
@@ -1,13 +1,17 @@
 from __future__ import annotations
 from typing import Dict, Any, Optional, List
 
+from sqlalchemy import delete, select, update
 from sqlalchemy.exc import IntegrityError
-from part3.app.extensions import db, bcrypt
-from part3.models import User
+from part3.app.extensions import db, hasher
+from part3.models import User, Place, Review, normalize_email
+from part3.persistence import cache, sql_place_repository, sql_review_repository
+from part3.persistence.pagination import paginate
+from part3.persistence.versions import row_version
 
 
 class SQLAlchemyRepository:
-    def _to_dict(self, u: User) -> Dict[str, Any]:
+    def _to_dict(self, u) -> Dict[str, Any]:
         return {
             "id": u.id,
             "first_name": u.first_name,
@@ -18,13 +22,40 @@ class SQLAlchemyRepository:
         }
 
     # ---------- READ ----------
-    def list_users(self) -> List[Dict[str, Any]]:
-        users = User.query.order_by(User.created_at.asc()).all()
-        return [self._to_dict(u) for u in users]
+    # the six public columns; listing never builds User objects or their relationships
+    _LIST_COLUMNS = (User.id, User.first_name, User.last_name, User.email, User.created_at, User.updated_at)
+
+    def list_users(
+        self, limit: Optional[int] = None, cursor: Optional[str] = None, *, email_prefix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """One keyset page of users as plain rows.
+
+        Oldest first on (created_at, id); with email_prefix, case-insensitive
+        and in normalized-email order as a range scan on
+        uq_users_email_normalized. Raises ValueError("invalid_cursor").
+        """
+        query = db.session.query(*self._LIST_COLUMNS)
+        columns = [User.created_at, User.id]
+        email_prefix = normalize_email(email_prefix)
+        if email_prefix:
+            # [prefix, prefix with its last character bumped) instead of LIKE, which SQLite won't index
+            upper = email_prefix[:-1] + chr(ord(email_prefix[-1]) + 1)
+            query = query.add_columns(User.email_normalized).filter(
+                User.email_normalized >= email_prefix, User.email_normalized < upper
+            )
+            columns = [User.email_normalized, User.id]
+        rows, next_cursor = paginate(query, columns, limit=limit, cursor=cursor)
+        return {"items": [self._to_dict(r) for r in rows], "next_cursor": next_cursor}
 
     def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
-        u = db.session.get(User, user_id)
-        return self._to_dict(u) if u else None
+        def load():
+            u = db.session.get(User, user_id)
+            return self._to_dict(u) if u else None
+
+        return cache.read_through("user", user_id, load)
+
+    def user_version(self, user_id: str) -> Optional[str]:
+        return row_version(User, user_id)
 
     def create_user(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         first = (payload.get("first_name") or "").strip()
@@ -35,8 +66,13 @@ class SQLAlchemyRepository:
         if not first or not last or not email or not pw:
             raise ValueError("missing_required_fields")
 
-        u = User(first_name=first, last_name=last, email=email)
-        u.password_hash = bcrypt.generate_password_hash(pw).decode("utf-8")
+        # a taken email (in any letter case) costs one unique-index probe, not a bcrypt round
+        normalized = normalize_email(email)
+        if db.session.query(User.id).filter(User.email_normalized == normalized).first() is not None:
+            raise ValueError("email_already_exists")
+
+        u = User(first_name=first, last_name=last, email=email, email_normalized=normalized)
+        u.password_hash = hasher.hash(pw)
 
         db.session.add(u)
         try:
@@ -59,6 +95,7 @@ class SQLAlchemyRepository:
         for key in ("first_name", "last_name", "email"):
             if key in updates and updates[key] is not None:
                 setattr(u, key, updates[key])
+        u.email_normalized = normalize_email(u.email)
 
         try:
             db.session.commit()
@@ -69,13 +106,40 @@ class SQLAlchemyRepository:
                 raise ValueError("email_already_exists")
             raise
 
+        cache.invalidate("user", [user_id])
         return self._to_dict(u)
 
+    def user_is_admin(self, user_id: str) -> Optional[bool]:
+        """The user's is_admin flag from one column; None if the user is gone."""
+        return db.session.query(User.is_admin).filter(User.id == user_id).scalar()
+
+    def replace_password_hash(self, user_id: str, old_hash: str, new_hash: str) -> bool:
+        """Swap in a rehashed password, unless the hash changed since it was read."""
+        result = db.session.execute(
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            # same password, same representation: leave updated_at (and ETags) alone
+            .values(password_hash=new_hash, updated_at=User.updated_at)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
     def delete_user(self, user_id: str) -> bool:
-        u = db.session.get(User, user_id)
-        if not u:
+        """One DELETE; places, reviews and amenity links go by ON DELETE CASCADE."""
+        # ids for the in-process indexes, the entity cache and the review stats, read as columns
+        place_ids = [pid for (pid,) in db.session.query(Place.id).filter(Place.owner_id == user_id)]
+        reviews = db.session.query(Review.id, Review.place_id).filter(Review.user_id == user_id).all()
+        review_ids = [rid for rid, _ in reviews]
+        if place_ids and cache.enabled():
+            review_ids += db.session.scalars(select(Review.id).where(Review.place_id.in_(place_ids))).all()
+        deleted = db.session.execute(delete(User).where(User.id == user_id)).rowcount
+        if not deleted:
+            db.session.rollback()
             return False
-        db.session.delete(u)
-        db.session.commit()
+        # the user's reviews went too: other places' review stats must follow
+        # (commits the delete and the stats refresh together)
+        sql_review_repository.refresh_review_stats({pid for _, pid in reviews} - set(place_ids))
+        sql_place_repository.places_deleted(place_ids)
+        cache.invalidate("user", [user_id])
+        cache.invalidate("review", review_ids)
         return True
-
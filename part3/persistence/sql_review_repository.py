@@ -1,8 +1,13 @@
 """SQLAlchemy helpers for creating, reading, updating and deleting Review rows."""
 from __future__ import annotations
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List
+from sqlalchemy import func, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from part3.app.extensions import db
-from part3.models import Review, Place
+from part3.models import Review, Place, User, _utcnow, _uuid
+from part3.persistence import cache
+from part3.persistence.pagination import paginate
+from part3.persistence.versions import row_version
 
 def _to_dict(r: Review) -> Dict[str, Any]:
     return {
@@ -18,11 +23,52 @@ def list_reviews() -> List[Dict[str, Any]]:
     rows = Review.query.order_by(Review.created_at.asc()).all()
     return [_to_dict(r) for r in rows]
 
+def list_place_reviews(
+    place_id: str, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """One keyset page of a place's reviews, oldest first; None if the place is missing.
+
+    Served by ix_reviews_place_id_created_at_id, so every page is one index
+    range probe. Raises ValueError("invalid_cursor").
+    """
+    if db.session.query(Place.id).filter(Place.id == place_id).scalar() is None:
+        return None
+    query = Review.query.filter(Review.place_id == place_id)
+    rows, next_cursor = paginate(query, [Review.created_at, Review.id], limit=limit, cursor=cursor)
+    return {"items": [_to_dict(r) for r in rows], "next_cursor": next_cursor}
+
+def list_user_reviews(
+    user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """One keyset page of a user's reviews, oldest first; None if the user is missing.
+
+    Walks ix_reviews_user_id_created_at_id and never touches User.reviews.
+    Raises ValueError("invalid_cursor").
+    """
+    if db.session.query(User.id).filter(User.id == user_id).scalar() is None:
+        return None
+    query = Review.query.filter(Review.user_id == user_id)
+    rows, next_cursor = paginate(query, [Review.created_at, Review.id], limit=limit, cursor=cursor)
+    return {"items": [_to_dict(r) for r in rows], "next_cursor": next_cursor}
+
 def get_review(review_id: str) -> Optional[Dict[str, Any]]:
-    r = db.session.get(Review, review_id)
-    return _to_dict(r) if r else None
+    def load():
+        r = db.session.get(Review, review_id)
+        return _to_dict(r) if r else None
+
+    return cache.read_through("review", review_id, load)
+
+def review_version(review_id: str) -> Optional[str]:
+    return row_version(Review, review_id)
 
 def create_review(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Insert a review with one INSERT ... SELECT, then bump the place counters.
+
+    The SELECT only yields a row when the place exists and the author is not
+    its owner, so a zero rowcount means one of the two failed; the duplicate
+    check is the uq_reviews_user_place index, which also holds under
+    concurrent posts.
+    """
     # expects: text, place_id, user_id
     text = (payload.get("text") or "").strip()
     place_id = payload.get("place_id")
@@ -31,24 +77,55 @@ def create_review(payload: Dict[str, Any]) -> Dict[str, Any]:
     if not text or not place_id or not user_id:
         raise ValueError("missing_required_fields")
 
-    # place must exist
-    place = db.session.get(Place, place_id)
-    if not place:
-        raise ValueError("place_not_found")
+    review_id = _uuid()
+    now = _utcnow()
+    source = select(
+        literal(review_id, Review.id.type),
+        literal(text, Review.text.type),
+        literal(user_id, Review.user_id.type),
+        Place.id,
+        literal(now, Review.created_at.type),
+        literal(now, Review.updated_at.type),
+    ).where(Place.id == place_id, Place.owner_id != user_id)
+    stmt = insert(Review).from_select(
+        ["id", "text", "user_id", "place_id", "created_at", "updated_at"], source
+    )
 
-    # no self-review
-    if place.owner_id == user_id:
-        raise ValueError("self_review_forbidden")
+    try:
+        inserted = db.session.execute(stmt).rowcount
+    except IntegrityError as e:
+        db.session.rollback()
+        msg = str(getattr(e, "orig", e)).lower()
+        if "unique" in msg or "duplicate" in msg:
+            raise ValueError("duplicate_review")
+        if "foreign key" in msg:
+            # the author's account was deleted while their token is still valid
+            raise ValueError("user_not_found")
+        raise
 
-    # one review per user per place
-    existing = Review.query.filter_by(user_id=user_id, place_id=place_id).first()
-    if existing:
-        raise ValueError("duplicate_review")
+    if not inserted:
+        # only the failure path pays for telling the two cases apart
+        db.session.rollback()
+        if db.session.query(Place.id).filter(Place.id == place_id).scalar() is None:
+            raise ValueError("place_not_found")
+        raise ValueError("self_review_forbidden")
 
-    r = Review(text=text, place_id=place_id, user_id=user_id)
-    db.session.add(r)
+    # counters move in the same transaction as the insert
+    db.session.execute(
+        update(Place)
+        .where(Place.id == place_id)
+        .values(review_count=Place.review_count + 1, last_reviewed_at=now)
+    )
     db.session.commit()
-    return _to_dict(r)
+    cache.invalidate("place", [place_id])
+    return {
+        "id": review_id,
+        "text": text,
+        "user_id": user_id,
+        "place_id": place_id,
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat(),
+    }
 
 def update_review(review_id: str, updates: Dict[str, Any], *, actor_id: str) -> Optional[Dict[str, Any]]:
     # author-only edit (only 'text')
@@ -61,6 +138,7 @@ def update_review(review_id: str, updates: Dict[str, Any], *, actor_id: str) ->
         raise ValueError("nothing_to_update")
     r.text = (updates["text"] or "").strip()
     db.session.commit()
+    cache.invalidate("review", [review_id])
     return _to_dict(r)
 
 def delete_review(review_id: str, *, actor_id: str, is_admin: bool) -> bool:
@@ -70,6 +148,72 @@ def delete_review(review_id: str, *, actor_id: str, is_admin: bool) -> bool:
         return False
     if not (is_admin or r.user_id == actor_id):
         raise ValueError("forbidden_delete")
+    place_id = r.place_id
     db.session.delete(r)
+    db.session.flush()
+    db.session.execute(
+        update(Place)
+        .where(Place.id == place_id)
+        .values(review_count=Place.review_count - 1, last_reviewed_at=_latest_review_at())
+    )
     db.session.commit()
+    cache.invalidate("review", [review_id])
+    cache.invalidate("place", [place_id])
     return True
+
+# ---------- denormalized review stats on places ----------
+
+def _review_total():
+    return select(func.count(Review.id)).where(Review.place_id == Place.id).scalar_subquery()
+
+def _latest_review_at():
+    return select(func.max(Review.created_at)).where(Review.place_id == Place.id).scalar_subquery()
+
+def _stats_drift():
+    return or_(
+        Place.review_count != _review_total(),
+        Place.last_reviewed_at.is_distinct_from(_latest_review_at()),
+    )
+
+def review_stats_drift() -> List[Dict[str, Any]]:
+    """Places whose review_count/last_reviewed_at disagree with the reviews table."""
+    rows = (
+        db.session.query(
+            Place.id, Place.review_count, _review_total(), Place.last_reviewed_at, _latest_review_at()
+        )
+        .filter(_stats_drift())
+        .all()
+    )
+    return [
+        {
+            "place_id": pid,
+            "review_count": stored_count,
+            "actual_review_count": actual_count,
+            "last_reviewed_at": stored_last,
+            "actual_last_reviewed_at": actual_last,
+        }
+        for pid, stored_count, actual_count, stored_last, actual_last in rows
+    ]
+
+def refresh_review_stats(place_ids: Optional[Iterable[str]] = None) -> int:
+    """Recompute the stats from reviews and commit.
+
+    With place_ids, only those places are rewritten (used after cascading
+    deletes); without, every drifting place is. Returns the rows updated.
+    """
+    stmt = update(Place).values(review_count=_review_total(), last_reviewed_at=_latest_review_at())
+    if place_ids is not None:
+        place_ids = list(place_ids)
+        if not place_ids:
+            db.session.commit()
+            return 0
+        stmt = stmt.where(Place.id.in_(place_ids))
+    else:
+        stmt = stmt.where(_stats_drift())
+    result = db.session.execute(stmt, execution_options={"synchronize_session": False})
+    db.session.commit()
+    if place_ids is None:
+        cache.clear()
+    else:
+        cache.invalidate("place", place_ids)
+    return result.rowcount
@@ -0,0 +1,48 @@
+"""SQLAlchemy helpers for the revoked_tokens table (refresh rotation, logout)."""
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from part3.app.extensions import db
+from part3.models import RevokedToken, _utcnow
+from part3.persistence import revocation
+
+def _from_exp(exp: int) -> datetime:
+    # naive UTC, like every other timestamp column
+    return datetime.fromtimestamp(exp, tz=timezone.utc).replace(tzinfo=None)
+
+def revoke(jwt_payload: dict) -> bool:
+    """Record the token's jti as revoked; False if it already was.
+
+    The primary key makes this the check too: of two concurrent refreshes
+    with the same token, exactly one insert wins.
+    """
+    return _insert(jwt_payload["jti"], jwt_payload.get("type", "access"), jwt_payload["sub"], _from_exp(jwt_payload["exp"]))
+
+def revoke_family(jwt_payload: dict) -> bool:
+    """Revoke every token of the payload's refresh chain; False if it already was (or has none).
+
+    The row's jti is the family id. It lives as long as the newest token
+    the chain can have issued: a refresh token minted just now.
+    """
+    family = jwt_payload.get("family")
+    if family is None:
+        return False
+    lifetime = current_app.config.get("JWT_REFRESH_TOKEN_EXPIRES") or timedelta(days=30)
+    return _insert(family, "family", jwt_payload["sub"], _utcnow() + lifetime)
+
+def _insert(jti: str, token_type: str, user_id: str, expires_at: datetime) -> bool:
+    db.session.add(RevokedToken(jti=jti, token_type=token_type, user_id=user_id, expires_at=expires_at))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    revocation.token_revoked(jti)
+    return True
+
+def purge_expired() -> int:
+    """Drop rows whose token has expired anyway (JWT checks exp first). Returns the count."""
+    deleted = RevokedToken.query.filter(RevokedToken.expires_at <= _utcnow()).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
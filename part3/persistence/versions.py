@@ -0,0 +1,11 @@
+"""Cheap row version lookups used for conditional GETs (ETag / If-None-Match)."""
+from __future__ import annotations
+from typing import Optional
+
+from part3.app.extensions import db
+
+
+def row_version(model, row_id: str) -> Optional[str]:
+    """The row's updated_at as a string, read without loading the row; None if missing."""
+    updated_at = db.session.query(model.updated_at).filter(model.id == row_id).scalar()
+    return updated_at.isoformat() if updated_at else None
@@ -2,6 +2,7 @@ from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from part3.business.facade import Facade  # Import Facade class
+from part3.presentation.etags import is_fresh, make_etag, not_modified, page_etag, tagged
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -19,7 +20,11 @@ amenity_model = api.model('Amenity', {
 class AmenityList(Resource):
     @api.marshal_list_with(amenity_model)
     def get(self):
-        return facade.list_amenities()  # Use Facade method
+        amenities = facade.list_amenities()  # Use Facade method
+        etag = page_etag(amenities)
+        if is_fresh(etag):
+            return not_modified(etag)
+        return tagged(amenities, etag)
 
     @jwt_required()
     @api.expect(amenity_model, validate=True)
@@ -32,17 +37,28 @@ class AmenityList(Resource):
         name = (data.get("name") or "").strip()
         if not name:
             api.abort(400, "name is required")
-        return facade.create_amenity({"name": name}), 201  # Use Facade method
+        try:
+            created = facade.create_amenity({"name": name})  # Use Facade method
+        except ValueError as e:
+            api.abort(400, str(e))
+        return created, 201
 
 @api.route('/<string:amenity_id>')
 @api.param('amenity_id', 'The amenity ID')
 class Amenity(Resource):
     @api.marshal_with(amenity_model)
     def get(self, amenity_id):
+        version = facade.amenity_version(amenity_id)
+        if version is None:
+            api.abort(404, "Amenity not found")
+        etag = make_etag(amenity_id, version)
+        if is_fresh(etag):
+            return not_modified(etag)
+
         amenity = facade.get_amenity(amenity_id)  # Use Facade method
         if not amenity:
             api.abort(404, "Amenity not found")
-        return amenity
+        return tagged(amenity, make_etag(amenity_id, amenity["updated_at"]))
 
     @jwt_required()
     @api.expect(amenity_model, validate=True)
@@ -52,7 +68,10 @@ class Amenity(Resource):
         if not bool(claims.get("is_admin", False)):
             api.abort(403, "Admin only: you must be an admin to update amenities")
         updates = request.get_json(force=True) or {}
-        updated = facade.update_amenity(amenity_id, updates)  # Use Facade method
+        try:
+            updated = facade.update_amenity(amenity_id, updates)  # Use Facade method
+        except ValueError as e:
+            api.abort(400, str(e))
         if not updated:
             api.abort(404, "Amenity not found")
         return updated
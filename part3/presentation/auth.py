@@ -1,42 +1,125 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import create_access_token
-from part3.app.extensions import bcrypt
-from part3.models import User
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, get_jwt, jwt_required
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import InvalidTokenError
+from part3.app.extensions import hasher
+from part3.business.facade import Facade
+from part3.models import User, normalize_email
+from part3.persistence import sql_token_repository as token_repo
 import os
+import uuid
 
 api = Namespace("auth", description="Authentication")
 
+facade = Facade()
+
 login_input = api.model("LoginInput", {
     "email": fields.String(required=True),
     "password": fields.String(required=True),
 })
 
+logout_input = api.model("LogoutInput", {
+    "refresh_token": fields.String(description="Optional: revoke this refresh token too"),
+})
+
 login_output = api.model("LoginOutput", {
     "access_token": fields.String,
+    "refresh_token": fields.String,
 })
 
+
+def _admin_emails():
+    return {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
+
+def _token_pair(user_id, is_admin, env_admin=None, family=None):
+    ## short-lived access token carries the admin claim; the refresh token the identity and,
+    ## for ADMIN_EMAILS admins, the listed email. Both carry the chain ("family") they belong to.
+    family = family or str(uuid.uuid4())
+    refresh_claims = {"family": family}
+    if env_admin:
+        refresh_claims["env_admin"] = env_admin
+    return {
+        "access_token": create_access_token(identity=user_id, additional_claims={"is_admin": is_admin, "family": family}),
+        "refresh_token": create_refresh_token(identity=user_id, additional_claims=refresh_claims),
+    }
+
+
 @api.route("/login")
 class Login(Resource):
     @api.expect(login_input, validate=True)
     @api.marshal_with(login_output, code=200)
     def post(self):
         data = request.get_json(force=True) or {}
-        email = (data.get("email") or "").strip().lower()
+        email = normalize_email(data.get("email"))
         password = data.get("password") or ""
 
-        # Find user in DB
-        user = User.query.filter(User.email == email).first()
+        # Find user in DB: one probe of the unique normalized-email index
+        user = User.query.filter(User.email_normalized == email).first()
         if not user:
             api.abort(401, "Invalid credentials")
 
         # Check bcrypt password hash
-        if not user.password_hash or not bcrypt.check_password_hash(user.password_hash, password):
+        if not user.password_hash or not hasher.check(user.password_hash, password):
             api.abort(401, "Invalid credentials")
 
-        # Admin claim (DB flag or env list)
-        admin_emails = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
-        is_admin = bool(getattr(user, "is_admin", False)) or (email in admin_emails)
+        # Hash made at an old cost: upgrade it in the background, never delaying the login
+        if hasher.needs_rehash(user.password_hash):
+            user_id, old_hash = user.id, user.password_hash
+            hasher.rehash_later(password, lambda new_hash: facade.replace_password_hash(user_id, old_hash, new_hash))
+
+        # Admin claim (DB flag or env list); the env list stays out of the DB
+        env_admin = email if email in _admin_emails() else None
+        is_admin = bool(getattr(user, "is_admin", False)) or env_admin is not None
+
+        return _token_pair(user.id, is_admin, env_admin), 200
+
+
+@api.route("/refresh")
+class Refresh(Resource):
+    @jwt_required(refresh=True)
+    @api.doc(security="Bearer", description="Send the refresh token as Bearer; it is rotated (single use).")
+    @api.marshal_with(login_output, code=200)
+    def post(self):
+        ## no password check here: one primary-key insert and one column read
+        claims = get_jwt()
+        if not token_repo.revoke(claims):
+            # a concurrent refresh with the same token won: treat it as reuse, as the blocklist does
+            token_repo.revoke_family(claims)
+            api.abort(401, "Refresh token already used")
+
+        is_admin = facade.user_is_admin(claims["sub"])
+        if is_admin is None:
+            api.abort(401, "User no longer exists")
+        # only env admins pay for reading the env list; dropping the email ends their admin claim
+        env_admin = claims.get("env_admin")
+        if env_admin and env_admin not in _admin_emails():
+            env_admin = None
+        return _token_pair(claims["sub"], bool(is_admin) or env_admin is not None, env_admin, claims.get("family")), 200
+
+
+@api.route("/logout")
+class Logout(Resource):
+    @jwt_required(verify_type=False)
+    @api.expect(logout_input)
+    @api.doc(security="Bearer", description="Revokes the Bearer token (access or refresh) and an optional refresh_token.")
+    @api.response(204, "Revoked")
+    def post(self):
+        claims = get_jwt()
+        revoke = [claims]
+
+        refresh = (request.get_json(silent=True) or {}).get("refresh_token")
+        if refresh:
+            try:
+                refresh_claims = decode_token(refresh)
+            except (InvalidTokenError, JWTExtendedException):
+                api.abort(400, "invalid_value: refresh_token")
+            # only your own tokens
+            if refresh_claims["sub"] != claims["sub"]:
+                api.abort(403, "refresh_token belongs to another user")
+            revoke.append(refresh_claims)
 
-        token = create_access_token(identity=user.id, additional_claims={"is_admin": is_admin})
-        return {"access_token": token}, 200
+        for token_claims in revoke:
+            token_repo.revoke(token_claims)
+        return "", 204
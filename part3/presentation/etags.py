@@ -0,0 +1,39 @@
+"""Weak ETags and If-None-Match handling shared by the GET resources.
+
+Single resources tag themselves with (id, updated_at), which the repositories
+read with a one-column query, so a matching If-None-Match is answered with 304
+before the row is loaded or marshalled. Lists tag the (id, updated_at) pairs
+of the page they return, so any create, update or delete that touches the
+page changes its tag.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable
+
+from flask import request
+from werkzeug.http import quote_etag, unquote_etag
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag header value over any JSON-able parts."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return quote_etag(hashlib.sha1(raw.encode("utf-8")).hexdigest(), weak=True)
+
+
+def page_etag(items: Iterable[Dict[str, Any]], *extra: Any) -> str:
+    return make_etag([(i.get("id"), i.get("updated_at")) for i in items], *extra)
+
+
+def is_fresh(etag: str) -> bool:
+    """True if the client's If-None-Match already holds etag (weak comparison)."""
+    value, _ = unquote_etag(etag)
+    return request.if_none_match.contains_weak(value)
+
+
+def not_modified(etag: str):
+    """Response tuple for a 304; marshal_with output is dropped for 304 anyway."""
+    return None, 304, {"ETag": etag}
+
+
+def tagged(body: Any, etag: str, code: int = 200):
+    return body, code, {"ETag": etag}
@@ -0,0 +1,17 @@
+"""Admin-only runtime counters of the in-process caches."""
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from part3.app.jwt_cache import cache_stats as jwt_cache_stats
+from part3.persistence.cache import cache_stats as entity_cache_stats
+
+api = Namespace("metrics", description="Runtime metrics (admin only)")
+
+
+@api.route("/")
+class Metrics(Resource):
+    @jwt_required()
+    def get(self):
+        if not bool(get_jwt().get("is_admin", False)):
+            api.abort(403, "Admin only: you must be an admin to read metrics")
+        ## per-process numbers: each worker reports its own
+        return {"jwt_decode_cache": jwt_cache_stats(), "entity_cache": entity_cache_stats()}, 200
@@ -0,0 +1,33 @@
+"""Strict query-string numbers for the list endpoints.
+
+``request.args.get(name, type=int)`` turns "abc" into None, which silently
+drops a filter. These raise ValueError("invalid_value: <name>") instead, so
+the handlers' existing ValueError -> 400 mapping covers them. An absent or
+empty parameter is None.
+"""
+from __future__ import annotations
+import math
+from typing import Mapping, Optional
+
+
+def int_arg(args: Mapping[str, str], name: str) -> Optional[int]:
+    raw = args.get(name)
+    if raw is None or raw == "":
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"invalid_value: {name}")
+
+
+def float_arg(args: Mapping[str, str], name: str) -> Optional[float]:
+    raw = args.get(name)
+    if raw is None or raw == "":
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"invalid_value: {name}")
+    if not math.isfinite(value):
+        raise ValueError(f"invalid_value: {name}")
+    return value
@@ -1,7 +1,12 @@
-from flask import request
+import json
+from flask import Response, request, stream_with_context
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from part3.persistence import sql_place_repository as repo  # <-- DB repo
+from part3.persistence import sql_review_repository as review_repo
+from part3.presentation.etags import is_fresh, make_etag, not_modified, page_etag, tagged
+from part3.presentation.params import float_arg, int_arg
+from part3.presentation.reviews import review_output
 
 api = Namespace("places", description="Place operations")
 
@@ -24,10 +29,39 @@ place_output = api.model("PlaceOutput", {
     "longitude": fields.Float,
     "owner_id": fields.String,
     "amenity_ids": fields.List(fields.String),
+    "review_count": fields.Integer(readonly=True),
+    "last_reviewed_at": fields.String(readonly=True),
     "created_at": fields.String(readonly=True),
     "updated_at": fields.String(readonly=True),
 })
 
+place_page = api.model("PlacePage", {
+    "items": fields.List(fields.Nested(place_output)),
+    "next_cursor": fields.String,
+    "facets": fields.Raw(description="amenity id -> matching place count (with ?amenities=)"),
+})
+
+place_near = api.clone("PlaceNear", place_output, {
+    "distance_km": fields.Float,
+})
+
+place_near_page = api.model("PlaceNearPage", {
+    "items": fields.List(fields.Nested(place_near)),
+})
+
+place_review_page = api.model("PlaceReviewPage", {
+    "items": fields.List(fields.Nested(review_output)),
+    "next_cursor": fields.String,
+})
+
+place_amenities_input = api.model("PlaceAmenitiesInput", {
+    "amenity_ids": fields.List(fields.String, required=True),
+})
+
+place_amenities_output = api.clone("PlaceAmenitiesOutput", place_output, {
+    "unknown_amenity_ids": fields.List(fields.String),
+})
+
 place_update = api.model("PlaceUpdate", {
     "name": fields.String,
     "city": fields.String,
@@ -38,11 +72,49 @@ place_update = api.model("PlaceUpdate", {
 })
 
 
+def _bbox_arg(raw):
+    """'min_lng,min_lat,max_lng,max_lat' -> list of floats (None if absent)."""
+    if raw is None:
+        return None
+    try:
+        return [float(v) for v in raw.split(",")]
+    except ValueError:
+        api.abort(400, "invalid_value: bbox")
+
+
 @api.route("/")
 class PlaceList(Resource):
-    @api.marshal_list_with(place_output)
+    @api.doc(params={
+        "limit": "Page size (default 20, max 100)",
+        "cursor": "Opaque next_cursor from the previous page",
+        "city": "Exact city name",
+        "min_price": "Lowest price_per_night",
+        "max_price": "Highest price_per_night",
+        "sort": "created (default), price or -price",
+        "bbox": "min_lng,min_lat,max_lng,max_lat",
+        "amenities": "Comma-separated amenity ids; places must have all of them",
+    })
+    @api.marshal_with(place_page)
     def get(self):
-        return repo.list_places()
+        args = request.args
+        try:
+            page = repo.list_places(
+                limit=int_arg(args, "limit"),
+                cursor=args.get("cursor"),
+                city=args.get("city"),
+                min_price=int_arg(args, "min_price"),
+                max_price=int_arg(args, "max_price"),
+                sort=args.get("sort"),
+                bbox=_bbox_arg(args.get("bbox")),
+                amenities=[a for a in args.get("amenities", "").split(",") if a],
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+
+        etag = page_etag(page["items"], page["next_cursor"], page["facets"])
+        if is_fresh(etag):
+            return not_modified(etag)
+        return tagged(page, etag)
 
     @jwt_required()
     @api.expect(place_input, validate=True)
@@ -66,19 +138,110 @@ class PlaceList(Resource):
             api.abort(400, "invalid_value: longitude")
 
         data["owner_id"] = get_jwt_identity()
-        created = repo.create_place(data)
+        try:
+            created = repo.create_place(data)
+        except ValueError as e:
+            api.abort(400, str(e))
         return created, 201
 
 
+@api.route("/near")
+class PlaceNear(Resource):
+    @api.doc(params={
+        "lat": "Latitude of the center point",
+        "lng": "Longitude of the center point",
+        "radius_km": "Search radius in km (max 500)",
+        "limit": "Max results (default 20, max 100)",
+    })
+    @api.marshal_with(place_near_page)
+    def get(self):
+        args = request.args
+        lat = args.get("lat", type=float)
+        lng = args.get("lng", type=float)
+        if lat is None or lng is None:
+            api.abort(400, "invalid_value: lat/lng")
+        try:
+            return repo.near_places(
+                lat, lng, float_arg(args, "radius_km"), limit=int_arg(args, "limit")
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+
+
+@api.route("/nearest")
+class PlaceNearest(Resource):
+    @api.doc(params={
+        "lat": "Latitude of the point",
+        "lng": "Longitude of the point",
+        "k": "Number of places (default 20, max 100)",
+    })
+    @api.marshal_with(place_near_page)
+    def get(self):
+        args = request.args
+        lat = args.get("lat", type=float)
+        lng = args.get("lng", type=float)
+        if lat is None or lng is None:
+            api.abort(400, "invalid_value: lat/lng")
+        try:
+            return repo.k_nearest(lat, lng, int_arg(args, "k"))
+        except ValueError as e:
+            api.abort(400, str(e))
+
+
+@api.route("/search")
+class PlaceSearch(Resource):
+    @api.doc(params={
+        "q": "Words to find in name/description (each matched as a prefix)",
+        "limit": "Max results (default 20, max 100)",
+    })
+    @api.marshal_with(place_page)
+    def get(self):
+        try:
+            return repo.search_places(
+                request.args.get("q", ""), limit=int_arg(request.args, "limit")
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+
+
+@api.route("/bulk")
+class PlaceBulk(Resource):
+    @jwt_required()
+    @api.doc(
+        description=(
+            "Admin only. Body is NDJSON, one place object per line (same fields as POST /places/, "
+            "optional owner_id, defaults to the caller). Response streams one NDJSON result per line: "
+            '{"line": n, "status": "created", "id": ...} or {"line": n, "status": "error", "error": ...}'
+        ),
+    )
+    @api.response(200, "NDJSON stream of per-line results")
+    def post(self):
+        claims = get_jwt()
+        if not bool(claims.get("is_admin", False)):
+            api.abort(403, "Admin only: you must be an admin to bulk import places")
+
+        results = repo.bulk_create_places(request.stream, owner_id=get_jwt_identity())
+        body = (json.dumps(r) + "\n" for r in results)
+        return Response(stream_with_context(body), mimetype="application/x-ndjson")
+
+
 @api.route("/<string:place_id>")
 @api.param("place_id", "The place ID")
 class Place(Resource):
     @api.marshal_with(place_output)
     def get(self, place_id):
+        ## If-None-Match is checked against updated_at before the place is loaded
+        version = repo.place_version(place_id)
+        if version is None:
+            api.abort(404, "Place not found")
+        etag = make_etag(place_id, version)
+        if is_fresh(etag):
+            return not_modified(etag)
+
         place = repo.get_place(place_id)
         if not place:
             api.abort(404, "Place not found")
-        return place
+        return tagged(place, make_etag(place_id, place["updated_at"]))
 
     @jwt_required()
     @api.expect(place_update, validate=True)
@@ -119,6 +282,60 @@ class Place(Resource):
         return "", 204
 
 
+@api.route("/<string:place_id>/reviews")
+@api.param("place_id", "The place ID")
+class PlaceReviewList(Resource):
+    @api.doc(params={
+        "limit": "Page size (default 20, max 100)",
+        "cursor": "Opaque next_cursor from the previous page",
+    })
+    @api.marshal_with(place_review_page)
+    def get(self, place_id):
+        ## oldest first, one index range probe per page
+        args = request.args
+        try:
+            page = review_repo.list_place_reviews(
+                place_id, limit=int_arg(args, "limit"), cursor=args.get("cursor")
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        if page is None:
+            api.abort(404, "Place not found")
+
+        etag = page_etag(page["items"], page["next_cursor"])
+        if is_fresh(etag):
+            return not_modified(etag)
+        return tagged(page, etag)
+
+
+@api.route("/<string:place_id>/amenities")
+@api.param("place_id", "The place ID")
+class PlaceAmenitySet(Resource):
+    @jwt_required()
+    @api.expect(place_amenities_input, validate=True)
+    @api.marshal_with(place_amenities_output, code=200)
+    def put(self, place_id):
+        ## replace the whole amenity set; unknown ids are reported, not fatal
+        current_user = get_jwt_identity()
+        is_admin = bool(get_jwt().get("is_admin", False))
+
+        existing = repo.get_place(place_id)
+        if not existing:
+            api.abort(404, "Place not found")
+
+        if (existing.get("owner_id") != current_user) and (not is_admin):
+            api.abort(
+                403,
+                "Only the owner or an admin can change amenities for this place",
+            )
+
+        data = request.get_json(force=True) or {}
+        updated = repo.set_amenities(place_id, data.get("amenity_ids") or [])
+        if not updated:
+            api.abort(404, "Place not found")
+        return updated, 200
+
+
 @api.route("/<string:place_id>/amenities/<string:amenity_id>")
 @api.param("place_id", "The place ID")
 @api.param("amenity_id", "The amenity ID")
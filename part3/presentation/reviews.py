@@ -3,6 +3,7 @@ from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from part3.persistence import sql_review_repository as repo
+from part3.presentation.etags import is_fresh, make_etag, not_modified, page_etag, tagged
 
 api = Namespace("reviews", description="Review operations")
 
@@ -30,7 +31,11 @@ class ReviewList(Resource):
     @api.marshal_list_with(review_output)
     def get(self):
         ## list all reviews
-        return repo.list_reviews()
+        reviews = repo.list_reviews()
+        etag = page_etag(reviews)
+        if is_fresh(etag):
+            return not_modified(etag)
+        return tagged(reviews, etag)
 
     @jwt_required()
     @api.expect(review_input, validate=True)
@@ -68,11 +73,18 @@ class ReviewList(Resource):
 class Review(Resource):
     @api.marshal_with(review_output)
     def get(self, review_id):
-        ## fetch single review
+        ## fetch single review (304 straight from updated_at when unchanged)
+        version = repo.review_version(review_id)
+        if version is None:
+            api.abort(404, "Review not found")
+        etag = make_etag(review_id, version)
+        if is_fresh(etag):
+            return not_modified(etag)
+
         r = repo.get_review(review_id)
         if not r:
             api.abort(404, "Review not found")
-        return r
+        return tagged(r, make_etag(review_id, r["updated_at"]))
 
     @jwt_required()
     @api.expect(review_update, validate=True)
@@ -3,6 +3,10 @@ from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from part3.business.facade import Facade  # Import Facade class
+from part3.presentation.etags import is_fresh, make_etag, not_modified, page_etag, tagged
+from part3.presentation.params import int_arg
+from part3.presentation.places import place_output
+from part3.presentation.reviews import review_output
 
 api = Namespace("users", description="User operations")
 
@@ -31,11 +35,54 @@ user_output = api.model("UserOutput", {
     "updated_at":  fields.String(readonly=True),
 })
 
+user_page = api.model("UserPage", {
+    "items":       fields.List(fields.Nested(user_output)),
+    "next_cursor": fields.String,
+})
+
+user_place_page = api.model("UserPlacePage", {
+    "items":       fields.List(fields.Nested(place_output)),
+    "next_cursor": fields.String,
+})
+
+user_review_page = api.model("UserReviewPage", {
+    "items":       fields.List(fields.Nested(review_output)),
+    "next_cursor": fields.String,
+})
+
+page_params = {
+    "limit": "Page size (default 20, max 100)",
+    "cursor": "Opaque next_cursor from the previous page",
+}
+
+
+def _page_response(page):
+    if page is None:
+        api.abort(404, "User not found")
+    etag = page_etag(page["items"], page["next_cursor"])
+    if is_fresh(etag):
+        return not_modified(etag)
+    return tagged(page, etag)
+
+
 @api.route("/")
 class UserList(Resource):
-    @api.marshal_list_with(user_output, code=200)
+    @api.doc(params=dict(page_params, email_prefix="Only users whose email starts with this (email order)"))
+    @api.marshal_with(user_page, code=200)
     def get(self):
-        return facade.list_users()  # Use Facade method
+        args = request.args
+        try:
+            page = facade.list_users(  # Use Facade method
+                limit=int_arg(args, "limit"),
+                cursor=args.get("cursor"),
+                email_prefix=args.get("email_prefix") or None,
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        etag = page_etag(page["items"], page["next_cursor"])
+        if is_fresh(etag):
+            return not_modified(etag)
+        return tagged(page, etag)
 
     @api.expect(user_input, validate=True)
     @api.marshal_with(user_output, code=201)
@@ -56,10 +103,17 @@ class UserList(Resource):
 class UserItem(Resource):
     @api.marshal_with(user_output, code=200)
     def get(self, user_id):
+        version = facade.user_version(user_id)
+        if version is None:
+            api.abort(404, "User not found")
+        etag = make_etag(user_id, version)
+        if is_fresh(etag):
+            return not_modified(etag)
+
         u = facade.get_user(user_id)  # Use Facade method
         if not u:
             api.abort(404, "User not found")
-        return u
+        return tagged(u, make_etag(user_id, u["updated_at"]))
 
     @jwt_required()
     @api.expect(user_update, validate=True)
@@ -96,3 +150,35 @@ class UserItem(Resource):
             api.abort(404, "User not found")
         return "", 204
 
+
+
+@api.route("/<string:user_id>/places")
+@api.param("user_id", "The user ID")
+class UserPlaceList(Resource):
+    @api.doc(params=page_params)
+    @api.marshal_with(user_place_page, code=200)
+    def get(self, user_id):
+        ## keyset page of the user's listings; the User row itself is never loaded
+        try:
+            page = facade.list_user_places(
+                user_id, limit=int_arg(request.args, "limit"), cursor=request.args.get("cursor")
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        return _page_response(page)
+
+
+@api.route("/<string:user_id>/reviews")
+@api.param("user_id", "The user ID")
+class UserReviewList(Resource):
+    @api.doc(params=page_params)
+    @api.marshal_with(user_review_page, code=200)
+    def get(self, user_id):
+        ## keyset page of the reviews the user wrote
+        try:
+            page = facade.list_user_reviews(
+                user_id, limit=int_arg(request.args, "limit"), cursor=request.args.get("cursor")
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        return _page_response(page)
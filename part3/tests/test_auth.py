@@ -3,12 +3,13 @@ import uuid
 import pytest
 from flask import Flask
 from part3.app import create_app
+from part3.config import TestConfig
 from part3.app.extensions import db
 
 
 @pytest.fixture
 def app():
-    app = create_app()
+    app = create_app(TestConfig)
     app.config["TESTING"] = True
     return app
 
@@ -122,3 +123,331 @@ def test_login_with_bad_password_fails(client, setup_db):
     msg = (data.get("message") or "").lower()
     assert "invalid" in msg or "credentials" in msg or "password" in msg
 
+
+def test_mixed_case_email_logs_in_and_blocks_case_variants(app, client, setup_db):
+    from part3.models import User
+
+    local = f"Mixed_{uuid.uuid4().hex}"
+    password = "MyStrongPass123!"
+    resp = client.post("/api/v1/users/", json={
+        "first_name": "Mixed", "last_name": "Case", "email": f"{local}@Example.COM", "password": password,
+    })
+    assert resp.status_code == 201
+    ## stored as typed, matched normalized
+    assert resp.get_json()["email"] == f"{local}@Example.COM"
+    with app.app_context():
+        assert User.query.filter_by(id=resp.get_json()["id"]).one().email_normalized == f"{local.lower()}@example.com"
+
+    for typed in (f"{local}@Example.COM", f"{local.lower()}@example.com", f"  {local.upper()}@EXAMPLE.com "):
+        login = client.post("/api/v1/auth/login", json={"email": typed, "password": password})
+        assert login.status_code == 200, typed
+
+    dup = client.post("/api/v1/users/", json={
+        "first_name": "Other", "last_name": "Case", "email": f"{local.lower()}@example.com", "password": password,
+    })
+    assert dup.status_code == 400
+    assert "email_already_exists" in dup.get_json()["message"]
+
+
+
+def _stored_hash(app, email):
+    from part3.models import User
+    with app.app_context():
+        return User.query.filter_by(email=email).one().password_hash
+
+
+def test_login_rehashes_outdated_cost_in_background(app, client, setup_db):
+    from part3.app.extensions import hasher
+
+    email = _unique_email()
+    password = "MyStrongPass123!"
+    client.post("/api/v1/users/", json={
+        "first_name": "Re", "last_name": "Hash", "email": email, "password": password,
+    })
+    assert _stored_hash(app, email).startswith("$2b$04$")
+
+    ## the cost goes up; the next good login upgrades the stored hash
+    app.config["BCRYPT_LOG_ROUNDS"] = 5
+    assert client.post("/api/v1/auth/login", json={"email": email, "password": password}).status_code == 200
+    hasher.drain()
+    upgraded = _stored_hash(app, email)
+    assert upgraded.startswith("$2b$05$")
+
+    ## a bad password never triggers a rehash, and the new hash still logs in
+    app.config["BCRYPT_LOG_ROUNDS"] = 6
+    assert client.post("/api/v1/auth/login", json={"email": email, "password": "nope"}).status_code == 401
+    hasher.drain()
+    assert _stored_hash(app, email) == upgraded
+    app.config["BCRYPT_LOG_ROUNDS"] = 5
+    assert client.post("/api/v1/auth/login", json={"email": email, "password": password}).status_code == 200
+
+
+def test_rehash_does_not_overwrite_a_changed_hash(app, client, setup_db):
+    from part3.business.facade import Facade
+
+    email = _unique_email()
+    user = client.post("/api/v1/users/", json={
+        "first_name": "Cas", "last_name": "User", "email": email, "password": "MyStrongPass123!",
+    }).get_json()
+    current = _stored_hash(app, email)
+    with app.app_context():
+        assert Facade().replace_password_hash(user["id"], "stale-hash", "new-hash") is False
+    assert _stored_hash(app, email) == current
+
+
+def test_target_ms_calibrates_cost():
+    from part3.config import TestConfig
+
+    class Calibrated(TestConfig):
+        BCRYPT_TARGET_MS = 0.001
+
+    ## a target below any real hash time clamps to bcrypt's minimum cost
+    assert create_app(Calibrated).config["BCRYPT_LOG_ROUNDS"] == 4
+
+
+def _register_and_login_tokens(client, email=None, password="MyStrongPass123!"):
+    email = email or _unique_email()
+    client.post("/api/v1/users/", json={
+        "first_name": "Refresh", "last_name": "User", "email": email, "password": password,
+    })
+    resp = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def _refresh(client, refresh_token):
+    return client.post("/api/v1/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+
+
+def test_refresh_rotates_without_checking_the_password(client, setup_db, monkeypatch):
+    from part3.app.extensions import hasher
+
+    tokens = _register_and_login_tokens(client)
+    assert tokens["refresh_token"]
+
+    ## refresh never touches bcrypt
+    monkeypatch.setattr(hasher, "check", lambda *a: pytest.fail("bcrypt used on refresh"))
+    resp = _refresh(client, tokens["refresh_token"])
+    assert resp.status_code == 200
+    rotated = resp.get_json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    ## the new access token works on protected routes
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    place = client.post("/api/v1/places/", json={"name": "R", "city": "Ponce", "price_per_night": 50}, headers=headers)
+    assert place.status_code == 201
+
+    ## the new refresh token works once more; the old one is single use
+    assert _refresh(client, rotated["refresh_token"]).status_code == 200
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_refresh_rejects_access_tokens(client, setup_db):
+    tokens = _register_and_login_tokens(client)
+    assert _refresh(client, tokens["access_token"]).status_code in (401, 422)
+
+
+def test_refresh_reads_admin_flag_from_db(app, client, setup_db, monkeypatch):
+    from flask_jwt_extended import decode_token
+    from part3.models import User
+
+    email = _unique_email()
+    tokens = _register_and_login_tokens(client, email=email)
+    with app.app_context():
+        User.query.filter_by(email=email).update({"is_admin": True})
+        db.session.commit()
+
+    rotated = _refresh(client, tokens["refresh_token"]).get_json()
+    with app.app_context():
+        assert decode_token(rotated["access_token"])["is_admin"] is True
+
+
+def test_env_admins_stay_out_of_the_db(app, client, setup_db, monkeypatch):
+    from flask_jwt_extended import decode_token
+    from part3.models import User
+
+    email = _unique_email()
+    monkeypatch.setenv("ADMIN_EMAILS", email)
+    tokens = _register_and_login_tokens(client, email=email)
+    rotated = _refresh(client, tokens["refresh_token"]).get_json()
+    with app.app_context():
+        assert decode_token(tokens["access_token"])["is_admin"] is True
+        assert decode_token(rotated["access_token"])["is_admin"] is True
+        assert User.query.filter_by(email=email).one().is_admin is False
+
+    ## off the list: the next refresh drops the claim
+    monkeypatch.setenv("ADMIN_EMAILS", "someone_else@example.com")
+    rotated = _refresh(client, rotated["refresh_token"]).get_json()
+    with app.app_context():
+        assert decode_token(rotated["access_token"])["is_admin"] is False
+        assert "env_admin" not in decode_token(rotated["refresh_token"])
+
+
+def test_reused_refresh_token_revokes_its_chain(client, setup_db):
+    tokens = _register_and_login_tokens(client)
+    other = _register_and_login_tokens(client)
+    rotated = _refresh(client, tokens["refresh_token"]).get_json()
+
+    ## the old token comes back (leaked): everything issued along its chain dies
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+    assert _refresh(client, rotated["refresh_token"]).status_code == 401
+    place = {"name": "C", "city": "Ponce", "price_per_night": 50}
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert client.post("/api/v1/places/", json=place, headers=headers).status_code == 401
+
+    ## other logins (other chains) are untouched
+    assert _refresh(client, other["refresh_token"]).status_code == 200
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, setup_db):
+    tokens = _register_and_login_tokens(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    place = {"name": "L", "city": "Ponce", "price_per_night": 50}
+    assert client.post("/api/v1/places/", json=place, headers=headers).status_code == 201
+
+    resp = client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    assert resp.status_code == 204
+
+    resp = client.post("/api/v1/places/", json=place, headers=headers)
+    assert resp.status_code == 401
+    assert "revoked" in resp.get_json()["message"].lower()
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_unrevoked_tokens_skip_the_database(app, setup_db):
+    from sqlalchemy import event
+    from part3.persistence import revocation
+
+    with app.app_context():
+        revocation.get_filter()
+        statements = []
+
+        def _before(conn, cursor, statement, params, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", _before)
+        try:
+            for _ in range(50):
+                assert revocation.is_revoked(uuid.uuid4().hex) is False
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _before)
+        ## no revocations: only Bloom lookups, no queries (inside the refresh interval)
+        assert statements == []
+
+
+def test_revocations_from_other_processes_arrive_by_delta_refresh(app, setup_db):
+    from datetime import timedelta
+    from part3.models import RevokedToken, _utcnow
+    from part3.persistence import revocation
+
+    with app.app_context():
+        bloom = revocation.get_filter()
+        ## another process writes straight to the table; this filter has not seen it yet
+        jti = uuid.uuid4().hex
+        db.session.add(RevokedToken(jti=jti, token_type="access", user_id="u",
+                                    expires_at=_utcnow() + timedelta(hours=1)))
+        db.session.commit()
+        assert revocation.is_revoked(jti) is False
+
+        bloom.refresh(force=True)
+        assert revocation.is_revoked(jti) is True
+
+
+def test_repeated_refreshes_do_not_inflate_the_bloom_count(app, client, setup_db):
+    from part3.persistence import revocation
+
+    tokens = _register_and_login_tokens(client)
+    for _ in range(3):
+        tokens = _refresh(client, tokens["refresh_token"]).get_json()
+    with app.app_context():
+        bloom = revocation.get_filter()
+        count = bloom.bloom.count
+        ## each delta re-reads the overlap window: the same jtis again
+        for _ in range(5):
+            bloom.refresh(force=True)
+        assert bloom.bloom.count == count == 3
+
+
+def test_bloom_filter_has_no_false_negatives():
+    from part3.persistence.revocation import BloomFilter
+
+    bloom = BloomFilter(capacity=2000)
+    members = [uuid.uuid4().hex for _ in range(2000)]
+    for m in members:
+        bloom.add(m)
+    assert all(m in bloom for m in members)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10_000))
+    assert false_positives < 50  # sized for 0.1%
+
+
+def _admin_headers(client, monkeypatch):
+    email = _unique_email()
+    monkeypatch.setenv("ADMIN_EMAILS", email)
+    tokens = _register_and_login_tokens(client, email=email)
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_repeated_token_is_decoded_once_and_reported(client, setup_db, monkeypatch):
+    headers = _admin_headers(client, monkeypatch)
+    for _ in range(5):
+        assert client.get("/api/v1/metrics/", headers=headers).status_code == 200
+
+    stats = client.get("/api/v1/metrics/", headers=headers).get_json()["jwt_decode_cache"]
+    ## first request misses, the other five hit
+    assert stats["misses"] == 1
+    assert stats["hits"] == 5
+    assert stats["size"] == 1
+
+    ## cached claims still go through the revocation check
+    client.post("/api/v1/auth/logout", headers=headers)
+    assert client.get("/api/v1/metrics/", headers=headers).status_code == 401
+
+
+def test_metrics_are_admin_only(client, setup_db):
+    tokens = _register_and_login_tokens(client)
+    resp = client.get("/api/v1/metrics/", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert resp.status_code == 403
+
+
+def test_tampered_token_is_not_served_from_cache(client, setup_db, monkeypatch):
+    headers = _admin_headers(client, monkeypatch)
+    assert client.get("/api/v1/metrics/", headers=headers).status_code == 200
+    token = headers["Authorization"].split()[1]
+    forged = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+    assert client.get("/api/v1/metrics/", headers={"Authorization": f"Bearer {forged}"}).status_code == 422
+
+
+def test_rotated_secret_is_not_bypassed_by_the_cache(app, client, setup_db, monkeypatch):
+    headers = _admin_headers(client, monkeypatch)
+    assert client.get("/api/v1/metrics/", headers=headers).status_code == 200
+    app.config["JWT_SECRET_KEY"] = "rotated-secret"
+    assert client.get("/api/v1/metrics/", headers=headers).status_code == 422
+
+
+def test_overridden_decode_hook_keeps_its_signature():
+    import inspect
+    from flask_jwt_extended import JWTManager
+
+    ## CachingJWTManager overrides this private method; an upgrade that renames or reshapes it must fail here
+    hook = getattr(JWTManager, "_decode_jwt_from_config", None)
+    assert hook is not None
+    assert list(inspect.signature(hook).parameters) == ["self", "encoded_token", "csrf_value", "allow_expired"]
+
+
+def test_decoded_token_cache_evicts_lru_and_expires(monkeypatch):
+    import time
+    from part3.app.jwt_cache import DecodedTokenCache
+
+    cache = DecodedTokenCache(max_size=2)
+    now = time.time()
+    cache.put(b"a", {"exp": now + 60})
+    cache.put(b"b", {"exp": now + 60})
+    assert cache.get(b"a") is not None  # a is now most recent
+    cache.put(b"c", {"exp": now + 60})  # evicts b
+    assert cache.get(b"b") is None
+    assert cache.get(b"c") is not None
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get(b"a") is None
+    stats = cache.stats()
+    assert (stats["evictions"], stats["expirations"], stats["hits"]) == (1, 1, 2)
@@ -0,0 +1,48 @@
+import pytest
+from part3.app import create_app
+from part3.config import TestConfig
+from part3.app.extensions import db
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def setup_db(app):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield db
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _pragma(name):
+    return db.session.connection().exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_sqlite_connections_get_configured_pragmas(app, setup_db):
+    with app.app_context():
+        assert _pragma("journal_mode") == "wal"
+        assert _pragma("synchronous") == 1  # NORMAL
+        assert _pragma("busy_timeout") == 5000
+        assert _pragma("cache_size") == -64000
+        assert _pragma("foreign_keys") == 1
+
+
+def test_foreign_keys_stay_on_when_pragmas_are_overridden(tmp_path):
+    class NoPragmas(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'plain.db'}"
+        SQLITE_PRAGMAS = {"journal_mode": "DELETE"}
+
+    app = create_app(NoPragmas)
+    with app.app_context():
+        ## cascades depend on it, so a custom profile can't drop it
+        assert _pragma("journal_mode") == "delete"
+        assert _pragma("foreign_keys") == 1
+        db.engine.dispose()
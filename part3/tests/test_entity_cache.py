@@ -0,0 +1,182 @@
+import time
+import uuid
+
+import pytest
+from sqlalchemy import event
+from part3.app import create_app
+from part3.config import TestConfig
+from part3.app.extensions import db
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def setup_db(app):
+    ## fresh DB per test
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield db
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _register_and_login(client, password="MyStrongPass123!"):
+    email = f"cache_{uuid.uuid4().hex}@example.com"
+    user = client.post("/api/v1/users/", json={
+        "first_name": "Cache",
+        "last_name": "Tester",
+        "email": email,
+        "password": password,
+    }).get_json()
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": password}).get_json()["access_token"]
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+def _create_place(client, headers):
+    resp = client.post("/api/v1/places/", json={"name": "Cached", "city": "Ponce", "price_per_night": 80}, headers=headers)
+    assert resp.status_code == 201
+    return resp.get_json()
+
+
+def _count_statements(app, fn):
+    statements = []
+
+    def _count(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    return statements
+
+
+def test_repeat_place_get_is_served_from_cache(app, client, setup_db):
+    _, headers = _register_and_login(client)
+    place = _create_place(client, headers)
+    url = f"/api/v1/places/{place['id']}"
+
+    assert client.get(url).status_code == 200
+    ## only the ETag version probe is left
+    statements = _count_statements(app, lambda: client.get(url))
+    assert len(statements) == 1
+    assert "updated_at" in statements[0]
+
+
+def test_writes_invalidate_cached_places(app, client, setup_db):
+    from part3.models import Amenity
+
+    _, headers = _register_and_login(client)
+    place = _create_place(client, headers)
+    url = f"/api/v1/places/{place['id']}"
+    with app.app_context():
+        wifi = Amenity(name="Wifi")
+        db.session.add(wifi)
+        db.session.commit()
+        wifi_id = wifi.id
+
+    client.get(url)
+    client.put(url, json={"price_per_night": 95}, headers=headers)
+    assert client.get(url).get_json()["price_per_night"] == 95
+
+    client.post(f"{url}/amenities/{wifi_id}", headers=headers)
+    assert client.get(url).get_json()["amenity_ids"] == [wifi_id]
+    client.delete(f"{url}/amenities/{wifi_id}", headers=headers)
+    assert client.get(url).get_json()["amenity_ids"] == []
+
+    _, guest = _register_and_login(client)
+    client.post("/api/v1/reviews/", json={"text": "Lovely", "place_id": place["id"]}, headers=guest)
+    assert client.get(url).get_json()["review_count"] == 1
+
+
+def test_cascading_deletes_invalidate_cached_children(app, client, setup_db):
+    from part3.persistence import sql_place_repository, sql_review_repository
+    from part3.persistence.sql_repository import SQLAlchemyRepository
+
+    host, host_headers = _register_and_login(client)
+    place = _create_place(client, host_headers)
+    _, guest_headers = _register_and_login(client)
+    review = client.post(
+        "/api/v1/reviews/", json={"text": "Lovely", "place_id": place["id"]}, headers=guest_headers
+    ).get_json()
+
+    def cached_reads():
+        ## the read functions themselves (GET handlers probe the row version first)
+        with app.app_context():
+            return (
+                sql_place_repository.get_place(place["id"]),
+                sql_review_repository.get_review(review["id"]),
+                SQLAlchemyRepository().get_user(host["id"]),
+            )
+
+    assert all(cached_reads())
+    ## the place and the review on it go by ON DELETE CASCADE
+    assert client.delete(f"/api/v1/users/{host['id']}", headers=host_headers).status_code == 204
+    assert cached_reads() == (None, None, None)
+
+
+def test_entity_cache_counters_in_metrics(client, setup_db, monkeypatch):
+    email, password = f"cache_admin_{uuid.uuid4().hex}@example.com", "MyStrongPass123!"
+    monkeypatch.setenv("ADMIN_EMAILS", email)
+    client.post("/api/v1/users/", json={"first_name": "A", "last_name": "D", "email": email, "password": password})
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": password}).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    place = _create_place(client, headers)
+    for _ in range(3):
+        client.get(f"/api/v1/places/{place['id']}")
+
+    stats = client.get("/api/v1/metrics/", headers=headers).get_json()["entity_cache"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+    assert stats["hit_rate"] == round(2 / 3, 4)
+
+
+def test_lru_cache_evicts_expires_and_copies(monkeypatch):
+    from part3.persistence.cache import LRUCache
+
+    cache = LRUCache(max_size=2, ttl=10)
+    cache.set("place:a", {"id": "a", "amenity_ids": []})
+    cache.set("place:b", {"id": "b"})
+    assert cache.get("place:a")["id"] == "a"
+    cache.set("place:c", {"id": "c"})
+    ## b was least recently used
+    assert cache.get("place:b") is None
+    assert cache.stats()["evictions"] == 1
+
+    ## callers can't change what is cached
+    cache.get("place:a")["amenity_ids"].append("x")
+    assert cache.get("place:a")["amenity_ids"] == []
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get("place:a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_incomplete_backend_fails_at_app_creation():
+    from part3.persistence.cache import EntityCache
+
+    class GetOnly(EntityCache):
+        def get(self, key):
+            return None
+
+    class BrokenBackendConfig(TestConfig):
+        ENTITY_CACHE_BACKEND = staticmethod(lambda app: GetOnly())
+
+    with pytest.raises(TypeError):
+        create_app(BrokenBackendConfig)
@@ -0,0 +1,128 @@
+import uuid
+
+import pytest
+from part3.app import create_app
+from part3.config import TestConfig
+from part3.app.extensions import db
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def setup_db(app):
+    ## fresh DB per test
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield db
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _register_and_login(client, password="MyStrongPass123!"):
+    email = f"etag_{uuid.uuid4().hex}@example.com"
+    user = client.post("/api/v1/users/", json={
+        "first_name": "Etag",
+        "last_name": "Tester",
+        "email": email,
+        "password": password,
+    }).get_json()
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": password}).get_json()["access_token"]
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+def _revalidate(client, url):
+    ## first GET hands out the tag, second GET sends it back
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    second = client.get(url, headers={"If-None-Match": etag})
+    return etag, second
+
+
+def test_place_get_returns_304_until_it_changes(client, setup_db):
+    _, headers = _register_and_login(client)
+    place = client.post("/api/v1/places/", json={
+        "name": "Tagged", "city": "Ponce", "price_per_night": 80,
+    }, headers=headers).get_json()
+    url = f"/api/v1/places/{place['id']}"
+
+    etag, resp = _revalidate(client, url)
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    assert resp.data == b""
+
+    client.put(url, json={"price_per_night": 95}, headers=headers)
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.get_json()["price_per_night"] == 95
+    assert resp.headers["ETag"] != etag
+
+
+def test_place_list_tag_changes_when_page_changes(client, setup_db):
+    _, headers = _register_and_login(client)
+    client.post("/api/v1/places/", json={"name": "A", "city": "Ponce", "price_per_night": 80}, headers=headers)
+
+    etag, resp = _revalidate(client, "/api/v1/places/")
+    assert resp.status_code == 304
+
+    client.post("/api/v1/places/", json={"name": "B", "city": "Ponce", "price_per_night": 90}, headers=headers)
+    resp = client.get("/api/v1/places/", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert len(resp.get_json()["items"]) == 2
+
+
+def test_user_and_review_gets_revalidate(client, setup_db):
+    _, owner_headers = _register_and_login(client)
+    guest, guest_headers = _register_and_login(client)
+
+    place = client.post("/api/v1/places/", json={
+        "name": "Reviewed", "city": "Ponce", "price_per_night": 80,
+    }, headers=owner_headers).get_json()
+    review = client.post("/api/v1/reviews/", json={
+        "text": "Lovely", "place_id": place["id"],
+    }, headers=guest_headers).get_json()
+
+    assert _revalidate(client, f"/api/v1/users/{guest['id']}")[1].status_code == 304
+    assert _revalidate(client, f"/api/v1/reviews/{review['id']}")[1].status_code == 304
+    assert _revalidate(client, "/api/v1/reviews/")[1].status_code == 304
+    assert _revalidate(client, "/api/v1/users/")[1].status_code == 304
+
+
+def test_amenity_get_revalidates(client, setup_db, monkeypatch):
+    email = f"etag_admin_{uuid.uuid4().hex}@example.com"
+    password = "MyStrongPass123!"
+    client.post("/api/v1/users/", json={
+        "first_name": "Admin", "last_name": "User", "email": email, "password": password,
+    })
+    monkeypatch.setenv("ADMIN_EMAILS", email)
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": password}).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    amenity = client.post("/api/v1/amenities/", json={"name": "Wifi"}, headers=headers).get_json()
+    url = f"/api/v1/amenities/{amenity['id']}"
+    etag, resp = _revalidate(client, url)
+    assert resp.status_code == 304
+    assert _revalidate(client, "/api/v1/amenities/")[1].status_code == 304
+
+    client.put(url, json={"name": "Fast Wifi"}, headers=headers)
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_unknown_ids_still_404(client, setup_db):
+    assert client.get("/api/v1/places/nope").status_code == 404
+    assert client.get("/api/v1/users/nope").status_code == 404
+    assert client.get("/api/v1/reviews/nope").status_code == 404
+    assert client.get("/api/v1/amenities/nope").status_code == 404
@@ -0,0 +1,103 @@
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from part3.app import create_app
+from part3.config import TestConfig
+from part3.app.extensions import db
+from part3.models import User, Place, Amenity
+from part3.persistence import sql_place_repository as repo
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def setup_db(app):
+    ## fresh schema, and stay inside the app context for direct repo calls
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield db
+        db.session.remove()
+        db.drop_all()
+
+
+@contextmanager
+def _count_statements():
+    ## count every SQL statement sent to the engine while the block runs
+    statements = []
+
+    def _before(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _before)
+
+
+def _seed_places(n, amenities_per_place=3):
+    owner = User(
+        first_name="Loader",
+        last_name="Owner",
+        email=f"loader_{uuid.uuid4().hex}@example.com",
+        password_hash="x",
+    )
+    amenities = [Amenity(name=f"amenity-{uuid.uuid4().hex}") for _ in range(amenities_per_place)]
+    places = []
+    for i in range(n):
+        p = Place(name=f"Place {i}", city="San Juan", price_per_night=100 + i, owner=owner)
+        p.amenities.extend(amenities)
+        places.append(p)
+    db.session.add_all(places)
+    db.session.commit()
+    ids = [p.id for p in places]
+    ## drop the identity map so the repo has to hit the database
+    db.session.expunge_all()
+    return ids
+
+
+def test_place_card_profile_list_uses_two_statements(setup_db):
+    """One SELECT for the page, one for the amenity ids, however many rows."""
+    _seed_places(5)
+
+    with _count_statements() as statements:
+        page = repo.list_places(limit=10)
+
+    assert len(page["items"]) == 5
+    assert all(len(p["amenity_ids"]) == 3 for p in page["items"])
+    assert len(statements) == 2
+
+
+def test_place_detail_profile_get_uses_two_statements(setup_db):
+    """Place joined with its owner, plus amenity ids; nothing else is loaded."""
+    place_id = _seed_places(1)[0]
+
+    with _count_statements() as statements:
+        place = repo.get_place(place_id)
+
+    assert place["id"] == place_id
+    assert len(place["amenity_ids"]) == 3
+    assert len(statements) == 2
+    assert "JOIN users" in statements[0]
+
+
+def test_owner_places_page_never_loads_the_user_graph(setup_db):
+    """Existence probe, page, amenity ids: User.places / User.reviews stay untouched."""
+    place_id = _seed_places(3)[0]
+    owner_id = db.session.get(Place, place_id).owner_id
+    db.session.expunge_all()
+
+    with _count_statements() as statements:
+        page = repo.list_owner_places(owner_id, limit=10)
+
+    assert len(page["items"]) == 3
+    assert len(statements) == 3
+    assert not any("FROM reviews" in s for s in statements)
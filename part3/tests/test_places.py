@@ -1,7 +1,9 @@
+import json
 import uuid
 
 import pytest
 from part3.app import create_app
+from part3.config import TestConfig
 from part3.app.extensions import db
 
 
@@ -10,7 +12,7 @@ from part3.app.extensions import db
 @pytest.fixture
 def app():
     ## real app in testing mode
-    app = create_app()
+    app = create_app(TestConfig)
     app.config["TESTING"] = True
     return app
 
@@ -162,3 +164,531 @@ def test_non_owner_cannot_delete_place(client, setup_db):
     resp = client.delete(f"/api/v1/places/{place_id}", headers=headers)
     assert resp.status_code == 403
 
+
+
+def test_list_places_keyset_pagination(client, setup_db):
+    """Walking next_cursor visits every place exactly once, in creation order."""
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    created = [_create_place(client, token, {"name": f"Place {i}"})["id"] for i in range(5)]
+
+    seen = []
+    cursor = None
+    while True:
+        query = {"limit": 2}
+        if cursor:
+            query["cursor"] = cursor
+        resp = client.get("/api/v1/places/", query_string=query)
+        assert resp.status_code == 200
+        page = resp.get_json()
+        assert len(page["items"]) <= 2
+        seen.extend(p["id"] for p in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == created
+
+
+def test_list_places_rejects_garbage_cursor(client, setup_db):
+    resp = client.get("/api/v1/places/", query_string={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def test_malformed_numeric_query_params_are_rejected(client, setup_db):
+    for url, params, name in (
+        ("/api/v1/places/", {"min_price": "abc"}, "min_price"),
+        ("/api/v1/places/", {"max_price": "1.5"}, "max_price"),
+        ("/api/v1/places/", {"limit": "ten"}, "limit"),
+        ("/api/v1/places/near", {"lat": 18.4, "lng": -66.1, "radius_km": "far"}, "radius_km"),
+        ("/api/v1/places/nearest", {"lat": 18.4, "lng": -66.1, "k": "x"}, "k"),
+        ("/api/v1/users/", {"limit": "-"}, "limit"),
+    ):
+        resp = client.get(url, query_string=params)
+        assert resp.status_code == 400, url
+        assert resp.get_json()["message"] == f"invalid_value: {name}"
+    ## empty means absent, as before
+    assert client.get("/api/v1/places/", query_string={"min_price": ""}).status_code == 200
+
+
+def test_list_places_rejects_cursors_with_malformed_keys(client, setup_db):
+    import base64
+    import json
+
+    for key in (None, [1], {"a": 1}, {"dt": 5}, {"dt": "2024-01-01", "x": 1}, True, float("nan")):
+        raw = json.dumps([key, "x"]).encode("utf-8")
+        token = base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+        for sort in ("created", "price"):
+            resp = client.get("/api/v1/places/", query_string={"cursor": token, "sort": sort})
+            assert resp.status_code == 400, (key, sort)
+
+
+def test_list_places_filters_by_city_and_price_sorted(client, setup_db):
+    """city + price range + sort=-price, paged two at a time."""
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    for city, price in [("Ponce", 80), ("Ponce", 120), ("Ponce", 200), ("Ponce", 150), ("Mayaguez", 130)]:
+        _create_place(client, token, {"city": city, "price_per_night": price})
+
+    prices = []
+    cursor = None
+    while True:
+        query = {"city": "Ponce", "min_price": 100, "max_price": 180, "sort": "-price", "limit": 1}
+        if cursor:
+            query["cursor"] = cursor
+        page = client.get("/api/v1/places/", query_string=query).get_json()
+        prices.extend(p["price_per_night"] for p in page["items"])
+        assert all(p["city"] == "Ponce" for p in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert prices == [150, 120]
+
+
+def test_list_places_rejects_unknown_sort(client, setup_db):
+    resp = client.get("/api/v1/places/", query_string={"sort": "name"})
+    assert resp.status_code == 400
+
+
+def test_near_returns_places_within_radius_closest_first(client, setup_db):
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    _create_place(client, token, {"name": "Ponce", "latitude": 18.0111, "longitude": -66.6141})
+    _create_place(client, token, {"name": "Bayamon", "latitude": 18.3985, "longitude": -66.1553})
+    _create_place(client, token, {"name": "Old San Juan", "latitude": 18.4655, "longitude": -66.1057})
+    _create_place(client, token, {"name": "No coordinates"})
+
+    resp = client.get("/api/v1/places/near", query_string={"lat": 18.466, "lng": -66.105, "radius_km": 20})
+    assert resp.status_code == 200
+    items = resp.get_json()["items"]
+    assert [p["name"] for p in items] == ["Old San Juan", "Bayamon"]
+    assert items[0]["distance_km"] < items[1]["distance_km"] < 20
+
+
+def test_near_rejects_bad_radius(client, setup_db):
+    resp = client.get("/api/v1/places/near", query_string={"lat": 18.4, "lng": -66.1, "radius_km": 0})
+    assert resp.status_code == 400
+
+
+def test_list_places_bbox_across_antimeridian(client, setup_db):
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    _create_place(client, token, {"name": "Fiji east", "latitude": -0.5, "longitude": 179.5})
+    _create_place(client, token, {"name": "Fiji west", "latitude": 0.5, "longitude": -179.5})
+    _create_place(client, token, {"name": "Gulf of Guinea", "latitude": 0.0, "longitude": 0.0})
+
+    resp = client.get("/api/v1/places/", query_string={"bbox": "179,-1,-179,1"})
+    assert resp.status_code == 200
+    names = sorted(p["name"] for p in resp.get_json()["items"])
+    assert names == ["Fiji east", "Fiji west"]
+
+
+def test_list_places_tall_and_world_bboxes(client, setup_db):
+    from part3.persistence import geo
+
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    _create_place(client, token, {"name": "Quito", "latitude": -0.2, "longitude": -78.5})
+    _create_place(client, token, {"name": "Lagos", "latitude": 6.5, "longitude": 3.4})
+    _create_place(client, token, {"name": "Skagerrak", "latitude": 58.0, "longitude": 9.5})
+
+    ## 1200 cell rows: coarsened to MAX_CELL_RANGES ranges, not one latitude band
+    ranges = geo.cell_ranges((-60.0, -10.0, 60.0, 10.0))
+    assert len(ranges) == geo.MAX_CELL_RANGES
+    band = ranges[-1][1] - ranges[0][0] + 1
+    assert sum(hi - lo + 1 for lo, hi in ranges) < 0.7 * band
+    resp = client.get("/api/v1/places/", query_string={"bbox": "-10,-60,10,60"})
+    assert resp.status_code == 200
+    assert sorted(p["name"] for p in resp.get_json()["items"]) == ["Lagos", "Skagerrak"]
+
+    ## full-width rows merge into a single range
+    assert geo.cell_ranges((-90.0, -180.0, 90.0, 180.0)) == [(0, geo.LAT_CELLS * geo.LNG_CELLS - 1)]
+    resp = client.get("/api/v1/places/", query_string={"bbox": "-180,-90,180,90"})
+    assert resp.status_code == 200
+    assert sorted(p["name"] for p in resp.get_json()["items"]) == ["Lagos", "Quito", "Skagerrak"]
+
+
+def test_large_radius_scans_only_candidate_cells(client, setup_db):
+    from part3.persistence import geo
+
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    _create_place(client, token, {"name": "Oslo", "latitude": 59.91, "longitude": 10.75})
+    _create_place(client, token, {"name": "Anchorage", "latitude": 61.2, "longitude": -149.9})
+
+    ## a max-radius circle near 60N: one range per cell row, each only as wide as the circle
+    box = geo.radius_box(60.0, 10.0, geo.MAX_RADIUS_KM)
+    ranges = geo.cell_ranges(box)
+    rows = geo._row(box[2]) - geo._row(box[0]) + 1
+    assert len(ranges) == rows
+    widths = {hi - lo + 1 for lo, hi in ranges}
+    assert max(widths) < geo.LNG_CELLS / 10
+
+    ## ... and the same across the antimeridian: two spans per row, still no band
+    ranges = geo.cell_ranges(geo.radius_box(60.0, 179.0, geo.MAX_RADIUS_KM))
+    assert rows < len(ranges) <= geo.MAX_CELL_RANGES
+    assert sum(hi - lo + 1 for lo, hi in ranges) < rows * geo.LNG_CELLS / 10
+
+    resp = client.get("/api/v1/places/near", query_string={"lat": 60.0, "lng": 10.0, "radius_km": geo.MAX_RADIUS_KM})
+    assert resp.status_code == 200
+    assert [p["name"] for p in resp.get_json()["items"]] == ["Oslo"]
+
+
+def test_nearest_tracks_creates_moves_and_deletes(client, setup_db):
+    """k-nearest index is built once, then follows writes without a rebuild."""
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    headers = {"Authorization": f"Bearer {token}"}
+    _create_place(client, token, {"name": "Ponce", "latitude": 18.0111, "longitude": -66.6141})
+    _create_place(client, token, {"name": "Bayamon", "latitude": 18.3985, "longitude": -66.1553})
+    _create_place(client, token, {"name": "Madrid", "latitude": 40.4168, "longitude": -3.7038})
+
+    def nearest_names(k):
+        resp = client.get("/api/v1/places/nearest", query_string={"lat": 18.466, "lng": -66.105, "k": k})
+        assert resp.status_code == 200
+        return [p["name"] for p in resp.get_json()["items"]]
+
+    assert nearest_names(2) == ["Bayamon", "Ponce"]
+
+    closest = _create_place(client, token, {"name": "Old San Juan", "latitude": 18.4655, "longitude": -66.1057})
+    assert nearest_names(2) == ["Old San Juan", "Bayamon"]
+
+    client.put(f"/api/v1/places/{closest['id']}", json={"latitude": 41.0, "longitude": 2.0}, headers=headers)
+    assert nearest_names(2) == ["Bayamon", "Ponce"]
+
+    client.delete(f"/api/v1/places/{closest['id']}", headers=headers)
+    assert nearest_names(10) == ["Bayamon", "Ponce", "Madrid"]
+
+
+def test_nearest_index_preloads_and_syncs_other_processes_writes(app, client, setup_db):
+    from sqlalchemy import delete, update
+    from part3.models import Place, _utcnow
+    from part3.persistence import spatial_index
+
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    ponce = _create_place(client, token, {"name": "Ponce", "latitude": 18.0111, "longitude": -66.6141})
+
+    ## a second worker builds its tree at startup, before any request
+    class Preloading(TestConfig):
+        SPATIAL_INDEX_PRELOAD = True
+
+    other = create_app(Preloading)
+    index = other.extensions["place_kdtree"]
+    index._worker.join(10)
+    assert index.ready.is_set()
+    assert [pid for _, pid in index.tree.nearest(18.4, -66.1, 5)] == [ponce["id"]]
+
+    ## this app moves the place; the other worker sees it on its next delta sync
+    client.put(f"/api/v1/places/{ponce['id']}", json={"latitude": 41.0, "longitude": 2.0},
+               headers={"Authorization": f"Bearer {token}"})
+    with other.app_context():
+        db.session.execute(update(Place).where(Place.id == ponce["id"]).values(updated_at=_utcnow()))
+        db.session.commit()
+        index.sync()
+    assert index.tree.nearest(41.0, 2.0, 1)[0][0] < 1
+
+    ## a delete elsewhere leaves no updated_at behind; the count gives it away
+    with other.app_context():
+        db.session.execute(delete(Place).where(Place.id == ponce["id"]))
+        db.session.commit()
+        index.sync()
+        db.session.remove()
+    assert len(index.tree) == 0
+
+
+def test_kdtree_rebuild_replays_writes_made_meanwhile():
+    from part3.persistence.spatial_index import PlaceKDTree, _unit
+
+    tree = PlaceKDTree([("a", 0.0, 0.0), ("b", 10.0, 10.0)])
+
+    def load():
+        ## writes landing while the new tree is built off the lock
+        tree.insert("late", -50.0, -120.0)
+        tree.remove("b")
+        return [("a", *_unit(0.0, 0.0)), ("b", *_unit(10.0, 10.0))]
+
+    assert tree.rebuild(load)
+    assert not tree.rebuilding()
+    assert sorted(pid for _, pid in tree.nearest(0.0, 0.0, 10)) == ["a", "late"]
+
+    ## enough changes hand the rebuild to a background thread
+    for i in range(100):
+        tree.insert(f"p{i}", i % 80, i)
+    tree.join_rebuild(10)
+    assert not tree.rebuilding()
+    assert len(tree) == 102
+    assert tree.nearest(-50.0, -120.0, 1)[0][1] == "late"
+
+
+def test_search_ranks_matches_and_follows_updates(client, setup_db):
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    headers = {"Authorization": f"Bearer {token}"}
+    beach = _create_place(client, token, {"name": "Beach House", "description": "Steps from the sand"})
+    _create_place(client, token, {"name": "Mountain Cabin", "description": "Far from any beach"})
+    _create_place(client, token, {"name": "City Loft", "description": "Downtown"})
+
+    def search(q):
+        resp = client.get("/api/v1/places/search", query_string={"q": q})
+        assert resp.status_code == 200
+        return [p["name"] for p in resp.get_json()["items"]]
+
+    # name hits rank above description hits; prefixes match
+    assert search("beach") == ["Beach House", "Mountain Cabin"]
+    assert search("bea") == ["Beach House", "Mountain Cabin"]
+    assert search("loft down") == ["City Loft"]
+
+    client.put(f"/api/v1/places/{beach['id']}", json={"name": "Sea Villa"}, headers=headers)
+    assert search("villa") == ["Sea Villa"]
+    client.delete(f"/api/v1/places/{beach['id']}", headers=headers)
+    assert search("villa") == []
+
+
+def test_search_requires_words(client, setup_db):
+    resp = client.get("/api/v1/places/search", query_string={"q": " * () "})
+    assert resp.status_code == 400
+
+
+def test_bulk_import_streams_per_line_results(client, setup_db, monkeypatch):
+    """Admin NDJSON import: good rows land in batches, bad rows are reported by line."""
+    from part3.persistence import sql_place_repository
+
+    monkeypatch.setattr(sql_place_repository, "BULK_BATCH_SIZE", 2)
+    password = "MyStrongPass123!"
+    admin = _register_user(client, password=password)
+    monkeypatch.setenv("ADMIN_EMAILS", admin["email"])
+    token = _login(client, admin["email"], password)
+
+    lines = [
+        '{"name": "Bulk A", "city": "Ponce", "price_per_night": 90, "latitude": 18.0, "longitude": -66.6}',
+        '{"name": "Bulk B", "city": "Ponce", "price_per_night": 0}',
+        "",
+        "{not json",
+        '{"name": "Bulk C", "city": "Arecibo", "price_per_night": 75, "description": "lighthouse view"}',
+        '{"name": "Bulk D", "city": "Arecibo", "price_per_night": 60, "latitude": "north"}',
+        '{"name": "Bulk E", "city": "Fajardo", "price_per_night": 110}',
+    ]
+    resp = client.post(
+        "/api/v1/places/bulk",
+        data="\n".join(lines) + "\n",
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    results = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+
+    assert [(r["line"], r["status"]) for r in results] == [
+        (1, "created"), (2, "error"), (4, "error"), (5, "created"), (6, "error"), (7, "created"),
+    ]
+    assert results[1]["error"] == "invalid_value: price_per_night"
+    assert results[2]["error"] == "invalid_json"
+    assert results[4]["error"] == "invalid_value: latitude"
+
+    created = client.get(f"/api/v1/places/{results[0]['id']}").get_json()
+    assert created["owner_id"] == admin["id"]
+    search = client.get("/api/v1/places/search", query_string={"q": "lighthouse"}).get_json()
+    assert [p["name"] for p in search["items"]] == ["Bulk C"]
+
+
+def _bulk_post(client, token, lines):
+    resp = client.post(
+        "/api/v1/places/bulk",
+        data="\n".join(lines) + "\n",
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+
+
+def test_bulk_import_rejects_mistyped_fields_per_line(client, setup_db, monkeypatch):
+    password = "MyStrongPass123!"
+    admin = _register_user(client, password=password)
+    monkeypatch.setenv("ADMIN_EMAILS", admin["email"])
+    token = _login(client, admin["email"], password)
+
+    results = _bulk_post(client, token, [
+        '{"name": "Ok", "city": "Ponce", "price_per_night": 90}',
+        '{"name": "Dict", "city": "Ponce", "price_per_night": 90, "description": {"x": 1}}',
+        '{"name": "NaN", "city": "Ponce", "price_per_night": 90, "latitude": NaN, "longitude": 1.0}',
+        '{"name": "Owner", "city": "Ponce", "price_per_night": 90, "owner_id": 7}',
+        '{"name": "Bool", "city": "Ponce", "price_per_night": true}',
+    ])
+    assert [(r["line"], r.get("error")) for r in results] == [
+        (1, None),
+        (2, "invalid_value: description"),
+        (3, "invalid_value: latitude"),
+        (4, "invalid_value: owner_id"),
+        (5, "invalid_value: price_per_night"),
+    ]
+
+
+def test_bulk_import_database_errors_stay_per_line(client, setup_db, monkeypatch):
+    ## a row the driver refuses must not kill the stream or the rest of the batch
+    from part3.persistence import sql_place_repository
+
+    monkeypatch.setattr(sql_place_repository, "_check_bulk_fields", lambda payload: None)
+    password = "MyStrongPass123!"
+    admin = _register_user(client, password=password)
+    monkeypatch.setenv("ADMIN_EMAILS", admin["email"])
+    token = _login(client, admin["email"], password)
+
+    results = _bulk_post(client, token, [
+        '{"name": "Before", "city": "Ponce", "price_per_night": 90}',
+        '{"name": "Dict", "city": "Ponce", "price_per_night": 90, "description": {"x": 1}}',
+        '{"name": "After", "city": "Ponce", "price_per_night": 90}',
+    ])
+    assert [(r["line"], r["status"], r.get("error")) for r in results] == [
+        (1, "created", None), (2, "error", "invalid_row"), (3, "created", None),
+    ]
+
+
+def test_bulk_import_is_admin_only(client, setup_db):
+    password = "MyStrongPass123!"
+    user = _register_user(client, password=password)
+    token = _login(client, user["email"], password)
+    resp = client.post(
+        "/api/v1/places/bulk",
+        data='{"name": "X", "city": "Y", "price_per_night": 10}\n',
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert resp.status_code == 403
+
+
+def _seed_amenities(app, *names):
+    ## amenities straight into the DB; returns their ids in order
+    from part3.models import Amenity
+
+    with app.app_context():
+        rows = [Amenity(name=n) for n in names]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [a.id for a in rows]
+
+
+def test_put_amenities_applies_diff_and_reports_unknown_ids(app, client, setup_db):
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    headers = {"Authorization": f"Bearer {token}"}
+    place = _create_place(client, token)
+    wifi, pool, parking = _seed_amenities(app, "Wifi", "Pool", "Parking")
+
+    resp = client.put(
+        f"/api/v1/places/{place['id']}/amenities",
+        json={"amenity_ids": [wifi, pool, "no-such-amenity"]},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert sorted(data["amenity_ids"]) == sorted([wifi, pool])
+    assert data["unknown_amenity_ids"] == ["no-such-amenity"]
+
+    resp = client.put(
+        f"/api/v1/places/{place['id']}/amenities",
+        json={"amenity_ids": [pool, parking]},
+        headers=headers,
+    )
+    assert sorted(resp.get_json()["amenity_ids"]) == sorted([pool, parking])
+    assert sorted(client.get(f"/api/v1/places/{place['id']}").get_json()["amenity_ids"]) == sorted([pool, parking])
+
+
+def test_put_amenities_requires_owner(app, client, setup_db):
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    other = _register_user(client, password=password)
+    place = _create_place(client, _login(client, owner["email"], password))
+    other_token = _login(client, other["email"], password)
+
+    resp = client.put(
+        f"/api/v1/places/{place['id']}/amenities",
+        json={"amenity_ids": []},
+        headers={"Authorization": f"Bearer {other_token}"},
+    )
+    assert resp.status_code == 403
+
+
+def test_list_places_amenity_filter_with_facets(app, client, setup_db):
+    """?amenities=a,b keeps places having all of them; facets count the matches."""
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    headers = {"Authorization": f"Bearer {token}"}
+    wifi, pool, parking = _seed_amenities(app, "Wifi", "Pool", "Parking")
+
+    def place_with(name, amenity_ids):
+        place = _create_place(client, token, {"name": name})
+        client.put(f"/api/v1/places/{place['id']}/amenities", json={"amenity_ids": amenity_ids}, headers=headers)
+        return place
+
+    place_with("All three", [wifi, pool, parking])
+    both = place_with("Wifi and pool", [wifi, pool])
+    place_with("Wifi only", [wifi])
+
+    def search(*amenity_ids):
+        resp = client.get("/api/v1/places/", query_string={"amenities": ",".join(amenity_ids)})
+        assert resp.status_code == 200
+        return resp.get_json()
+
+    page = search(wifi, pool)
+    assert sorted(p["name"] for p in page["items"]) == ["All three", "Wifi and pool"]
+    assert page["facets"] == {wifi: 2, pool: 2, parking: 1}
+
+    ## facets follow the other filters too, not just the amenity match
+    elsewhere = _create_place(client, token, {"name": "Elsewhere", "city": "Ponce"})
+    client.put(f"/api/v1/places/{elsewhere['id']}/amenities", json={"amenity_ids": [wifi, pool, parking]}, headers=headers)
+    assert search(wifi, pool)["facets"] == {wifi: 3, pool: 3, parking: 2}
+    resp = client.get("/api/v1/places/", query_string={"amenities": f"{wifi},{pool}", "city": "Ponce"})
+    page = resp.get_json()
+    assert [p["name"] for p in page["items"]] == ["Elsewhere"]
+    assert page["facets"] == {wifi: 1, pool: 1, parking: 1}
+    client.delete(f"/api/v1/places/{elsewhere['id']}", headers=headers)
+
+    # single-amenity detach keeps the bitmaps in step
+    client.delete(f"/api/v1/places/{both['id']}/amenities/{pool}", headers=headers)
+    assert [p["name"] for p in search(wifi, pool)["items"]] == ["All three"]
+    assert search("no-such-amenity")["items"] == []
+
+
+def test_amenity_bitmaps_pick_up_other_processes_writes(app, client, setup_db):
+    from sqlalchemy import delete, insert, update
+    from part3.models import Place, _utcnow, place_amenities
+    from part3.persistence import amenity_index
+
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    token = _login(client, owner["email"], password)
+    wifi, pool = _seed_amenities(app, "Wifi", "Pool")
+    place = _create_place(client, token, {"name": "Casa"})
+
+    def names(*amenity_ids):
+        resp = client.get("/api/v1/places/", query_string={"amenities": ",".join(amenity_ids)})
+        return [p["name"] for p in resp.get_json()["items"]]
+
+    assert names(wifi) == []
+    ## another worker attaches wifi: not seen until the next delta refresh
+    with app.app_context():
+        db.session.execute(insert(place_amenities), [{"place_id": place["id"], "amenity_id": wifi}])
+        db.session.execute(update(Place).where(Place.id == place["id"]).values(updated_at=_utcnow()))
+        db.session.commit()
+    assert names(wifi) == []
+    with app.app_context():
+        amenity_index.get_index().refresh(force=True)
+    assert names(wifi) == ["Casa"]
+
+    ## a delete elsewhere leaves no updated_at behind; the row count gives it away
+    with app.app_context():
+        db.session.execute(delete(place_amenities).where(place_amenities.c.amenity_id == wifi))
+        db.session.commit()
+        amenity_index.get_index().refresh(force=True)
+    assert names(wifi) == []
@@ -3,6 +3,7 @@ import uuid
 import pytest
 from flask import Flask
 from part3.app import create_app
+from part3.config import TestConfig
 from part3.app.extensions import db
 
 
@@ -11,7 +12,7 @@ from part3.app.extensions import db
 @pytest.fixture
 def app():
     ## normal app, but in testing mode
-    app = create_app()
+    app = create_app(TestConfig)
     app.config["TESTING"] = True
     return app
 
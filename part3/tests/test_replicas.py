@@ -0,0 +1,122 @@
+import time
+import uuid
+
+import pytest
+from sqlalchemy import update
+from part3.app import create_app
+from part3.config import TestConfig
+from part3.app.extensions import db
+from part3.models import Place
+
+
+def _replica_app(tmp_path, cache_size):
+    ## two SQLite files stand in for the primary and its replicas
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_REPLICA_URIS = [f"sqlite:///{tmp_path / 'replica_a.db'}", f"sqlite:///{tmp_path / 'replica_b.db'}"]
+        SQLALCHEMY_REPLICA_STICKY_SECONDS = 30
+        ENTITY_CACHE_SIZE = cache_size
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        for key in ("replica_0", "replica_1"):
+            db.metadata.create_all(db.engines[key])
+    return app
+
+
+def _dispose(app):
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = _replica_app(tmp_path, cache_size=0)  # these tests edit replica rows behind the app's back
+    yield app
+    _dispose(app)
+
+
+@pytest.fixture
+def cached_app(tmp_path):
+    app = _replica_app(tmp_path, cache_size=100)
+    yield app
+    _dispose(app)
+
+
+def _replicate(app):
+    ## copy every row from the primary, as replication eventually would
+    with app.app_context():
+        with db.engines[None].connect() as primary:
+            snapshot = {t: [dict(r._mapping) for r in primary.execute(t.select())] for t in db.metadata.sorted_tables}
+        for key in ("replica_0", "replica_1"):
+            with db.engines[key].begin() as replica:
+                for table in reversed(db.metadata.sorted_tables):
+                    replica.execute(table.delete())
+                for table, rows in snapshot.items():
+                    if rows:
+                        replica.execute(table.insert(), rows)
+
+
+def _create_place(client, with_headers=False):
+    email, password = f"replica_{uuid.uuid4().hex}@example.com", "MyStrongPass123!"
+    client.post("/api/v1/users/", json={"first_name": "R", "last_name": "P", "email": email, "password": password})
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": password}).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    resp = client.post("/api/v1/places/", headers=headers, json={
+        "name": "Casa Replica", "city": "Ponce", "price_per_night": 90, "latitude": 18.0, "longitude": -66.6,
+    })
+    assert resp.status_code == 201
+    place_id = resp.get_json()["id"]
+    return (place_id, headers) if with_headers else place_id
+
+
+def test_writer_reads_its_writes_while_others_read_replicas(app):
+    writer, reader = app.test_client(), app.test_client()
+    place_id = _create_place(writer)
+
+    ## not replicated yet: the writer is pinned to the primary, other clients read a replica
+    assert writer.get(f"/api/v1/places/{place_id}").status_code == 200
+    assert reader.get(f"/api/v1/places/{place_id}").status_code == 404
+
+    _replicate(app)
+    assert reader.get(f"/api/v1/places/{place_id}").status_code == 200
+
+
+def test_get_requests_round_robin_over_replicas(app):
+    place_id = _create_place(app.test_client())
+    _replicate(app)
+    with app.app_context():
+        for key, name in (("replica_0", "from a"), ("replica_1", "from b")):
+            with db.engines[key].begin() as replica:
+                replica.execute(update(Place).where(Place.id == place_id).values(name=name))
+
+    reader = app.test_client()
+    names = [reader.get(f"/api/v1/places/{place_id}").get_json()["name"] for _ in range(4)]
+    assert sorted(names) == ["from a", "from a", "from b", "from b"]
+    assert names[0] != names[1]
+
+
+def test_stickiness_expires(app, monkeypatch):
+    writer = app.test_client()
+    place_id = _create_place(writer)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 31)
+    ## past the window the writer reads replicas like everyone else
+    assert writer.get(f"/api/v1/places/{place_id}").status_code == 404
+
+
+def test_writer_reads_its_writes_through_the_entity_cache(cached_app):
+    writer, reader = cached_app.test_client(), cached_app.test_client()
+    place_id, headers = _create_place(writer, with_headers=True)
+    _replicate(cached_app)
+    url = f"/api/v1/places/{place_id}"
+    assert reader.get(url).get_json()["name"] == "Casa Replica"
+
+    assert writer.put(url, json={"name": "Casa Nueva"}, headers=headers).status_code == 200
+    ## the lagging replica puts the old row back in the cache...
+    assert reader.get(url).get_json()["name"] == "Casa Replica"
+    ## ...but the sticky writer reloads from the primary
+    assert writer.get(url).get_json()["name"] == "Casa Nueva"
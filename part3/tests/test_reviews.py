@@ -2,13 +2,14 @@ import uuid
 
 import pytest
 from part3.app import create_app
+from part3.config import TestConfig
 from part3.app.extensions import db
 
 
 @pytest.fixture
 def app():
     ## normal app, in testing mode
-    app = create_app()
+    app = create_app(TestConfig)
     app.config["TESTING"] = True
     return app
 
@@ -228,3 +229,138 @@ def test_non_author_cannot_delete_review(client, setup_db):
     resp = client.delete(f"/api/v1/reviews/{review_id}", headers=headers)
     assert resp.status_code == 403
 
+
+
+def test_place_review_stats_follow_create_and_delete(client, setup_db):
+    """review_count / last_reviewed_at on the place move with its reviews."""
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    owner_token = _login(client, owner["email"], password)
+    place_id = _create_place(client, owner_token)["id"]
+
+    first = _register_user(client, password=password)
+    first_token = _login(client, first["email"], password)
+    second = _register_user(client, password=password)
+    second_token = _login(client, second["email"], password)
+
+    r1 = _create_review(client, first_token, place_id, text="One").get_json()
+    r2 = _create_review(client, second_token, place_id, text="Two").get_json()
+    place = client.get(f"/api/v1/places/{place_id}").get_json()
+    assert place["review_count"] == 2
+    assert place["last_reviewed_at"] == r2["created_at"]
+
+    client.delete(f"/api/v1/reviews/{r2['id']}", headers={"Authorization": f"Bearer {second_token}"})
+    place = client.get(f"/api/v1/places/{place_id}").get_json()
+    assert place["review_count"] == 1
+    assert place["last_reviewed_at"] == r1["created_at"]
+
+    # deleting the reviewer cascades their review away
+    client.delete(f"/api/v1/users/{first['id']}", headers={"Authorization": f"Bearer {first_token}"})
+    place = client.get(f"/api/v1/places/{place_id}").get_json()
+    assert place["review_count"] == 0
+    assert place["last_reviewed_at"] is None
+
+
+def test_review_stats_verify_and_repair_commands(app, client, setup_db):
+    from part3.models import Place
+
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    place_id = _create_place(client, _login(client, owner["email"], password))["id"]
+    reviewer = _register_user(client, password=password)
+    _create_review(client, _login(client, reviewer["email"], password), place_id)
+
+    with app.app_context():
+        db.session.get(Place, place_id).review_count = 7
+        db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["review-stats", "verify"])
+    assert result.exit_code == 1
+    assert place_id in result.output
+
+    result = runner.invoke(args=["review-stats", "repair"])
+    assert "1 place(s) repaired" in result.output
+    assert runner.invoke(args=["review-stats", "verify"]).exit_code == 0
+    assert client.get(f"/api/v1/places/{place_id}").get_json()["review_count"] == 1
+
+
+def test_place_reviews_are_cursor_paginated(client, setup_db):
+    """GET /places/<id>/reviews pages through only that place's reviews, oldest first."""
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    owner_token = _login(client, owner["email"], password)
+    place_id = _create_place(client, owner_token)["id"]
+    other_place_id = _create_place(client, owner_token, {"name": "Elsewhere"})["id"]
+
+    created = []
+    for i in range(5):
+        guest = _register_user(client, password=password)
+        token = _login(client, guest["email"], password)
+        created.append(_create_review(client, token, place_id, text=f"Stay {i}").get_json()["id"])
+        _create_review(client, token, other_place_id, text="Other")
+
+    seen = []
+    cursor = None
+    while True:
+        query = {"limit": 2}
+        if cursor:
+            query["cursor"] = cursor
+        resp = client.get(f"/api/v1/places/{place_id}/reviews", query_string=query)
+        assert resp.status_code == 200
+        page = resp.get_json()
+        assert len(page["items"]) <= 2
+        assert all(r["place_id"] == place_id for r in page["items"])
+        seen.extend(r["id"] for r in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == created
+
+
+def test_place_reviews_unknown_place_or_bad_cursor(client, setup_db):
+    assert client.get("/api/v1/places/nope/reviews").status_code == 404
+
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    place_id = _create_place(client, _login(client, owner["email"], password))["id"]
+    resp = client.get(f"/api/v1/places/{place_id}/reviews", query_string={"cursor": "junk"})
+    assert resp.status_code == 400
+
+
+def test_create_review_is_one_insert_and_one_counter_update(app, client, setup_db):
+    """INSERT ... SELECT folds the place/owner checks in; the unique index catches duplicates."""
+    from sqlalchemy import event
+    from part3.persistence import sql_review_repository as repo
+
+    password = "MyStrongPass123!"
+    owner = _register_user(client, password=password)
+    place_id = _create_place(client, _login(client, owner["email"], password))["id"]
+    guest = _register_user(client, password=password)
+
+    statements = []
+
+    def _before(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before)
+        try:
+            created = repo.create_review({"text": "Great", "place_id": place_id, "user_id": guest["id"]})
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _before)
+
+        assert [s.split()[0] for s in statements] == ["INSERT", "UPDATE"]
+        assert "SELECT" in statements[0]
+        assert repo.get_review(created["id"]) == created
+
+        with pytest.raises(ValueError, match="duplicate_review"):
+            repo.create_review({"text": "Again", "place_id": place_id, "user_id": guest["id"]})
+        with pytest.raises(ValueError, match="self_review_forbidden"):
+            repo.create_review({"text": "Mine", "place_id": place_id, "user_id": owner["id"]})
+        with pytest.raises(ValueError, match="place_not_found"):
+            repo.create_review({"text": "Ghost", "place_id": "nope", "user_id": guest["id"]})
+
+    place = client.get(f"/api/v1/places/{place_id}").get_json()
+    assert place["review_count"] == 1
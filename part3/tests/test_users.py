@@ -0,0 +1,232 @@
+import uuid
+
+import pytest
+from part3.app import create_app
+from part3.config import TestConfig
+from part3.app.extensions import db
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def setup_db(app):
+    ## fresh DB per test
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield db
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _register_and_login(client, password="MyStrongPass123!"):
+    email = f"users_{uuid.uuid4().hex}@example.com"
+    user = client.post("/api/v1/users/", json={
+        "first_name": "Profile",
+        "last_name": "Tester",
+        "email": email,
+        "password": password,
+    }).get_json()
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": password}).get_json()["access_token"]
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+def _walk(client, url, limit=2):
+    ## follow next_cursor to the end, returning every id seen
+    seen, cursor = [], None
+    while True:
+        query = {"limit": limit}
+        if cursor:
+            query["cursor"] = cursor
+        resp = client.get(url, query_string=query)
+        assert resp.status_code == 200
+        page = resp.get_json()
+        assert len(page["items"]) <= limit
+        seen.extend(i["id"] for i in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return seen
+
+
+def test_user_places_are_cursor_paginated(client, setup_db):
+    owner, headers = _register_and_login(client)
+    _, other_headers = _register_and_login(client)
+    created = [
+        client.post("/api/v1/places/", json={
+            "name": f"Listing {i}", "city": "Ponce", "price_per_night": 80 + i,
+        }, headers=headers).get_json()["id"]
+        for i in range(5)
+    ]
+    client.post("/api/v1/places/", json={"name": "Not mine", "city": "Ponce", "price_per_night": 50},
+                headers=other_headers)
+
+    assert _walk(client, f"/api/v1/users/{owner['id']}/places") == created
+
+
+def test_user_reviews_are_cursor_paginated(client, setup_db):
+    _, owner_headers = _register_and_login(client)
+    guest, guest_headers = _register_and_login(client)
+    created = []
+    for i in range(3):
+        place = client.post("/api/v1/places/", json={
+            "name": f"Stay {i}", "city": "Ponce", "price_per_night": 80,
+        }, headers=owner_headers).get_json()
+        created.append(client.post("/api/v1/reviews/", json={
+            "text": f"Review {i}", "place_id": place["id"],
+        }, headers=guest_headers).get_json()["id"])
+
+    assert _walk(client, f"/api/v1/users/{guest['id']}/reviews") == created
+
+
+def test_user_subresources_unknown_user_or_bad_cursor(client, setup_db):
+    assert client.get("/api/v1/users/nope/places").status_code == 404
+    assert client.get("/api/v1/users/nope/reviews").status_code == 404
+
+    user, _ = _register_and_login(client)
+    resp = client.get(f"/api/v1/users/{user['id']}/reviews", query_string={"cursor": "junk"})
+    assert resp.status_code == 400
+    page = client.get(f"/api/v1/users/{user['id']}/places").get_json()
+    assert page == {"items": [], "next_cursor": None}
+
+
+def test_duplicate_signup_is_rejected_before_hashing(client, setup_db, monkeypatch):
+    from part3.app.extensions import hasher
+
+    calls = []
+    original = hasher._hash
+    monkeypatch.setattr(hasher, "_hash", lambda pw, rounds: calls.append(rounds) or original(pw, rounds))
+
+    payload = {"first_name": "Dup", "last_name": "User", "email": f"dup_{uuid.uuid4().hex}@example.com",
+               "password": "MyStrongPass123!"}
+    assert client.post("/api/v1/users/", json=payload).status_code == 201
+    resp = client.post("/api/v1/users/", json=payload)
+    assert resp.status_code == 400
+    assert "email_already_exists" in resp.get_json()["message"]
+    assert len(calls) == 1
+
+
+def test_new_hashes_use_configured_work_factor(app, client, setup_db):
+    from part3.models import User
+
+    app.config["BCRYPT_LOG_ROUNDS"] = 5
+    user, _ = _register_and_login(client)
+    with app.app_context():
+        assert db.session.get(User, user["id"]).password_hash.startswith("$2b$05$")
+
+
+def test_user_list_is_cursor_paginated(client, setup_db):
+    created = [_register_and_login(client)[0]["id"] for _ in range(5)]
+    assert _walk(client, "/api/v1/users/") == created
+
+
+def test_user_list_email_prefix_search(client, setup_db):
+    password = "MyStrongPass123!"
+    for email in ("ana@example.com", "andres@example.com", "bob@example.com", "anb@example.com"):
+        client.post("/api/v1/users/", json={
+            "first_name": "P", "last_name": "S", "email": email, "password": password,
+        })
+
+    page = client.get("/api/v1/users/", query_string={"email_prefix": "an", "limit": 2}).get_json()
+    assert [u["email"] for u in page["items"]] == ["ana@example.com", "anb@example.com"]
+    page = client.get("/api/v1/users/", query_string={
+        "email_prefix": "an", "limit": 2, "cursor": page["next_cursor"],
+    }).get_json()
+    assert [u["email"] for u in page["items"]] == ["andres@example.com"]
+    assert page["next_cursor"] is None
+    ## the prefix matches the normalized email, so letter case doesn't matter
+    page = client.get("/api/v1/users/", query_string={"email_prefix": "AN"}).get_json()
+    assert [u["email"] for u in page["items"]] == ["ana@example.com", "anb@example.com", "andres@example.com"]
+
+
+def test_user_list_is_one_column_only_query(app, client, setup_db):
+    from sqlalchemy import event
+    from part3.business.facade import Facade
+
+    _, headers = _register_and_login(client)
+    client.post("/api/v1/places/", json={"name": "P", "city": "Ponce", "price_per_night": 80}, headers=headers)
+
+    statements = []
+
+    def _before(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before)
+        try:
+            page = Facade().list_users(limit=10)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _before)
+
+    assert len(page["items"]) == 1
+    assert len(statements) == 1
+    assert "password_hash" not in statements[0]
+    assert "places" not in statements[0] and "reviews" not in statements[0]
+
+
+def test_delete_user_is_one_delete_cascaded_by_the_database(app, client, setup_db):
+    from sqlalchemy import event
+    from part3.business.facade import Facade
+    from part3.models import Amenity, Place, Review, place_amenities
+
+    host, host_headers = _register_and_login(client)
+    guest, guest_headers = _register_and_login(client)
+    _, other_headers = _register_and_login(client)
+    with app.app_context():
+        amenity = Amenity(name="Pool")
+        db.session.add(amenity)
+        db.session.commit()
+        amenity_id = amenity.id
+
+    place_ids = []
+    for i in range(3):
+        place = client.post("/api/v1/places/", json={
+            "name": f"Host place {i}", "city": "Ponce", "price_per_night": 80,
+        }, headers=host_headers).get_json()
+        place_ids.append(place["id"])
+        client.put(f"/api/v1/places/{place['id']}/amenities", json={"amenity_ids": [amenity_id]}, headers=host_headers)
+        client.post("/api/v1/reviews/", json={"text": "Nice", "place_id": place["id"]}, headers=guest_headers)
+    other_place = client.post("/api/v1/places/", json={
+        "name": "Elsewhere", "city": "Ponce", "price_per_night": 80,
+    }, headers=other_headers).get_json()
+    client.post("/api/v1/reviews/", json={"text": "Also nice", "place_id": other_place["id"]}, headers=guest_headers)
+
+    statements = []
+
+    def _before(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before)
+        try:
+            assert Facade().delete_user(host["id"]) is True
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _before)
+
+        deletes = [s for s in statements if s.lstrip().upper().startswith("DELETE")]
+        assert len(deletes) == 1 and "users" in deletes[0]
+        assert Place.query.filter(Place.id.in_(place_ids)).count() == 0
+        assert Review.query.filter(Review.place_id.in_(place_ids)).count() == 0
+        assert db.session.query(place_amenities).count() == 0
+        ## the guest and their review elsewhere are untouched
+        assert Review.query.filter_by(user_id=guest["id"]).count() == 1
+
+    assert client.get(f"/api/v1/users/{host['id']}").status_code == 404
+
+
+def test_deleted_user_token_cannot_create_rows(client, setup_db):
+    user, headers = _register_and_login(client)
+    client.delete(f"/api/v1/users/{user['id']}", headers=headers)
+    resp = client.post("/api/v1/places/", json={"name": "Ghost", "city": "Ponce", "price_per_night": 80},
+                       headers=headers)
+    assert resp.status_code == 400
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Delete a host with many listings and reviews: ORM cascade vs ON DELETE CASCADE.
+
+Seeds one host owning --places places, each reviewed by --reviewers guests
+and linked to a few amenities, then deletes the host two ways on two copies:
+
+* orm: load the user's places, reviews and links into the session and let
+  the unit of work delete them (the old ``cascade="all, delete-orphan"``
+  path, still what happens when the collections are loaded);
+* db:  SQLAlchemyRepository.delete_user, one DELETE the database cascades.
+
+Reports wall time, SQL statements and peak Python memory for each.
+
+    python scripts/bench_cascade_delete.py --places 300 --reviewers 130
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, insert  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from part3.app import create_app  # noqa: E402
+from part3.app.extensions import db  # noqa: E402
+from part3.config import DevConfig  # noqa: E402
+from part3.models import Amenity, Place, Review, User, place_amenities, _utcnow  # noqa: E402
+from part3.persistence.sql_repository import SQLAlchemyRepository  # noqa: E402
+
+
+def _app(db_path):
+    class BenchConfig(DevConfig):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+
+    return create_app(BenchConfig)
+
+
+def _seed(n_places, n_reviewers, n_amenities=5):
+    now = _utcnow()
+
+    def user(i):
+        return {"id": str(uuid.uuid4()), "first_name": "U", "last_name": str(i),
+                "email": f"u{i}@bench.example", "password_hash": "x", "is_admin": False,
+                "created_at": now, "updated_at": now}
+
+    host = user("host")
+    guests = [user(i) for i in range(n_reviewers)]
+    db.session.execute(insert(User), [host] + guests)
+    amenities = [{"id": str(uuid.uuid4()), "name": f"amenity {i}", "created_at": now, "updated_at": now}
+                 for i in range(n_amenities)]
+    db.session.execute(insert(Amenity), amenities)
+    places = [{"id": str(uuid.uuid4()), "name": f"Listing {i}", "city": "Ponce", "price_per_night": 100,
+               "owner_id": host["id"], "review_count": n_reviewers, "created_at": now, "updated_at": now}
+              for i in range(n_places)]
+    db.session.execute(insert(Place), places)
+    db.session.execute(insert(place_amenities), [
+        {"place_id": p["id"], "amenity_id": a["id"]} for p in places for a in amenities
+    ])
+    db.session.execute(insert(Review), [
+        {"id": str(uuid.uuid4()), "text": "Lovely", "user_id": g["id"], "place_id": p["id"],
+         "created_at": now, "updated_at": now}
+        for p in places for g in guests
+    ])
+    db.session.commit()
+    return host["id"]
+
+
+def _orm_delete(user_id):
+    u = (
+        User.query.options(
+            selectinload(User.places).selectinload(Place.reviews),
+            selectinload(User.places).selectinload(Place.amenities),
+            selectinload(User.reviews),
+        )
+        .filter(User.id == user_id)
+        .one()
+    )
+    db.session.delete(u)
+    db.session.commit()
+
+
+def _db_delete(user_id):
+    SQLAlchemyRepository().delete_user(user_id)
+
+
+def _measure(app, fn, user_id):
+    statements = []
+
+    def _count(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        db.session.expunge_all()
+        event.listen(db.engine, "before_cursor_execute", _count)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        fn(user_id)
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        event.remove(db.engine, "before_cursor_execute", _count)
+        remaining = Review.query.count()
+        db.engine.dispose()
+    return elapsed, len(statements), peak, remaining
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--places", type=int, default=300)
+    parser.add_argument("--reviewers", type=int, default=130, help="guests reviewing every place")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_path = os.path.join(tmp, "seed.db")
+        app = _app(seed_path)
+        with app.app_context():
+            db.create_all()
+            t0 = time.perf_counter()
+            host_id = _seed(args.places, args.reviewers)
+            print(f"seeded {args.places} places, {args.places * args.reviewers} reviews "
+                  f"in {time.perf_counter() - t0:.1f}s")
+            db.engine.dispose()
+
+        for label, fn in (("orm", _orm_delete), ("db", _db_delete)):
+            path = os.path.join(tmp, f"{label}.db")
+            shutil.copy(seed_path, path)
+            elapsed, statements, peak, remaining = _measure(_app(path), fn, host_id)
+            assert remaining == 0, f"{label}: {remaining} reviews left behind"
+            print(f"{label:>3}: {elapsed * 1000:8.1f} ms, {statements:6d} statements, "
+                  f"peak {peak / 1e6:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Time k-nearest lookups on the in-process place KD-tree.
+
+Builds a tree over N random points (no database needed), checks a few
+queries against brute force, then reports build time and per-query latency.
+
+    python scripts/bench_knn.py --points 1000000 --k 20 --queries 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from part3.persistence.geo import haversine_km  # noqa: E402
+from part3.persistence.spatial_index import PlaceKDTree  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=200_000)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    points = [(f"p{i}", rng.uniform(-70, 70), rng.uniform(-180, 180)) for i in range(args.points)]
+
+    t0 = time.perf_counter()
+    tree = PlaceKDTree(points)
+    build_s = time.perf_counter() - t0
+    print(f"build: {args.points} points in {build_s:.1f}s")
+
+    queries = [(rng.uniform(-70, 70), rng.uniform(-180, 180)) for _ in range(args.queries)]
+
+    # correctness spot check against brute force
+    for lat, lng in queries[:3]:
+        expected = sorted(
+            (haversine_km(lat, lng, plat, plng), pid) for pid, plat, plng in points
+        )[: args.k]
+        got = tree.nearest(lat, lng, args.k)
+        assert [pid for _, pid in got] == [pid for _, pid in expected], "kd-tree disagrees with brute force"
+
+    t0 = time.perf_counter()
+    for lat, lng in queries:
+        tree.nearest(lat, lng, args.k)
+    per_query_ms = (time.perf_counter() - t0) * 1000 / len(queries)
+    print(f"k={args.k}: {per_query_ms:.3f} ms/query over {len(queries)} queries")
+
+    t0 = time.perf_counter()
+    for i in range(1000):
+        tree.insert(f"new{i}", rng.uniform(-70, 70), rng.uniform(-180, 180))
+    print(f"insert: {(time.perf_counter() - t0) * 1000 / 1000:.3f} ms/insert")
+
+
+if __name__ == "__main__":
+    main()
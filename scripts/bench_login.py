@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Login throughput (POST /auth/login) at each bcrypt cost.
+
+For each cost, a fresh app on a throwaway SQLite file registers one user
+with a hash of that cost, then takes --logins logins from --clients
+concurrent client threads. Login time is dominated by the password check,
+so each extra round should roughly halve logins/sec.
+
+    python scripts/bench_login.py --costs 4 8 10 12 --logins 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from part3.app import create_app  # noqa: E402
+from part3.app.extensions import db, hasher  # noqa: E402
+from part3.config import DevConfig  # noqa: E402
+
+EMAIL = "bench_login@example.com"
+PASSWORD = "BenchPass123!"
+
+
+def _app(db_path, cost, workers):
+    class BenchConfig(DevConfig):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        BCRYPT_LOG_ROUNDS = cost
+        BCRYPT_POOL_WORKERS = workers
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    app.test_client().post("/api/v1/users/", json={
+        "first_name": "Bench", "last_name": "Login", "email": EMAIL, "password": PASSWORD,
+    })
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--costs", type=int, nargs="+", default=[4, 8, 10, 12])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent client threads")
+    parser.add_argument("--workers", type=int, default=None, help="BCRYPT_POOL_WORKERS (default: one per CPU)")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU(s), {args.clients} clients, {args.logins} logins per cost")
+    for cost in args.costs:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = _app(os.path.join(tmp, "bench.db"), cost, args.workers)
+
+            def login(_):
+                return app.test_client().post(
+                    "/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD}
+                ).status_code
+
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.clients) as pool:
+                codes = list(pool.map(login, range(args.logins)))
+            elapsed = time.perf_counter() - t0
+            hasher.drain()
+            with app.app_context():
+                db.engine.dispose()
+
+        assert codes.count(200) == args.logins, "some logins failed"
+        print(f"cost={cost:>2}: {args.logins / elapsed:8.1f} logins/s ({elapsed * 1000 / args.logins:.1f} ms each)")
+
+
+if __name__ == "__main__":
+    main()
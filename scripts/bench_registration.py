@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Registration throughput (POST /users/) against bcrypt pool size.
+
+For each worker count, a fresh app on a throwaway SQLite file takes
+--signups registrations from --clients concurrent client threads. A share
+of them (--dup-ratio) reuse a taken email, which the pre-check answers
+without hashing. Reports signups/sec per worker count.
+
+    python scripts/bench_registration.py --workers 1 2 4 8 --signups 400 --rounds 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from part3.app import create_app  # noqa: E402
+from part3.app.extensions import db  # noqa: E402
+from part3.config import DevConfig  # noqa: E402
+
+
+def _app(db_path, workers, rounds):
+    class BenchConfig(DevConfig):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        BCRYPT_POOL_WORKERS = workers
+        BCRYPT_LOG_ROUNDS = rounds
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _run(app, signups, clients, dup_ratio):
+    taken = f"taken_{uuid.uuid4().hex}@example.com"
+    app.test_client().post("/api/v1/users/", json={
+        "first_name": "B", "last_name": "B", "email": taken, "password": "BenchPass123!",
+    })
+    dup_every = round(1 / dup_ratio) if dup_ratio else 0
+
+    def signup(i):
+        email = taken if dup_every and i % dup_every == 0 else f"bench_{uuid.uuid4().hex}@example.com"
+        resp = app.test_client().post("/api/v1/users/", json={
+            "first_name": "Bench", "last_name": "User", "email": email, "password": "BenchPass123!",
+        })
+        return resp.status_code
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        codes = list(pool.map(signup, range(signups)))
+    elapsed = time.perf_counter() - t0
+    return elapsed, codes.count(201), codes.count(400)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--signups", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--rounds", type=int, default=10, help="BCRYPT_LOG_ROUNDS")
+    parser.add_argument("--dup-ratio", type=float, default=0.1, help="share of signups reusing a taken email")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU(s), cost {args.rounds}, {args.clients} clients, {args.signups} signups")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = _app(os.path.join(tmp, "bench.db"), workers, args.rounds)
+            elapsed, created, rejected = _run(app, args.signups, args.clients, args.dup_ratio)
+            with app.app_context():
+                db.engine.dispose()
+        print(
+            f"workers={workers:>2}: {args.signups / elapsed:7.1f} signups/s "
+            f"({created} created, {rejected} duplicate) in {elapsed:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Concurrent readers and writers on one SQLite file: stock settings vs SQLITE_PRAGMAS.
+
+Seeds --places places, then for --seconds runs --readers threads listing a
+page of places and --writers threads updating one place's price and
+committing, each thread on its own pooled connection. It runs twice, on
+fresh copies of the same file:
+
+* stock: journal_mode=DELETE, synchronous=FULL (SQLite's defaults; the
+  Python driver's 5 s busy handler still applies);
+* tuned: part3.config.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, ...).
+
+Reports reads/s, writes/s, read latency percentiles and "database is
+locked" errors for each.
+
+    python scripts/bench_sqlite_concurrency.py --readers 4 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import insert, text  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from part3.app import create_app  # noqa: E402
+from part3.app.extensions import db  # noqa: E402
+from part3.config import DevConfig, SQLITE_PRAGMAS  # noqa: E402
+from part3.models import Place, User, _utcnow  # noqa: E402
+
+PROFILES = {
+    "stock": {"journal_mode": "DELETE", "synchronous": "FULL"},
+    "tuned": SQLITE_PRAGMAS,
+}
+
+READ = text("SELECT id, name, price_per_night FROM places ORDER BY created_at, id LIMIT 50 OFFSET :offset")
+WRITE = text("UPDATE places SET price_per_night = price_per_night + 1 WHERE id = :id")
+
+
+def _app(db_path, pragmas):
+    class BenchConfig(DevConfig):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        SQLITE_PRAGMAS = pragmas
+        SPATIAL_INDEX_PRELOAD = False  # keep the startup build out of the timings
+
+    return create_app(BenchConfig)
+
+
+def _seed(n_places):
+    now = _utcnow()
+    owner = {"id": str(uuid.uuid4()), "first_name": "B", "last_name": "H", "email": "host@bench.example",
+             "password_hash": "x", "is_admin": False, "created_at": now, "updated_at": now}
+    db.session.execute(insert(User), [owner])
+    places = [{"id": str(uuid.uuid4()), "name": f"Listing {i}", "city": "Ponce", "price_per_night": 100,
+               "owner_id": owner["id"], "review_count": 0, "created_at": now, "updated_at": now}
+              for i in range(n_places)]
+    db.session.execute(insert(Place), places)
+    db.session.commit()
+    return [p["id"] for p in places]
+
+
+def _run(app, place_ids, readers, writers, seconds):
+    stop = threading.Event()
+    lock = threading.Lock()
+    read_ms, writes, locked = [], [0], [0]
+
+    def reader():
+        rng = random.Random()
+        with app.app_context():
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                try:
+                    db.session.execute(READ, {"offset": rng.randrange(len(place_ids))}).all()
+                    db.session.rollback()  # end the read transaction, as a request would
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        locked[0] += 1
+                    continue
+                with lock:
+                    read_ms.append((time.perf_counter() - t0) * 1000)
+            db.session.remove()
+
+    def writer():
+        rng = random.Random()
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    db.session.execute(WRITE, {"id": rng.choice(place_ids)})
+                    db.session.commit()
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        locked[0] += 1
+                    continue
+                with lock:
+                    writes[0] += 1
+            db.session.remove()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    with app.app_context():
+        db.engine.dispose()
+
+    percentiles = statistics.quantiles(read_ms, n=100) if len(read_ms) > 1 else [0.0] * 99
+    return len(read_ms) / seconds, writes[0] / seconds, percentiles[49], percentiles[98], locked[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--places", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_path = os.path.join(tmp, "seed.db")
+        app = _app(seed_path, PROFILES["stock"])
+        with app.app_context():
+            db.create_all()
+            place_ids = _seed(args.places)
+            db.engine.dispose()
+
+        print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s, {args.places} places")
+        for label, pragmas in PROFILES.items():
+            path = os.path.join(tmp, f"{label}.db")
+            shutil.copy(seed_path, path)
+            reads, writes, p50, p99, locked = _run(
+                _app(path, pragmas), place_ids, args.readers, args.writers, args.seconds
+            )
+            print(f"{label}: {reads:8.0f} reads/s {writes:7.0f} writes/s  "
+                  f"read p50 {p50:6.2f} ms p99 {p99:7.2f} ms  locked errors {locked}")
+
+
+if __name__ == "__main__":
+    main()